@@ -2,7 +2,7 @@
 
 from .search_agent import SearchAgent
 from .kernel_agent import KernelAgent
-from .action_agent import ActionAgent
+from .action_agent import ActionAgent, ActionResults
 from .thread_agent import ThreadAgent
 from .supervisor import SupervisorAgent
 
@@ -10,6 +10,7 @@ __all__ = [
     "SearchAgent",
     "KernelAgent", 
     "ActionAgent",
+    "ActionResults",
     "ThreadAgent",
     "SupervisorAgent"
 ]
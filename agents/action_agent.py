@@ -5,207 +5,352 @@ This agent handles the execution of actions like liking tweets and replying,
 with proper rate limiting and safety checks.
 """
 
+import asyncio
 import logging
-import time
+from dataclasses import dataclass, field
+from datetime import date
 from typing import List, Dict, Tuple, Optional
-from datetime import datetime, timedelta
 
-from google.adk.agents import BaseAgent
-from sources.tweepy_client import TweepyTwitterClient
+from sources.tweepy_client import TweepyTwitterClient, Tweet
 from kernel.decider import TweetDecision
 from kernel.ranker import RankedTweet
+from rate_limiter import TokenBucket
+from storage import storage, StorageManager
 from config import settings
 
 logger = logging.getLogger(__name__)
 
 
-class ActionAgent(BaseAgent):
+@dataclass
+class ActionResults:
+    """Outcomes of executed actions, stored as parallel columns.
+    
+    Each row is one action; `statuses` holds SUCCESSFUL, FAILED or SKIPPED and
+    `comments` holds the reply text for comment actions (None otherwise).
+    """
+    SUCCESSFUL = 0
+    FAILED = 1
+    SKIPPED = 2
+    STATUS_NAMES = ("successful", "failed", "skipped")
+    
+    tweet_ids: List[str] = field(default_factory=list)
+    actions: List[str] = field(default_factory=list)
+    reasons: List[str] = field(default_factory=list)
+    statuses: List[int] = field(default_factory=list)
+    comments: List[Optional[str]] = field(default_factory=list)
+    _counts: List[int] = field(default_factory=lambda: [0, 0, 0], repr=False, compare=False)
+    
+    def append(self, status: int, tweet_id: str, action: str, reason: str,
+               comment: Optional[str] = None) -> None:
+        """Record the outcome of one action."""
+        self.tweet_ids.append(tweet_id)
+        self.actions.append(action)
+        self.reasons.append(reason)
+        self.statuses.append(status)
+        self.comments.append(comment)
+        self._counts[status] += 1
+    
+    def append_successful(self, tweet_id: str, action: str, reason: str,
+                          comment: Optional[str] = None) -> None:
+        self.append(self.SUCCESSFUL, tweet_id, action, reason, comment)
+    
+    def append_failed(self, tweet_id: str, action: str, reason: str,
+                      comment: Optional[str] = None) -> None:
+        self.append(self.FAILED, tweet_id, action, reason, comment)
+    
+    def append_skipped(self, tweet_id: str, action: str, reason: str) -> None:
+        self.append(self.SKIPPED, tweet_id, action, reason)
+    
+    @property
+    def successful_count(self) -> int:
+        return self._counts[self.SUCCESSFUL]
+    
+    @property
+    def failed_count(self) -> int:
+        return self._counts[self.FAILED]
+    
+    @property
+    def skipped_count(self) -> int:
+        return self._counts[self.SKIPPED]
+    
+    def __len__(self) -> int:
+        return len(self.statuses)
+    
+    def to_records(self) -> Dict[str, List[Dict]]:
+        """Convert to the dictionary of result lists grouped by status."""
+        records = {name: [] for name in self.STATUS_NAMES}
+        for tweet_id, action, reason, status, comment in zip(
+                self.tweet_ids, self.actions, self.reasons, self.statuses, self.comments):
+            record = {"tweet_id": tweet_id, "action": action, "reason": reason}
+            if comment is not None:
+                record["comment"] = comment
+            records[self.STATUS_NAMES[status]].append(record)
+        return records
+
+
+class ActionAgent:
     """Agent responsible for executing social media actions."""
     
-    def __init__(self, twitter_client: TweepyTwitterClient = None):
+    # Skip reasons for the actions that count against a daily limit
+    LIMIT_REASONS = {
+        "like": "Daily like limit reached",
+        "comment": "Daily reply limit reached"
+    }
+    
+    def __init__(self, twitter_client: TweepyTwitterClient = None, storage_manager: StorageManager = None):
         """Initialize the action agent.
         
         Args:
             twitter_client: Twitter client instance
+            storage_manager: Storage used to persist daily counters across restarts
         """
-        super().__init__(name="action_agent", description="Executes social media actions")
         self.twitter_client = twitter_client or TweepyTwitterClient()
+        self.storage = storage_manager or storage
         
-        # Track daily action limits
-        self.daily_likes = 0
-        self.daily_replies = 0
-        self.last_reset = datetime.now().date()
+        # Daily maxima, read once from settings rather than on every check
+        self.reload_settings()
         
+        # Track daily action limits, resuming today's counts after a restart
+        self.daily_likes = self._load_daily_count("like")
+        self.daily_replies = self._load_daily_count("comment")
+        self._day = date.today()
+        
+        # Pace API calls per action type instead of sleeping between every action
+        self.like_bucket = TokenBucket.per_window(settings.action_bucket_capacity,
+                                                  settings.action_bucket_window)
+        self.reply_bucket = TokenBucket.per_window(settings.action_bucket_capacity,
+                                                   settings.action_bucket_window)
+        
+        # Dispatch table from decision to handler, built once
+        self._handlers = {
+            "interesting": self._handle_interesting,
+            "like": self._handle_like,
+            "comment": self._handle_comment,
+            "dig_deeper": self._handle_dig_deeper
+        }
+    
+    def reload_settings(self) -> None:
+        """Re-read the daily action limits from settings."""
+        self._max_likes = int(settings.max_likes_per_day)
+        self._max_replies = int(settings.max_replies_per_day)
+        logger.debug("Daily limits loaded: %s likes, %s replies", self._max_likes, self._max_replies)
+    
+    def _load_daily_count(self, action_type: str) -> int:
+        """Load today's persisted count for an action type."""
+        status = self.storage.get_rate_limit_status(action_type)
+        if status.get("last_reset_date") == date.today().isoformat():
+            return status.get("daily_count", 0)
+        return 0
+    
     def _check_daily_limits(self) -> Dict[str, bool]:
         """Check if daily action limits have been reached."""
-        today = datetime.now().date()
+        # Same (local) day boundary storage uses for its counters
+        today = date.today()
         
-        # Reset counters if it's a new day
-        if today != self.last_reset:
-            self.daily_likes = 0
-            self.daily_replies = 0
-            self.last_reset = today
+        if today != self._day:
+            self._day = today
             logger.info("Daily action counters reset")
         
+        # Counters are shared through storage, so pick up actions taken by
+        # other workers since the last check (counts reset on a new day there)
+        self.daily_likes = self._load_daily_count("like")
+        self.daily_replies = self._load_daily_count("comment")
+        
         return {
-            "likes_available": self.daily_likes < settings.max_likes_per_day,
-            "replies_available": self.daily_replies < settings.max_replies_per_day
+            "likes_available": self.daily_likes < self._max_likes,
+            "replies_available": self.daily_replies < self._max_replies
         }
     
-    def _update_action_counters(self, actions: List[str]) -> None:
-        """Update daily action counters."""
-        for action in actions:
-            if action == "like":
-                self.daily_likes += 1
-            elif action == "comment":
-                self.daily_replies += 1
+    async def _reserve_daily_slot(self, action: str) -> bool:
+        """
+        Claim one unit of today's budget for a like or reply.
+        
+        The check and increment happen atomically in storage, so concurrent
+        actions, cycles and processes sharing the database cannot overspend
+        the daily limit between checking it and acting.
         
-        logger.info(f"Daily actions: {self.daily_likes}/{settings.max_likes_per_day} likes, "
-                   f"{self.daily_replies}/{settings.max_replies_per_day} replies")
+        Returns:
+            True if the slot was claimed, False if the daily limit is reached
+        """
+        limit = self._max_likes if action == "like" else self._max_replies
+        count = await asyncio.to_thread(self.storage.reserve_rate_limit, action, limit)
+        if count is None:
+            return False
+        
+        if action == "like":
+            self.daily_likes = count
+        else:
+            self.daily_replies = count
+        return True
+    
+    async def _release_daily_slot(self, action: str) -> None:
+        """Give back a claimed slot when the action did not go through."""
+        await asyncio.to_thread(self.storage.release_rate_limit, action)
+        if action == "like":
+            self.daily_likes = max(self.daily_likes - 1, 0)
+        else:
+            self.daily_replies = max(self.daily_replies - 1, 0)
+    
+    async def _wait_for_token(self, bucket: TokenBucket, action: str) -> None:
+        """Wait until the action's token bucket allows another API call."""
+        wait_time = bucket.time_until(1)
+        if wait_time > 0:
+            logger.info("Rate limit window exhausted for %s, waiting %.1f seconds", action, wait_time)
+        await bucket.consume_async()
     
-    def execute_actions(self, actions: List[Tuple[RankedTweet, TweetDecision]]) -> Dict[str, List[Dict]]:
+    def execute_actions(self, actions: List[Tuple[RankedTweet, TweetDecision]]) -> ActionResults:
         """
         Execute a list of actions.
         
+        Synchronous entry point that runs execute_actions_async to completion;
+        must not be called from inside a running event loop.
+        
+        Args:
+            actions: List of (ranked_tweet, decision) tuples
+        
+        Returns:
+            ActionResults with the outcome of every action
+        """
+        return asyncio.run(self.execute_actions_async(actions))
+    
+    async def execute_actions_async(self, actions: List[Tuple[RankedTweet, TweetDecision]]) -> ActionResults:
+        """
+        Execute a list of actions concurrently.
+        
+        Each Twitter call runs in a worker thread, with at most
+        `max_concurrent_actions` in flight and each action type paced by its
+        token bucket.
+        
         Args:
             actions: List of (ranked_tweet, decision) tuples
             
         Returns:
-            Dictionary with results grouped by action type
+            ActionResults with the outcome of every action
         """
         if not actions:
             logger.info("No actions to execute")
-            return {}
+            return ActionResults()
         
-        logger.info(f"Executing {len(actions)} actions")
+        logger.info("Executing %s actions", len(actions))
         
         # Check daily limits
         limits = self._check_daily_limits()
         
-        results = {
-            "successful": [],
-            "failed": [],
-            "skipped": []
-        }
+        results = ActionResults()
+        pending_actions = actions
         
-        executed_actions = []
+        # With both daily limits exhausted, skip every like/comment in one pass
+        if not limits["likes_available"] and not limits["replies_available"]:
+            pending_actions = [(rt, d) for rt, d in actions if d.decision not in self.LIMIT_REASONS]
+            for rt, d in actions:
+                if d.decision in self.LIMIT_REASONS:
+                    results.append_skipped(rt.tweet.id, d.decision, self.LIMIT_REASONS[d.decision])
+            logger.warning("Daily like and reply limits reached - skipping %s actions",
+                           results.skipped_count)
         
-        for ranked_tweet, decision in actions:
-            tweet = ranked_tweet.tweet
-            action = decision.decision
-            
-            try:
-                if action == "interesting":
-                    # Log interesting tweets but don't take action
-                    results["successful"].append({
-                        "tweet_id": tweet.id,
-                        "action": "interesting",
-                        "reason": "Logged as interesting"
-                    })
-                    logger.info(f"Tweet {tweet.id} logged as interesting")
-                
-                elif action == "like":
-                    if not limits["likes_available"]:
-                        results["skipped"].append({
-                            "tweet_id": tweet.id,
-                            "action": "like",
-                            "reason": "Daily like limit reached"
-                        })
-                        logger.warning(f"Skipping like for tweet {tweet.id} - daily limit reached")
-                        continue
-                    
-                    success = self.twitter_client.like_tweet(tweet.id)
-                    if success:
-                        results["successful"].append({
-                            "tweet_id": tweet.id,
-                            "action": "like",
-                            "reason": decision.reasoning
-                        })
-                        executed_actions.append("like")
-                        logger.info(f"Successfully liked tweet {tweet.id}")
-                    else:
-                        results["failed"].append({
-                            "tweet_id": tweet.id,
-                            "action": "like",
-                            "reason": "API call failed"
-                        })
-                        logger.error(f"Failed to like tweet {tweet.id}")
-                
-                elif action == "comment":
-                    if not limits["replies_available"]:
-                        results["skipped"].append({
-                            "tweet_id": tweet.id,
-                            "action": "comment",
-                            "reason": "Daily reply limit reached"
-                        })
-                        logger.warning(f"Skipping reply to tweet {tweet.id} - daily limit reached")
-                        continue
-                    
-                    comment_text = decision.comment.strip()
-                    if not comment_text:
-                        comment_text = "Thanks for sharing!"
-                    
-                    success = self.twitter_client.reply_to_tweet(tweet.id, comment_text)
-                    if success:
-                        results["successful"].append({
-                            "tweet_id": tweet.id,
-                            "action": "comment",
-                            "reason": decision.reasoning,
-                            "comment": comment_text
-                        })
-                        executed_actions.append("comment")
-                        logger.info(f"Successfully replied to tweet {tweet.id}")
-                    else:
-                        results["failed"].append({
-                            "tweet_id": tweet.id,
-                            "action": "comment",
-                            "reason": "API call failed",
-                            "comment": comment_text
-                        })
-                        logger.error(f"Failed to reply to tweet {tweet.id}")
-                
-                elif action == "dig_deeper":
-                    # This will be handled by the thread agent
-                    results["successful"].append({
-                        "tweet_id": tweet.id,
-                        "action": "dig_deeper",
-                        "reason": "Queued for thread analysis"
-                    })
-                    logger.info(f"Tweet {tweet.id} queued for thread analysis")
-                
-                else:
-                    logger.warning(f"Unknown action: {action}")
-                    results["failed"].append({
-                        "tweet_id": tweet.id,
-                        "action": action,
-                        "reason": "Unknown action type"
-                    })
-                
-                # Add small delay between actions to avoid rate limiting
-                time.sleep(1)
-                
-            except Exception as e:
-                logger.error(f"Error executing action {action} for tweet {tweet.id}: {e}")
-                results["failed"].append({
-                    "tweet_id": tweet.id,
-                    "action": action,
-                    "reason": f"Exception: {str(e)}"
-                })
-        
-        # Update action counters
-        self._update_action_counters(executed_actions)
+        semaphore = asyncio.Semaphore(settings.max_concurrent_actions)
+        
+        async def run_action(ranked_tweet: RankedTweet, decision: TweetDecision) -> None:
+            async with semaphore:
+                await self._execute_action(ranked_tweet, decision, limits, results)
+        
+        await asyncio.gather(*(run_action(rt, d) for rt, d in pending_actions))
         
         # Log summary
         total_actions = len(actions)
-        successful = len(results["successful"])
-        failed = len(results["failed"])
-        skipped = len(results["skipped"])
+        successful = results.successful_count
+        failed = results.failed_count
+        skipped = results.skipped_count
         
-        logger.info(f"Action execution complete: {successful}/{total_actions} successful, "
-                   f"{failed} failed, {skipped} skipped")
+        logger.info("Action execution complete: %s/%s successful, %s failed, %s skipped",
+                    successful, total_actions, failed, skipped)
+        logger.info("Daily actions: %s/%s likes, %s/%s replies",
+                    self.daily_likes, self._max_likes,
+                    self.daily_replies, self._max_replies)
         
         return results
     
+    async def _execute_action(self, ranked_tweet: RankedTweet, decision: TweetDecision,
+                              limits: Dict[str, bool], results: ActionResults) -> None:
+        """Execute a single action and record its outcome in `results`."""
+        tweet = ranked_tweet.tweet
+        action = decision.decision
+        
+        try:
+            handler = self._handlers.get(action)
+            if handler is None:
+                logger.warning("Unknown action: %s", action)
+                results.append_failed(tweet.id, action, "Unknown action type")
+                return
+            
+            await handler(tweet, decision, results, limits)
+        
+        except Exception as e:
+            logger.error("Error executing action %s for tweet %s: %s", action, tweet.id, e)
+            results.append_failed(tweet.id, action, f"Exception: {str(e)}")
+    
+    async def _handle_interesting(self, tweet: Tweet, decision: TweetDecision, results: ActionResults,
+                                  limits: Dict[str, bool]) -> None:
+        """Log interesting tweets but don't take action."""
+        results.append_successful(tweet.id, "interesting", "Logged as interesting")
+        logger.info("Tweet %s logged as interesting", tweet.id)
+    
+    async def _handle_like(self, tweet: Tweet, decision: TweetDecision, results: ActionResults,
+                           limits: Dict[str, bool]) -> None:
+        """Like a tweet if the daily like limit allows it."""
+        if not limits["likes_available"] or not await self._reserve_daily_slot("like"):
+            results.append_skipped(tweet.id, "like", self.LIMIT_REASONS["like"])
+            logger.warning("Skipping like for tweet %s - daily limit reached", tweet.id)
+            return
+        
+        success = False
+        try:
+            await self._wait_for_token(self.like_bucket, "like")
+            success = await asyncio.to_thread(self.twitter_client.like_tweet, tweet.id)
+        finally:
+            if not success:
+                await self._release_daily_slot("like")
+        
+        if success:
+            results.append_successful(tweet.id, "like", decision.reasoning)
+            logger.info("Successfully liked tweet %s", tweet.id)
+        else:
+            results.append_failed(tweet.id, "like", "API call failed")
+            logger.error("Failed to like tweet %s", tweet.id)
+    
+    async def _handle_comment(self, tweet: Tweet, decision: TweetDecision, results: ActionResults,
+                              limits: Dict[str, bool]) -> None:
+        """Reply to a tweet if the daily reply limit allows it."""
+        if not limits["replies_available"] or not await self._reserve_daily_slot("comment"):
+            results.append_skipped(tweet.id, "comment", self.LIMIT_REASONS["comment"])
+            logger.warning("Skipping reply to tweet %s - daily limit reached", tweet.id)
+            return
+        
+        comment_text = decision.comment.strip()
+        if not comment_text:
+            comment_text = "Thanks for sharing!"
+        
+        success = False
+        try:
+            await self._wait_for_token(self.reply_bucket, "comment")
+            success = await asyncio.to_thread(self.twitter_client.reply_to_tweet, tweet.id, comment_text)
+        finally:
+            if not success:
+                await self._release_daily_slot("comment")
+        
+        if success:
+            results.append_successful(tweet.id, "comment", decision.reasoning, comment_text)
+            logger.info("Successfully replied to tweet %s", tweet.id)
+        else:
+            results.append_failed(tweet.id, "comment", "API call failed", comment_text)
+            logger.error("Failed to reply to tweet %s", tweet.id)
+    
+    async def _handle_dig_deeper(self, tweet: Tweet, decision: TweetDecision, results: ActionResults,
+                                 limits: Dict[str, bool]) -> None:
+        """Queue a tweet for thread analysis, which is handled by the thread agent."""
+        results.append_successful(tweet.id, "dig_deeper", "Queued for thread analysis")
+        logger.info("Tweet %s queued for thread analysis", tweet.id)
+    
     def get_daily_stats(self) -> Dict[str, int]:
         """Get current daily action statistics."""
         self._check_daily_limits()  # Ensure counters are up to date
@@ -213,6 +358,6 @@ class ActionAgent(BaseAgent):
         return {
             "likes_today": self.daily_likes,
             "replies_today": self.daily_replies,
-            "likes_remaining": settings.max_likes_per_day - self.daily_likes,
-            "replies_remaining": settings.max_replies_per_day - self.daily_replies
+            "likes_remaining": self._max_likes - self.daily_likes,
+            "replies_remaining": self._max_replies - self.daily_replies
         }
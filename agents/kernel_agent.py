@@ -6,30 +6,77 @@ to determine appropriate actions for tweets.
 """
 
 import logging
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Tuple, Optional
 
-from google.adk.agents import BaseAgent
-from kernel.ranker import RankedTweet, SemanticRanker
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from kernel.ranker import RankedTweet, SemanticRanker, get_shared_ranker
 from kernel.decider import TweetDecider, TweetDecision
+from caching import TTLCache
+from storage import storage, StorageManager, CachedDecision
 from config import settings
 
 logger = logging.getLogger(__name__)
 
 
-class KernelAgent(BaseAgent):
+class KernelAgent:
     """Agent responsible for analyzing tweets and making decisions."""
     
-    def __init__(self, ranker: SemanticRanker = None, decider: TweetDecider = None):
+    # Priority order: dig_deeper > comment > like > interesting
+    PRIORITY_RANK = {"dig_deeper": 0, "comment": 1, "like": 2, "interesting": 3}
+    ACTION_TYPES = frozenset(PRIORITY_RANK)
+    
+    def __init__(self, ranker: SemanticRanker = None, decider: TweetDecider = None,
+                 storage_manager: StorageManager = None):
         """Initialize the kernel agent.
         
         Args:
-            ranker: Semantic ranker instance
+            ranker: Semantic ranker instance (defaults to the shared ranker)
             decider: Tweet decision engine instance
+            storage_manager: Storage used to persist decisions across restarts
         """
-        super().__init__(name="kernel_agent", description="Analyzes tweets and makes decisions")
-        self.ranker = ranker or SemanticRanker()
-        self.decider = decider or TweetDecider()
+        self.ranker = ranker or get_shared_ranker()
+        self.decider = decider or TweetDecider(ranker=self.ranker)
+        
+        # Decisions keyed by tweet ID, reused across cycles to skip repeat LLM calls
+        self.decision_cache = TTLCache(
+            maxsize=settings.decision_cache_size,
+            ttl=settings.decision_cache_ttl
+        )
+        self.storage = storage_manager or storage
+        self._load_cached_decisions()
+        
+        # Actionable decisions from the latest get_actionable_tweets call
+        self.last_total_decisions = 0
+    
+    def _load_cached_decisions(self) -> None:
+        """Warm the decision cache with persisted decisions that have not expired."""
+        now = time.time()
+        records = self.storage.get_recent_decisions(
+            settings.decision_cache_ttl,
+            limit=settings.decision_cache_size
+        )
+        
+        # Insert oldest first so the newest decisions are the most recently used
+        for record in reversed(records):
+            decision = TweetDecision(
+                decision=record.decision,
+                comment=record.comment,
+                confidence=record.confidence,
+                reasoning=record.reasoning
+            )
+            remaining_ttl = record.decided_at + settings.decision_cache_ttl - now
+            self.decision_cache.set(record.tweet_id, decision, ttl=remaining_ttl)
         
+        if records:
+            logger.info("Loaded %s cached decisions from storage", len(records))
+    
     def analyze_and_decide(self, ranked_tweets: List[RankedTweet], 
                           context: Dict = None) -> List[Tuple[RankedTweet, TweetDecision]]:
         """
@@ -46,10 +93,36 @@ class KernelAgent(BaseAgent):
             logger.info("No tweets to analyze")
             return []
         
-        logger.info(f"Analyzing {len(ranked_tweets)} ranked tweets")
+        logger.info("Analyzing %s ranked tweets", len(ranked_tweets))
+        
+        # Reuse cached decisions; only context-free decisions are cached since
+        # extra context can change the outcome for the same tweet
+        known: Dict[str, TweetDecision] = {}
+        to_decide = []
+        for ranked_tweet in ranked_tweets:
+            cached = self.decision_cache.get(ranked_tweet.tweet.id) if context is None else None
+            if cached is not None:
+                known[ranked_tweet.tweet.id] = cached
+            else:
+                to_decide.append(ranked_tweet)
+        
+        if known:
+            logger.info("Decision cache: %s hits, %s misses", len(known), len(to_decide))
+        
+        # Make decisions for the remaining tweets
+        if to_decide:
+            new_decisions = self._decide_in_batches(to_decide, context)
+            for ranked_tweet, decision in new_decisions:
+                known[ranked_tweet.tweet.id] = decision
+            
+            if context is None:
+                self._cache_decisions(new_decisions)
         
-        # Make decisions for all tweets
-        decisions = self.decider.batch_decide(ranked_tweets, context)
+        decisions = [
+            (ranked_tweet, known[ranked_tweet.tweet.id])
+            for ranked_tweet in ranked_tweets
+            if ranked_tweet.tweet.id in known
+        ]
         
         # Filter by confidence threshold
         filtered_decisions = self.decider.filter_by_confidence(
@@ -57,9 +130,57 @@ class KernelAgent(BaseAgent):
             settings.kernel_confidence_threshold
         )
         
-        logger.info(f"Analysis complete: {len(filtered_decisions)} decisions above confidence threshold")
+        logger.info("Analysis complete: %s decisions above confidence threshold", len(filtered_decisions))
         return filtered_decisions
     
+    def _decide_in_batches(self, ranked_tweets: List[RankedTweet],
+                           context: Dict = None) -> List[Tuple[RankedTweet, TweetDecision]]:
+        """
+        Run the decider over mini-batches of tweets, several batches at a time.
+        
+        Each batch goes to the LLM as a single request, so the shared instructions
+        are sent once per batch rather than once per tweet.
+        
+        Args:
+            ranked_tweets: List of ranked tweets to decide on
+            context: Additional context for decision making
+        
+        Returns:
+            List of tuples (ranked_tweet, decision) in input order
+        """
+        batch_size = max(1, settings.decision_batch_size)
+        batches = [
+            ranked_tweets[i:i + batch_size]
+            for i in range(0, len(ranked_tweets), batch_size)
+        ]
+        
+        if len(batches) == 1:
+            return self.decider.batch_decide(batches[0], context)
+        
+        logger.info("Deciding on %s tweets in %s batches", len(ranked_tweets), len(batches))
+        
+        workers = min(len(batches), max(1, settings.decision_batch_workers))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            batch_results = executor.map(lambda batch: self.decider.batch_decide(batch, context), batches)
+            return [item for batch_result in batch_results for item in batch_result]
+    
+    def _cache_decisions(self, decisions: List[Tuple[RankedTweet, TweetDecision]]) -> None:
+        """Add new decisions to the in-memory cache and persist them in one batch."""
+        decided_at = time.time()
+        records = []
+        for ranked_tweet, decision in decisions:
+            self.decision_cache.set(ranked_tweet.tweet.id, decision)
+            records.append(CachedDecision(
+                tweet_id=ranked_tweet.tweet.id,
+                decision=decision.decision,
+                comment=decision.comment,
+                confidence=decision.confidence,
+                reasoning=decision.reasoning,
+                decided_at=decided_at
+            ))
+        
+        self.storage.save_decisions(records)
+    
     def get_actionable_tweets(self, ranked_tweets: List[RankedTweet], 
                              context: Dict = None) -> Dict[str, List[Tuple[RankedTweet, TweetDecision]]]:
         """
@@ -70,31 +191,27 @@ class KernelAgent(BaseAgent):
             context: Additional context for decision making
             
         Returns:
-            Dictionary mapping action types to lists of (tweet, decision) tuples
+            Dictionary mapping action types to lists of (tweet, decision) tuples;
+            action types without any tweets are left out
         """
         decisions = self.analyze_and_decide(ranked_tweets, context)
         
-        # Group by decision type
-        action_groups = {
-            "interesting": [],
-            "like": [],
-            "comment": [],
-            "dig_deeper": []
-        }
-        
+        # Group by decision type, creating groups only as they are used
+        action_groups = defaultdict(list)
+        total_actions = 0
         for ranked_tweet, decision in decisions:
             action = decision.decision
-            if action in action_groups:
+            if action in self.ACTION_TYPES:
                 action_groups[action].append((ranked_tweet, decision))
+                total_actions += 1
+        self.last_total_decisions = total_actions
         
         # Log summary
-        total_actions = sum(len(group) for group in action_groups.values())
-        logger.info(f"Action summary: {total_actions} total actions")
+        logger.info("Action summary: %s total actions", total_actions)
         for action, tweets in action_groups.items():
-            if tweets:
-                logger.info(f"  {action}: {len(tweets)} tweets")
+            logger.info("  %s: %s tweets", action, len(tweets))
         
-        return action_groups
+        return dict(action_groups)
     
     def prioritize_actions(self, action_groups: Dict[str, List[Tuple[RankedTweet, TweetDecision]]], 
                           max_actions: int = None) -> List[Tuple[RankedTweet, TweetDecision]]:
@@ -110,20 +227,31 @@ class KernelAgent(BaseAgent):
         """
         max_actions = max_actions or settings.max_tweets_per_run
         
-        # Combine all actions and sort by priority
+        # Flatten the groups we prioritize, tagging each action with its group rank
         all_actions = []
-        
-        # Priority order: dig_deeper > comment > like > interesting
-        priority_order = ["dig_deeper", "comment", "like", "interesting"]
-        
-        for action in priority_order:
-            if action in action_groups:
-                # Sort by confidence within each action type
-                actions = sorted(action_groups[action], key=lambda x: x[1].confidence, reverse=True)
+        priorities = []
+        for action, actions in action_groups.items():
+            rank = self.PRIORITY_RANK.get(action)
+            if rank is not None:
                 all_actions.extend(actions)
+                priorities.extend([rank] * len(actions))
+        
+        # Sort by priority, then by confidence (highest first) within each action type
+        if np is not None and all_actions:
+            confidences = np.fromiter((d.confidence for _, d in all_actions), dtype=np.float64,
+                                      count=len(all_actions))
+            order = np.lexsort((-confidences, np.asarray(priorities)))
+            all_actions = [all_actions[i] for i in order]
+        else:
+            all_actions = [
+                action for _, action in sorted(
+                    zip(priorities, all_actions),
+                    key=lambda x: (x[0], -x[1][1].confidence)
+                )
+            ]
         
         # Take top actions
         prioritized = all_actions[:max_actions]
         
-        logger.info(f"Prioritized {len(prioritized)} actions from {len(all_actions)} total")
+        logger.info("Prioritized %s actions from %s total", len(prioritized), len(all_actions))
         return prioritized
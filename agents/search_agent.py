@@ -5,18 +5,21 @@ This agent handles searching for tweets based on configured search terms
 and returns ranked results for further processing.
 """
 
+import heapq
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import chain
+from operator import attrgetter
 from typing import List, Dict, Optional
 
-from google.adk.agents import BaseAgent
-from sources.tweepy_client import TweepyTwitterClient, SearchResult
-from kernel.ranker import SemanticRanker, RankedTweet
+from sources.tweepy_client import TweepyTwitterClient, SearchResult, Tweet
+from kernel.ranker import SemanticRanker, RankedTweet, get_shared_ranker
 from config import settings
 
 logger = logging.getLogger(__name__)
 
 
-class SearchAgent(BaseAgent):
+class SearchAgent:
     """Agent responsible for searching and ranking tweets."""
     
     def __init__(self, twitter_client: TweepyTwitterClient = None, ranker: SemanticRanker = None):
@@ -24,54 +27,79 @@ class SearchAgent(BaseAgent):
         
         Args:
             twitter_client: Twitter client instance
-            ranker: Semantic ranker instance
+            ranker: Semantic ranker instance (defaults to the shared ranker)
         """
-        super().__init__(name="search_agent", description="Searches and ranks tweets")
         self.twitter_client = twitter_client or TweepyTwitterClient()
-        self.ranker = ranker or SemanticRanker()
+        self.ranker = ranker or get_shared_ranker()
         
-    def search_for_term(self, search_term: str, max_results: int = None) -> List[RankedTweet]:
+        # Ranked tweets found by the latest multi-term search, counted per term
+        self.last_total_found = 0
+    
+    def _fetch_tweets(self, search_term: str, max_results: int = None) -> List[Tweet]:
         """
-        Search for tweets matching a specific term.
+        Fetch raw (unranked) tweets matching a specific term.
         
         Args:
             search_term: The search term to look for
             max_results: Maximum number of results
             
         Returns:
-            List of ranked tweets
+            List of tweets, empty if the search failed
         """
         max_results = max_results or settings.max_tweets_per_run
         
         # Create search query (exclude retweets and replies to reduce noise)
         query = f"{search_term} -is:retweet -is:reply"
         
-        logger.info(f"Searching for tweets with query: {query}")
+        logger.info("Searching for tweets with query: %s", query)
         
         try:
-            # Search for tweets
             search_result = self.twitter_client.search_tweets(query, max_results=max_results)
+        except Exception as e:
+            logger.error("Error searching for term '%s': %s", search_term, e)
+            return []
+        
+        if not search_result.tweets:
+            logger.info("No tweets found for search term: %s", search_term)
+            return []
+        
+        logger.info("Found %s tweets for '%s'", len(search_result.tweets), search_term)
+        return search_result.tweets
+    
+    def search_for_term(self, search_term: str, max_results: int = None) -> List[RankedTweet]:
+        """
+        Search for tweets matching a specific term.
+        
+        Args:
+            search_term: The search term to look for
+            max_results: Maximum number of results
             
-            if not search_result.tweets:
-                logger.info(f"No tweets found for search term: {search_term}")
-                return []
-            
-            logger.info(f"Found {len(search_result.tweets)} tweets for '{search_term}'")
-            
+        Returns:
+            List of ranked tweets
+        """
+        tweets = self._fetch_tweets(search_term, max_results)
+        if not tweets:
+            return []
+        
+        try:
             # Rank the tweets semantically
             ranked_tweets = self.ranker.rank_tweets(
-                search_result.tweets, 
+                tweets, 
                 [search_term],
                 min_score=0.3
             )
             
-            logger.info(f"Ranked {len(ranked_tweets)} tweets above threshold")
+            logger.info("Ranked %s tweets above threshold", len(ranked_tweets))
             return ranked_tweets
             
         except Exception as e:
-            logger.error(f"Error searching for term '{search_term}': {e}")
+            logger.error("Error ranking tweets for term '%s': %s", search_term, e)
             return []
     
+    def _search_workers(self, search_terms: List[str]) -> int:
+        """Thread pool size for searching several terms at once."""
+        return min(len(search_terms), max(1, settings.search_concurrency))
+    
     def search_multiple_terms(self, search_terms: List[str] = None) -> Dict[str, List[RankedTweet]]:
         """
         Search for multiple terms and return results grouped by term.
@@ -83,18 +111,91 @@ class SearchAgent(BaseAgent):
             Dictionary mapping search terms to ranked tweet lists
         """
         search_terms = search_terms or settings.search_terms
-        results = {}
+        if not search_terms:
+            return {}
+        
+        # Keep results in the configured term order regardless of completion order
+        results = dict.fromkeys(search_terms)
+        total_tweets = 0
         
-        for term in search_terms:
-            logger.info(f"Searching for term: {term}")
-            ranked_tweets = self.search_for_term(term)
-            results[term] = ranked_tweets
+        # Terms are independent and IO-bound, so search them concurrently
+        with ThreadPoolExecutor(max_workers=self._search_workers(search_terms)) as executor:
+            futures = {}
+            for term in search_terms:
+                logger.info("Searching for term: %s", term)
+                futures[executor.submit(self.search_for_term, term)] = term
+            
+            for future in as_completed(futures):
+                ranked_tweets = future.result()
+                results[futures[future]] = ranked_tweets
+                total_tweets += len(ranked_tweets)
         
-        total_tweets = sum(len(tweets) for tweets in results.values())
-        logger.info(f"Search completed. Found {total_tweets} total ranked tweets across {len(search_terms)} terms")
+        self.last_total_found = total_tweets
+        logger.info("Search completed. Found %s total ranked tweets across %s terms", total_tweets, len(search_terms))
         
         return results
     
+    def search_and_rank_all(self, search_terms: List[str] = None) -> Dict[str, List[RankedTweet]]:
+        """
+        Search for multiple terms and rank all results in a single ranker pass.
+        
+        Unlike search_multiple_terms, which ranks each term's tweets separately,
+        this fetches every term first and embeds the combined candidate set once.
+        Each tweet is scored against its closest search term.
+        
+        Args:
+            search_terms: List of search terms (defaults to configured terms)
+        
+        Returns:
+            Dictionary mapping search terms to ranked tweet lists. A tweet found
+            by several terms appears under each of them.
+        """
+        search_terms = search_terms or settings.search_terms
+        if not search_terms:
+            return {}
+        
+        # Fetch raw tweets for every term concurrently
+        term_tweets = dict.fromkeys(search_terms)
+        with ThreadPoolExecutor(max_workers=self._search_workers(search_terms)) as executor:
+            futures = {executor.submit(self._fetch_tweets, term): term for term in search_terms}
+            for future in as_completed(futures):
+                term_tweets[futures[future]] = future.result()
+        
+        # Flatten into one candidate list, remembering which terms found each tweet
+        all_tweets = []
+        tweet_to_terms = {}
+        for term, tweets in term_tweets.items():
+            for tweet in tweets:
+                if tweet.id not in tweet_to_terms:
+                    tweet_to_terms[tweet.id] = []
+                    all_tweets.append(tweet)
+                tweet_to_terms[tweet.id].append(term)
+        
+        results = {term: [] for term in search_terms}
+        self.last_total_found = 0
+        if not all_tweets:
+            logger.info("Search completed. No tweets found for any term")
+            return results
+        
+        try:
+            ranked_tweets = self.ranker.rank_tweets_by_terms(all_tweets, search_terms, min_score=0.3)
+        except Exception as e:
+            logger.error("Error ranking search results: %s", e)
+            return results
+        
+        # Partition back by originating term (ranked order is preserved)
+        total_found = 0
+        for ranked_tweet in ranked_tweets:
+            terms = tweet_to_terms[ranked_tweet.tweet.id]
+            for term in terms:
+                results[term].append(ranked_tweet)
+            total_found += len(terms)
+        self.last_total_found = total_found
+        
+        logger.info("Search completed. Ranked %s of %s unique tweets across %s terms",
+                    len(ranked_tweets), len(all_tweets), len(search_terms))
+        return results
+    
     def get_top_tweets(self, search_terms: List[str] = None, top_n: int = 10) -> List[RankedTweet]:
         """
         Get the top N tweets across all search terms.
@@ -108,14 +209,9 @@ class SearchAgent(BaseAgent):
         """
         results = self.search_multiple_terms(search_terms)
         
-        # Flatten and sort all tweets by score
-        all_tweets = []
-        for term, tweets in results.items():
-            all_tweets.extend(tweets)
-        
-        # Sort by score (highest first) and take top N
-        all_tweets.sort(key=lambda x: x.score, reverse=True)
-        top_tweets = all_tweets[:top_n]
+        # Flatten all tweets and select the N best scores without a full sort
+        all_tweets = list(chain.from_iterable(results.values()))
+        top_tweets = heapq.nlargest(top_n, all_tweets, key=attrgetter("score"))
         
-        logger.info(f"Selected top {len(top_tweets)} tweets from {len(all_tweets)} total")
+        logger.info("Selected top %s tweets from %s total", len(top_tweets), len(all_tweets))
         return top_tweets
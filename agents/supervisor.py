@@ -5,34 +5,32 @@ This agent coordinates all other agents to implement the complete workflow:
 search -> rank -> decide -> act -> dig deeper.
 """
 
+import asyncio
 import logging
 import time
 from typing import List, Dict, Optional, Tuple
 
-from google.adk.agents import BaseAgent
 from sources.tweepy_client import TweepyTwitterClient
-from kernel.ranker import SemanticRanker, RankedTweet
+from kernel.ranker import RankedTweet, get_shared_ranker
 from kernel.decider import TweetDecider, TweetDecision
 from agents.search_agent import SearchAgent
 from agents.kernel_agent import KernelAgent
-from agents.action_agent import ActionAgent
+from agents.action_agent import ActionAgent, ActionResults
 from agents.thread_agent import ThreadAgent
 from config import settings
 
 logger = logging.getLogger(__name__)
 
 
-class SupervisorAgent(BaseAgent):
+class SupervisorAgent:
     """Supervisor agent that orchestrates the complete workflow."""
     
     def __init__(self):
         """Initialize the supervisor agent and all sub-agents."""
-        super().__init__(name="supervisor_agent", description="Orchestrates social media automation")
-        
         # Initialize components
         self.twitter_client = TweepyTwitterClient()
-        self.ranker = SemanticRanker()
-        self.decider = TweetDecider()
+        self.ranker = get_shared_ranker()
+        self.decider = TweetDecider(ranker=self.ranker)
         
         # Initialize agents
         self.search_agent = SearchAgent(self.twitter_client, self.ranker)
@@ -54,7 +52,7 @@ class SupervisorAgent(BaseAgent):
         """
         search_terms = search_terms or settings.search_terms
         
-        logger.info(f"Starting automation cycle with search terms: {search_terms}")
+        logger.info("Starting automation cycle with search terms: %s", search_terms)
         cycle_start_time = time.time()
         
         results = {
@@ -62,29 +60,35 @@ class SupervisorAgent(BaseAgent):
             "search_terms": search_terms,
             "search_results": {},
             "kernel_results": {},
-            "action_results": {},
-            "thread_results": {},
+            "action_results": ActionResults(),
+            "thread_results": ActionResults(),
             "summary": {}
         }
         
         try:
             # Step 1: Search for tweets
             logger.info("Step 1: Searching for tweets")
-            search_results = self.search_agent.search_multiple_terms(search_terms)
+            search_results = self.search_agent.search_and_rank_all(search_terms)
             results["search_results"] = {
                 term: len(tweets) for term, tweets in search_results.items()
             }
             
-            # Combine all ranked tweets
-            all_ranked_tweets = []
-            for term, tweets in search_results.items():
-                all_ranked_tweets.extend(tweets)
+            # Combine all ranked tweets, keeping the best-scored copy of tweets
+            # matched by several terms so each one is only decided on once
+            unique_tweets: Dict[str, RankedTweet] = {}
+            for tweets in search_results.values():
+                for ranked_tweet in tweets:
+                    existing = unique_tweets.get(ranked_tweet.tweet.id)
+                    if existing is None or ranked_tweet.score > existing.score:
+                        unique_tweets[ranked_tweet.tweet.id] = ranked_tweet
+            all_ranked_tweets = list(unique_tweets.values())
             
             if not all_ranked_tweets:
                 logger.info("No tweets found in search phase")
                 return results
             
-            logger.info(f"Found {len(all_ranked_tweets)} total ranked tweets")
+            logger.info("Found %s unique ranked tweets (%s duplicates across terms removed)",
+                        len(all_ranked_tweets), self.search_agent.last_total_found - len(all_ranked_tweets))
             
             # Step 2: Analyze and decide on actions
             logger.info("Step 2: Analyzing tweets and making decisions")
@@ -105,7 +109,7 @@ class SupervisorAgent(BaseAgent):
                 results["action_results"] = action_results
             else:
                 logger.info("No immediate actions to execute")
-                results["action_results"] = {"successful": [], "failed": [], "skipped": []}
+                results["action_results"] = ActionResults()
             
             # Step 4: Handle "dig_deeper" actions
             logger.info("Step 4: Analyzing conversation threads")
@@ -127,39 +131,43 @@ class SupervisorAgent(BaseAgent):
                     results["thread_results"] = thread_results
                 else:
                     logger.info("No thread actions to execute")
-                    results["thread_results"] = {"successful": [], "failed": [], "skipped": []}
+                    results["thread_results"] = ActionResults()
             else:
                 logger.info("No threads to analyze")
-                results["thread_results"] = {"successful": [], "failed": [], "skipped": []}
+                results["thread_results"] = ActionResults()
             
             # Step 5: Generate summary
             cycle_duration = time.time() - cycle_start_time
             results["summary"] = self._generate_summary(results, cycle_duration)
             
-            logger.info(f"Automation cycle completed in {cycle_duration:.2f} seconds")
+            logger.info("Automation cycle completed in %.2f seconds", cycle_duration)
             return results
             
         except Exception as e:
-            logger.error(f"Error in automation cycle: {e}")
+            logger.error("Error in automation cycle: %s", e)
             results["error"] = str(e)
             return results
+        
+        finally:
+            # Lookups cached during this cycle would be stale by the next one
+            self.twitter_client.clear_cache()
     
     def _generate_summary(self, results: Dict, cycle_duration: float) -> Dict[str, any]:
         """Generate a summary of the cycle results."""
         summary = {
             "cycle_duration": cycle_duration,
-            "total_tweets_found": sum(results["search_results"].values()),
-            "total_decisions_made": sum(results["kernel_results"].values()),
+            "total_tweets_found": self.search_agent.last_total_found,
+            "total_decisions_made": self.kernel_agent.last_total_decisions,
             "actions_executed": 0,
             "thread_actions_executed": 0
         }
         
         # Count executed actions
         if "action_results" in results:
-            summary["actions_executed"] = len(results["action_results"].get("successful", []))
+            summary["actions_executed"] = results["action_results"].successful_count
         
         if "thread_results" in results:
-            summary["thread_actions_executed"] = len(results["thread_results"].get("successful", []))
+            summary["thread_actions_executed"] = results["thread_results"].successful_count
         
         # Add daily stats
         summary["daily_stats"] = self.action_agent.get_daily_stats()
@@ -176,11 +184,11 @@ class SupervisorAgent(BaseAgent):
         }
         
         try:
-            # Test Twitter credentials
-            validation_results["twitter_credentials"] = self.twitter_client.validate_credentials()
-            
-            # Test model connection
-            validation_results["model_connection"] = self.decider.model_adapter.validate_connection()
+            # Test Twitter credentials and model connection concurrently, on the
+            # decider's event loop so async model clients stay on one loop
+            twitter_ok, model_ok = self.decider.run_coroutine(self._validate_connections_async())
+            validation_results["twitter_credentials"] = twitter_ok
+            validation_results["model_connection"] = model_ok
             
             # Test semantic ranker
             validation_results["semantic_ranker"] = self.ranker.is_available()
@@ -188,13 +196,20 @@ class SupervisorAgent(BaseAgent):
             # Test database (would need storage module)
             validation_results["database_connection"] = True  # Placeholder
             
-            logger.info(f"Setup validation results: {validation_results}")
+            logger.info("Setup validation results: %s", validation_results)
             return validation_results
             
         except Exception as e:
-            logger.error(f"Error during setup validation: {e}")
+            logger.error("Error during setup validation: %s", e)
             return validation_results
     
+    async def _validate_connections_async(self) -> Tuple[bool, bool]:
+        """Check Twitter credentials and the model connection at the same time."""
+        return tuple(await asyncio.gather(
+            asyncio.to_thread(self.twitter_client.validate_credentials),
+            self.decider.model_adapter.avalidate_connection()
+        ))
+    
     def get_status(self) -> Dict[str, any]:
         """Get current status of the supervisor and all agents."""
         return {
@@ -5,89 +5,120 @@ This agent handles the "dig_deeper" action by retrieving and analyzing
 conversation replies to find valuable interactions.
 """
 
+import heapq
 import logging
 import random
-from typing import List, Dict, Tuple, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import List, Dict, Tuple, Optional, Set
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
-from google.adk.agents import BaseAgent
 from sources.tweepy_client import TweepyTwitterClient
 from kernel.decider import TweetDecider, TweetDecision
-from kernel.ranker import RankedTweet, SemanticRanker
+from kernel.ranker import RankedTweet, SemanticRanker, get_shared_ranker
+from storage import storage, StorageManager
 from config import settings
 
 logger = logging.getLogger(__name__)
 
 
-class ThreadAgent(BaseAgent):
+class ThreadAgent:
     """Agent responsible for analyzing conversation threads."""
     
     def __init__(self, twitter_client: TweepyTwitterClient = None, 
-                 decider: TweetDecider = None, ranker: SemanticRanker = None):
+                 decider: TweetDecider = None, ranker: SemanticRanker = None,
+                 storage_manager: StorageManager = None):
         """Initialize the thread agent.
         
         Args:
             twitter_client: Twitter client instance
             decider: Tweet decision engine instance
-            ranker: Semantic ranker instance
+            ranker: Semantic ranker instance (defaults to the shared ranker)
+            storage_manager: Storage holding the newest reply fetched per conversation
         """
-        super().__init__(name="thread_agent", description="Analyzes conversation threads")
         self.twitter_client = twitter_client or TweepyTwitterClient()
-        self.decider = decider or TweetDecider()
-        self.ranker = ranker or SemanticRanker()
+        self.ranker = ranker or get_shared_ranker()
+        self.decider = decider or TweetDecider(ranker=self.ranker)
+        self.storage = storage_manager or storage
         
-    def analyze_thread(self, tweet: RankedTweet, max_depth: int = None) -> List[Tuple[RankedTweet, TweetDecision]]:
+        # Guards the seen-reply set shared by concurrent thread analyses
+        self._seen_lock = threading.Lock()
+    
+    def analyze_thread(self, tweet: RankedTweet, max_depth: int = None,
+                       seen_ids: Optional[Set[str]] = None) -> List[Tuple[RankedTweet, TweetDecision]]:
         """
         Analyze a conversation thread for valuable replies.
         
         Args:
             tweet: The original tweet to analyze
             max_depth: Maximum depth of thread analysis
+            seen_ids: Reply IDs already analyzed in the current run; replies in it
+                are skipped and the ones analyzed here are added to it
             
         Returns:
             List of (ranked_tweet, decision) tuples for thread replies
         """
         max_depth = max_depth or settings.max_conversation_depth
+        min_confidence = settings.kernel_confidence_threshold
         
         if not tweet.tweet.conversation_id:
-            logger.warning(f"No conversation ID for tweet {tweet.tweet.id}")
+            logger.warning("No conversation ID for tweet %s", tweet.tweet.id)
             return []
         
-        logger.info(f"Analyzing thread for tweet {tweet.tweet.id} (conversation: {tweet.tweet.conversation_id})")
+        logger.info("Analyzing thread for tweet %s (conversation: %s)", tweet.tweet.id, tweet.tweet.conversation_id)
         
         try:
-            # Get conversation replies
+            # Get replies posted since the thread was last fetched; ranking and
+            # decisions only read their text
+            conversation_id = str(tweet.tweet.conversation_id)
             replies = self.twitter_client.get_conversation_replies(
-                tweet.tweet.conversation_id,
-                max_results=20
+                conversation_id,
+                max_results=20,
+                fields=frozenset(),
+                since_id=self.storage.get_conversation_cursor(conversation_id)
             )
             
             if not replies:
-                logger.info(f"No replies found for conversation {tweet.tweet.conversation_id}")
+                logger.info("No new replies found for conversation %s", conversation_id)
                 return []
             
-            logger.info(f"Found {len(replies)} replies in conversation")
+            # Only moved once the replies are dealt with, so a failure below
+            # leaves them to be fetched again by the next scan
+            newest_id = str(max(int(reply.id) for reply in replies))
             
-            # Filter out the original tweet and any we've already processed
-            filtered_replies = [
-                reply for reply in replies 
-                if reply.id != tweet.tweet.id
-            ]
+            logger.info("Found %s replies in conversation", len(replies))
+            
+            # Filter out the original tweet and any we've already processed,
+            # claiming the rest so concurrent thread analyses skip them
+            if seen_ids is None:
+                filtered_replies = [reply for reply in replies if reply.id != tweet.tweet.id]
+            else:
+                with self._seen_lock:
+                    filtered_replies = [
+                        reply for reply in replies
+                        if reply.id != tweet.tweet.id and reply.id not in seen_ids
+                    ]
+                    seen_ids.update(reply.id for reply in filtered_replies)
             
             if not filtered_replies:
                 logger.info("No new replies to analyze")
+                self.storage.set_conversation_cursor(conversation_id, newest_id)
                 return []
             
-            # Rank the replies
-            ranked_replies = self.ranker.rank_tweets(
+            # Rank the replies, keeping the top 10
+            top_replies = self.ranker.rank_tweets(
                 filtered_replies,
                 [tweet.tweet.text],  # Use original tweet text as context
-                min_score=0.2  # Lower threshold for thread analysis
+                min_score=0.2,  # Lower threshold for thread analysis
+                top_k=10
             )
             
-            logger.info(f"Ranked {len(ranked_replies)} replies above threshold")
-            
-            # Analyze top replies
-            top_replies = ranked_replies[:10]  # Limit to top 10 replies
+            logger.info("Ranked %s top replies above threshold", len(top_replies))
             
             # Make decisions for replies
             reply_decisions = self.decider.batch_decide(
@@ -101,15 +132,16 @@ class ThreadAgent(BaseAgent):
             # Filter by confidence and focus on actionable decisions
             actionable_decisions = []
             for ranked_reply, decision in reply_decisions:
-                if (decision.confidence >= settings.kernel_confidence_threshold and
-                    decision.decision in ["like", "comment"]):
+                if (decision.confidence >= min_confidence and
+                    decision.decision in ("like", "comment")):
                     actionable_decisions.append((ranked_reply, decision))
             
-            logger.info(f"Found {len(actionable_decisions)} actionable replies in thread")
+            logger.info("Found %s actionable replies in thread", len(actionable_decisions))
+            self.storage.set_conversation_cursor(conversation_id, newest_id)
             return actionable_decisions
             
         except Exception as e:
-            logger.error(f"Error analyzing thread for tweet {tweet.tweet.id}: {e}")
+            logger.error("Error analyzing thread for tweet %s: %s", tweet.tweet.id, e)
             return []
     
     def analyze_multiple_threads(self, tweets: List[RankedTweet]) -> Dict[str, List[Tuple[RankedTweet, TweetDecision]]]:
@@ -124,16 +156,26 @@ class ThreadAgent(BaseAgent):
         """
         results = {}
         
+        threads = []
         for tweet in tweets:
             if tweet.tweet.conversation_id:
-                thread_results = self.analyze_thread(tweet)
-                if thread_results:
-                    results[tweet.tweet.id] = thread_results
+                threads.append(tweet)
             else:
-                logger.debug(f"Skipping tweet {tweet.tweet.id} - no conversation ID")
+                logger.debug("Skipping tweet %s - no conversation ID", tweet.tweet.id)
+        
+        # Each thread is an API fetch plus LLM calls, so analyze them concurrently;
+        # map() keeps the results in input order. Replies reached through
+        # overlapping conversations are only ranked and decided once per run.
+        if threads:
+            workers = min(len(threads), max(1, settings.thread_concurrency))
+            analyze = partial(self.analyze_thread, seen_ids=set())
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for tweet, thread_results in zip(threads, executor.map(analyze, threads)):
+                    if thread_results:
+                        results[tweet.tweet.id] = thread_results
         
         total_thread_actions = sum(len(actions) for actions in results.values())
-        logger.info(f"Thread analysis complete: {total_thread_actions} total actions across {len(results)} threads")
+        logger.info("Thread analysis complete: %s total actions across %s threads", total_thread_actions, len(results))
         
         return results
     
@@ -159,11 +201,15 @@ class ThreadAgent(BaseAgent):
         if not all_actions:
             return []
         
-        # Sort by confidence and randomize slightly to avoid predictable patterns
-        all_actions.sort(key=lambda x: (x[1].confidence, random.random()), reverse=True)
-        
-        # Take top actions
-        prioritized = all_actions[:max_actions]
-        
-        logger.info(f"Prioritized {len(prioritized)} thread actions from {len(all_actions)} total")
+        # Take top actions by confidence, randomizing ties to avoid predictable patterns
+        if np is not None:
+            confidences = np.fromiter((d.confidence for _, d in all_actions), dtype=np.float64,
+                                      count=len(all_actions))
+            tiebreaks = np.random.random(len(all_actions))
+            order = np.lexsort((tiebreaks, confidences))[::-1][:max_actions]
+            prioritized = [all_actions[i] for i in order]
+        else:
+            prioritized = heapq.nlargest(max_actions, all_actions, key=lambda x: (x[1].confidence, random.random()))
+        
+        logger.info("Prioritized %s thread actions from %s total", len(prioritized), len(all_actions))
         return prioritized
@@ -26,29 +26,43 @@ class Settings(BaseSettings):
     twitter_api_secret: Optional[str] = Field(None, env="TWITTER_API_SECRET")
     twitter_access_token: Optional[str] = Field(None, env="TWITTER_ACCESS_TOKEN")
     twitter_access_token_secret: Optional[str] = Field(None, env="TWITTER_ACCESS_TOKEN_SECRET")
+    twitter_lookup_cache_size: int = Field(4096, env="TWITTER_LOOKUP_CACHE_SIZE")
+    twitter_lookup_cache_ttl: int = Field(300, env="TWITTER_LOOKUP_CACHE_TTL")  # one rate-limit window
     
     # Model Configuration
     model_name: str = Field("gemini-2.0-flash-exp", env="MODEL_NAME")
     google_api_key: Optional[str] = Field(None, env="GOOGLE_API_KEY")
     openai_api_key: Optional[str] = Field(None, env="OPENAI_API_KEY")
+    llm_max_connections: int = Field(20, env="LLM_MAX_CONNECTIONS")  # pooled keep-alive connections
+    llm_request_timeout: float = Field(30.0, env="LLM_REQUEST_TIMEOUT")  # seconds
     
     # Search Configuration
     search_terms: List[str] = Field(default=["python", "AI", "agent"], env="SEARCH_TERMS")
     max_tweets_per_run: int = Field(10, env="MAX_TWEETS_PER_RUN")
+    search_concurrency: int = Field(8, env="SEARCH_CONCURRENCY")  # search terms fetched in parallel
     
     # Rate Limiting and Safety
     max_likes_per_day: int = Field(20, env="MAX_LIKES_PER_DAY")
     max_replies_per_day: int = Field(10, env="MAX_REPLIES_PER_DAY")
     rate_limit_backoff: int = Field(60, env="RATE_LIMIT_BACKOFF")
+    action_bucket_capacity: int = Field(50, env="ACTION_BUCKET_CAPACITY")  # Twitter v2: 50 likes/replies
+    action_bucket_window: int = Field(900, env="ACTION_BUCKET_WINDOW")  # per 15-minute window
+    max_concurrent_actions: int = Field(5, env="MAX_CONCURRENT_ACTIONS")
     
     # Database Configuration
     database_path: str = Field("/tmp/agent_state.db", env="DATABASE_PATH")
+    storage_write_batch_size: int = Field(100, env="STORAGE_WRITE_BATCH_SIZE")  # buffered rows per flush
+    storage_write_flush_interval: float = Field(1.0, env="STORAGE_WRITE_FLUSH_INTERVAL")  # max seconds a row waits
+    storage_optimize_interval: int = Field(900, env="STORAGE_OPTIMIZE_INTERVAL")  # seconds between PRAGMA optimize
+    storage_checkpoint_interval: int = Field(3600, env="STORAGE_CHECKPOINT_INTERVAL")  # seconds between WAL truncations
     
     # Scheduling Configuration
     schedule_hours: str = Field("*/3", env="SCHEDULE_HOURS")  # Every 3 hours
     schedule_minutes: Optional[str] = Field(None, env="SCHEDULE_MINUTES")
     disable_scheduler: bool = Field(False, env="DISABLE_SCHEDULER")
     run_forever: bool = Field(False, env="RUN_FOREVER")
+    stats_flush_interval: float = Field(5.0, env="STATS_FLUSH_INTERVAL")  # seconds between stats writes
+    validation_cache_ttl: int = Field(3600, env="VALIDATION_CACHE_TTL")  # skip repeat setup probes; 0 disables
     
     # Logging Configuration
     log_level: str = Field("INFO", env="LOG_LEVEL")
@@ -56,6 +70,20 @@ class Settings(BaseSettings):
     # Kernel Configuration
     kernel_confidence_threshold: float = Field(0.7, env="KERNEL_CONFIDENCE_THRESHOLD")
     max_conversation_depth: int = Field(2, env="MAX_CONVERSATION_DEPTH")
+    thread_concurrency: int = Field(4, env="THREAD_CONCURRENCY")  # conversations analyzed in parallel
+    decision_cache_size: int = Field(10000, env="DECISION_CACHE_SIZE")
+    decision_cache_ttl: int = Field(21600, env="DECISION_CACHE_TTL")  # 6 hours
+    decision_batch_size: int = Field(20, env="DECISION_BATCH_SIZE")  # tweets per LLM request
+    decision_batch_workers: int = Field(4, env="DECISION_BATCH_WORKERS")
+    llm_concurrency: int = Field(8, env="LLM_CONCURRENCY")  # max LLM requests in flight
+    exact_decision_cache_size: int = Field(4096, env="EXACT_DECISION_CACHE_SIZE")
+    exact_decision_cache_ttl: int = Field(300, env="EXACT_DECISION_CACHE_TTL")  # within-run duplicates
+    semantic_cache_threshold: float = Field(0.87, env="SEMANTIC_CACHE_THRESHOLD")  # cosine similarity for a hit
+    ranker_compile: bool = Field(False, env="RANKER_COMPILE")  # torch.compile with dynamic shapes
+    ranker_precision: str = Field("fp32", env="RANKER_PRECISION")  # "fp32" or "int8" (CPU only)
+    embedding_cache_size: int = Field(10000, env="EMBEDDING_CACHE_SIZE")
+    ranker_backend: str = Field("torch", env="RANKER_BACKEND")  # "torch" or "onnx"
+    ranker_onnx_path: Optional[str] = Field(None, env="RANKER_ONNX_PATH")  # exported (int8) ONNX model directory
     
     @validator('search_terms', pre=True)
     def parse_search_terms(cls, v):
@@ -72,6 +100,22 @@ class Settings(BaseSettings):
             raise ValueError(f"Log level must be one of {valid_levels}")
         return v.upper()
     
+    @validator('ranker_precision')
+    def validate_ranker_precision(cls, v):
+        """Validate ranker precision."""
+        valid_precisions = ['fp32', 'int8']
+        if v.lower() not in valid_precisions:
+            raise ValueError(f"Ranker precision must be one of {valid_precisions}")
+        return v.lower()
+    
+    @validator('ranker_backend')
+    def validate_ranker_backend(cls, v):
+        """Validate ranker backend."""
+        valid_backends = ['torch', 'onnx']
+        if v.lower() not in valid_backends:
+            raise ValueError(f"Ranker backend must be one of {valid_backends}")
+        return v.lower()
+    
     @validator('model_name')
     def validate_model_name(cls, v):
         """Validate model name format."""
@@ -1,6 +1,6 @@
 """Kernel system for semantic ranking and decision making."""
 
-from .ranker import SemanticRanker
+from .ranker import SemanticRanker, get_shared_ranker
 from .decider import TweetDecider
 
-__all__ = ["SemanticRanker", "TweetDecider"]
+__all__ = ["SemanticRanker", "TweetDecider", "get_shared_ranker"]
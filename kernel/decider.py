@@ -5,12 +5,20 @@ This module provides a structured decision-making system that uses an LLM
 to analyze tweets and determine appropriate actions.
 """
 
+import hashlib
 import json
 import logging
 import asyncio
+import re
+import threading
 from typing import Dict, Optional, List, Tuple
 from dataclasses import dataclass
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from google.adk.agents import LlmAgent
 from google.adk.runners import InMemoryRunner
 from google.adk.sessions import InMemorySessionService
@@ -18,15 +26,35 @@ from google.genai import types
 
 from models.adapters import create_adapter
 from sources.tweepy_client import Tweet
-from kernel.ranker import RankedTweet
+from kernel.ranker import RankedTweet, SemanticRanker, get_shared_ranker
+from kernel.semantic_cache import SemanticCache
+from caching import TTLCache
 from config import settings
 
 logger = logging.getLogger(__name__)
 
+# Markdown code fences models often wrap their JSON output in
+_JSON_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$", re.IGNORECASE)
+
+
+def _load_json(response: str):
+    """Parse a JSON model response, tolerating surrounding markdown fences.
+    
+    Raises:
+        json.JSONDecodeError: If the response is not valid JSON
+    """
+    payload = _JSON_FENCE.sub("", response.strip())
+    if orjson is not None:
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError
+        return orjson.loads(payload)
+    return json.loads(payload)
+
 
-@dataclass
+@dataclass(frozen=True)
 class TweetDecision:
     """Structured decision result for a tweet."""
+    __slots__ = ("decision", "comment", "confidence", "reasoning")
+    
     decision: str  # "interesting", "like", "comment", "dig_deeper"
     comment: str
     confidence: float
@@ -36,11 +64,14 @@ class TweetDecision:
 class TweetDecider:
     """LLM-based decision engine for tweet actions."""
     
-    def __init__(self, model_adapter=None):
+    def __init__(self, model_adapter=None, ranker: SemanticRanker = None):
         """Initialize the tweet decider.
         
         Args:
             model_adapter: Model adapter to use (defaults to configured adapter)
+            ranker: Semantic ranker whose encoder keys the semantic decision cache
+                (defaults to the shared ranker); without an available model,
+                decisions are only cached by tweet ID
         """
         self.model_adapter = model_adapter or create_adapter()
         self.agent = self._create_decision_agent()
@@ -49,7 +80,36 @@ class TweetDecider:
             app_name="tweet_decider",
             session_service=InMemorySessionService()
         )
-        self.session_id = None
+        
+        # A single event loop for every ADK call, run on its own thread so the
+        # decider can be called from sync code and from worker threads alike
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, name="tweet-decider-loop", daemon=True).start()
+        
+        # Caps LLM requests in flight across all concurrent decisions and batches;
+        # created on the decider's loop, which Python 3.9 binds it to at construction
+        self._llm_semaphore = self.run_coroutine(self._create_semaphore(settings.llm_concurrency))
+        
+        # Short-lived cache of decisions per (tweet, context), so a tweet seen
+        # again within a run (e.g. in overlapping threads) is not re-decided
+        self._exact_cache = TTLCache(
+            maxsize=settings.exact_decision_cache_size,
+            ttl=settings.exact_decision_cache_ttl
+        )
+        
+        # Decision lookups answered from either cache vs. sent to the LLM
+        self.cache_stats = {"hits": 0, "misses": 0}
+        self._stats_lock = threading.Lock()
+        
+        # Reuse decisions for tweets that are near-duplicates of earlier ones
+        self.ranker = ranker or get_shared_ranker()
+        self.semantic_cache = None
+        if self.ranker.is_available():
+            self.semantic_cache = SemanticCache(
+                threshold=settings.semantic_cache_threshold,
+                maxsize=settings.decision_cache_size,
+                ttl=settings.decision_cache_ttl
+            )
     
     def _create_decision_agent(self) -> LlmAgent:
         """Create the decision-making agent."""
@@ -70,7 +130,7 @@ Guidelines:
 - Keep comments concise, positive, and relevant
 - Consider the context and tone of the original tweet
 
-Output your decision as a JSON object with these exact keys:
+For a single tweet, output your decision as a JSON object with these exact keys:
 {
     "decision": "interesting|like|comment|dig_deeper",
     "comment": "your reply text (empty string if not commenting)",
@@ -78,6 +138,13 @@ Output your decision as a JSON object with these exact keys:
     "reasoning": "brief explanation of your decision"
 }
 
+You may instead be given several numbered tweets, each with its id. In that
+case decide on each tweet independently and output only a JSON array with one
+object per tweet, each with the keys above plus "tweet_id" set to that tweet's id:
+[
+    {"tweet_id": "...", "decision": "...", "comment": "...", "confidence": 0.0-1.0, "reasoning": "..."}
+]
+
 Be thoughtful and selective in your decisions.
 """
         
@@ -88,20 +155,135 @@ Be thoughtful and selective in your decisions.
             output_key="decision_result"
         )
     
-    async def _ensure_session(self) -> str:
-        """Ensure we have an active session."""
-        if self.session_id is None:
-            session = await self.runner.session_service.create_session(
+    @staticmethod
+    async def _create_semaphore(value: int) -> asyncio.Semaphore:
+        """Create a semaphore on the running event loop."""
+        return asyncio.Semaphore(value)
+    
+    async def _create_session(self) -> str:
+        """Create a new session and return its ID."""
+        session = await self.runner.session_service.create_session(
+            app_name="tweet_decider",
+            user_id="user"
+        )
+        return session.id
+    
+    async def _delete_session(self, session_id: str) -> None:
+        """Delete a session so finished requests do not accumulate in memory."""
+        try:
+            await self.runner.session_service.delete_session(
                 app_name="tweet_decider",
-                user_id="user"
+                user_id="user",
+                session_id=session_id
             )
-            self.session_id = session.id
-        return self.session_id
+        except Exception as e:
+            logger.warning(f"Failed to delete decision session {session_id}: {e}")
+    
+    def run_coroutine(self, coro):
+        """Run a coroutine on the decider's event loop and wait for its result.
+        
+        Other async work that should share the decider's long-lived loop (and
+        any clients bound to it) can be submitted here from synchronous code.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+    
+    async def _run_prompt(self, input_text: str) -> Optional[str]:
+        """
+        Send a prompt to the decision agent and return its final response text.
+        
+        Each prompt runs in its own session, deleted afterwards, so concurrent
+        requests never interleave in one history and every request starts with
+        the same prefix.
+        """
+        user_content = types.Content(role="user", parts=[types.Part.from_text(input_text)])
+        
+        final_response = None
+        async with self._llm_semaphore:
+            session_id = await self._create_session()
+            try:
+                async for event in self.runner.run_async(user_id="user", session_id=session_id, new_message=user_content):
+                    if event.is_final_response() and event.content and event.content.parts:
+                        final_response = event.content.parts[0].text
+            finally:
+                await self._delete_session(session_id)
+        return final_response
+    
+    def _parse_decision(self, result: Dict) -> Optional[TweetDecision]:
+        """Validate a decoded decision object and convert it to a TweetDecision."""
+        # Validate the response structure
+        required_keys = ["decision", "comment", "confidence", "reasoning"]
+        if not all(key in result for key in required_keys):
+            logger.warning(f"Decision result missing required keys: {result}")
+            return None
+        
+        decision = TweetDecision(
+            decision=result["decision"].lower(),
+            comment=result.get("comment", ""),
+            confidence=float(result.get("confidence", 0.0)),
+            reasoning=result.get("reasoning", "")
+        )
+        
+        # Validate decision value
+        valid_decisions = ["interesting", "like", "comment", "dig_deeper"]
+        if decision.decision not in valid_decisions:
+            logger.warning(f"Invalid decision: {decision.decision}")
+            return None
+        
+        return decision
+    
+    @staticmethod
+    def _is_reusable(decision: TweetDecision) -> bool:
+        """Whether a decision may be reused for other, similar tweets.
+        
+        Comment decisions carry reply text written for one specific tweet;
+        reusing them would post the same reply on different tweets.
+        """
+        return decision.decision != "comment"
+    
+    def _record_cache_lookups(self, hits: int, misses: int) -> None:
+        """Add decision cache hits and misses to the running totals."""
+        with self._stats_lock:
+            self.cache_stats["hits"] += hits
+            self.cache_stats["misses"] += misses
+    
+    def get_cache_stats(self) -> Dict[str, float]:
+        """Return decision cache hits, misses and hit rate since startup."""
+        with self._stats_lock:
+            hits, misses = self.cache_stats["hits"], self.cache_stats["misses"]
+        total = hits + misses
+        return {"hits": hits, "misses": misses, "hit_rate": hits / total if total else 0.0}
+    
+    def _context_key(self, context: Dict = None) -> Optional[str]:
+        """Stable digest of a decision context, or None for no context."""
+        if not context:
+            return None
+        # Context values need not be hashable, so hash a canonical JSON dump
+        encoded = json.dumps(context, sort_keys=True, default=str)
+        return hashlib.blake2b(encoded.encode("utf-8"), digest_size=16).hexdigest()
+    
+    def _cache_vectors(self, ranked_tweets: List[RankedTweet], context: Dict = None):
+        """Embed tweets for semantic cache lookups, or return None when caching does not apply.
+        
+        Decisions made with extra context are not cached, since the context can
+        change the outcome for the same text.
+        """
+        if self.semantic_cache is None or context:
+            return None
+        
+        try:
+            return self.ranker.embed([ranked_tweet.tweet.text for ranked_tweet in ranked_tweets])
+        except Exception as e:
+            logger.warning(f"Failed to embed tweets for decision cache: {e}")
+            return None
     
     def decide(self, ranked_tweet: RankedTweet, context: Dict = None) -> Optional[TweetDecision]:
         """
         Make a decision for a ranked tweet.
         
+        A tweet decided recently with the same context, or a near-duplicate of
+        one decided without context, reuses that decision instead of calling
+        the LLM.
+        
         Args:
             ranked_tweet: The ranked tweet to analyze
             context: Additional context for decision making
@@ -109,6 +291,32 @@ Be thoughtful and selective in your decisions.
         Returns:
             TweetDecision object or None if decision fails
         """
+        key = (ranked_tweet.tweet.id, self._context_key(context))
+        cached = self._exact_cache.get(key)
+        if cached is not None:
+            logger.debug(f"Decision cache hit for tweet {ranked_tweet.tweet.id}")
+            self._record_cache_lookups(1, 0)
+            return cached
+        
+        vectors = self._cache_vectors([ranked_tweet], context)
+        if vectors is not None:
+            cached = self.semantic_cache.get(vectors[0])
+            if cached is not None:
+                logger.debug(f"Semantic cache hit for tweet {ranked_tweet.tweet.id}")
+                self._exact_cache.set(key, cached)
+                self._record_cache_lookups(1, 0)
+                return cached
+        
+        self._record_cache_lookups(0, 1)
+        decision = self.run_coroutine(self._decide_async(ranked_tweet, context))
+        if decision:
+            self._exact_cache.set(key, decision)
+            if vectors is not None and self._is_reusable(decision):
+                self.semantic_cache.put(vectors[0], decision)
+        return decision
+    
+    async def _decide_async(self, ranked_tweet: RankedTweet, context: Dict = None) -> Optional[TweetDecision]:
+        """Make a decision for a ranked tweet with an LLM call."""
         try:
             # Prepare the input text
             tweet_text = ranked_tweet.tweet.text
@@ -126,13 +334,7 @@ Analyze this tweet and provide your decision.
                 input_text += f"\nContext: {context}"
             
             # Run the decision agent
-            session_id = asyncio.run(self._ensure_session())
-            user_content = types.Content(role="user", parts=[types.Part.from_text(input_text)])
-            
-            final_response = None
-            for event in self.runner.run(user_id="user", session_id=session_id, new_message=user_content):
-                if event.is_final_response() and event.content and event.content.parts:
-                    final_response = event.content.parts[0].text
+            final_response = await self._run_prompt(input_text)
             
             if not final_response:
                 logger.warning("Decision agent returned no response")
@@ -140,28 +342,9 @@ Analyze this tweet and provide your decision.
             
             # Parse the JSON response
             try:
-                result = json.loads(final_response)
-                
-                # Validate the response structure
-                required_keys = ["decision", "comment", "confidence", "reasoning"]
-                if not all(key in result for key in required_keys):
-                    logger.warning(f"Decision result missing required keys: {result}")
-                    return None
-                
-                decision = TweetDecision(
-                    decision=result["decision"].lower(),
-                    comment=result.get("comment", ""),
-                    confidence=float(result.get("confidence", 0.0)),
-                    reasoning=result.get("reasoning", "")
-                )
-                
-                # Validate decision value
-                valid_decisions = ["interesting", "like", "comment", "dig_deeper"]
-                if decision.decision not in valid_decisions:
-                    logger.warning(f"Invalid decision: {decision.decision}")
-                    return None
-                
-                logger.debug(f"Decision for tweet {ranked_tweet.tweet.id}: {decision.decision} (confidence: {decision.confidence:.2f})")
+                decision = self._parse_decision(_load_json(final_response))
+                if decision:
+                    logger.debug(f"Decision for tweet {ranked_tweet.tweet.id}: {decision.decision} (confidence: {decision.confidence:.2f})")
                 return decision
                 
             except json.JSONDecodeError as e:
@@ -173,11 +356,93 @@ Analyze this tweet and provide your decision.
             logger.error(f"Error making decision for tweet: {e}")
             return None
     
+    def _build_batch_prompt(self, ranked_tweets: List[RankedTweet], context: Dict = None) -> str:
+        """Build a single prompt holding one block per tweet after a shared preamble."""
+        blocks = [
+            f"""Tweet {index} (id: {ranked_tweet.tweet.id}):
+{ranked_tweet.tweet.text}
+Relevance: {ranked_tweet.relevance_reason} (score: {ranked_tweet.score:.2f})"""
+            for index, ranked_tweet in enumerate(ranked_tweets, 1)
+        ]
+        
+        input_text = f"""
+Analyze each of the following {len(ranked_tweets)} tweets independently and decide on an action for each.
+
+Output a JSON array with one decision object per tweet. Each object must have
+the keys "tweet_id", "decision", "comment", "confidence" and "reasoning".
+
+{chr(10).join(blocks)}
+"""
+        
+        if context:
+            input_text += f"\nContext: {context}"
+        
+        return input_text
+    
+    async def _decide_batch_async(self, ranked_tweets: List[RankedTweet], 
+                                  context: Dict = None) -> Dict[str, TweetDecision]:
+        """
+        Decide on several tweets with a single LLM request.
+        
+        Returns:
+            Dictionary mapping tweet IDs to decisions; tweets the response did not
+            cover are left out
+        """
+        try:
+            final_response = await self._run_prompt(self._build_batch_prompt(ranked_tweets, context))
+            
+            if not final_response:
+                logger.warning("Decision agent returned no response for batch")
+                return {}
+            
+            results = _load_json(final_response)
+            if not isinstance(results, list):
+                logger.warning(f"Batch decision result is not a list: {results}")
+                return {}
+            
+            decisions = {}
+            for result in results:
+                if not isinstance(result, dict) or "tweet_id" not in result:
+                    continue
+                decision = self._parse_decision(result)
+                if decision:
+                    decisions[str(result["tweet_id"])] = decision
+            return decisions
+        
+        except json.JSONDecodeError as e:
+            logger.warning(f"Failed to parse batch decision JSON: {e}")
+            return {}
+        except Exception as e:
+            logger.error(f"Error making batch decision: {e}")
+            return {}
+    
+    async def _decide_uncached_async(self, ranked_tweets: List[RankedTweet],
+                                     context: Dict = None) -> List[Optional[TweetDecision]]:
+        """
+        Decide on tweets with one batched request, retrying uncovered tweets individually.
+        
+        Returns:
+            Decisions in input order, None where no decision could be made
+        """
+        decisions = await self._decide_batch_async(ranked_tweets, context) if len(ranked_tweets) > 1 else {}
+        
+        retry = [ranked_tweet for ranked_tweet in ranked_tweets if ranked_tweet.tweet.id not in decisions]
+        retried = await asyncio.gather(*(self._decide_async(ranked_tweet, context) for ranked_tweet in retry))
+        for ranked_tweet, decision in zip(retry, retried):
+            if decision:
+                decisions[ranked_tweet.tweet.id] = decision
+        
+        return [decisions.get(ranked_tweet.tweet.id) for ranked_tweet in ranked_tweets]
+    
     def batch_decide(self, ranked_tweets: List[RankedTweet], 
                     context: Dict = None) -> List[Tuple[RankedTweet, TweetDecision]]:
         """
         Make decisions for multiple ranked tweets.
         
+        Tweets with an exact or semantic cache hit reuse the cached decision. The rest are
+        sent in one request; any tweet missing from the batch response is
+        retried on its own, with the retries running concurrently.
+        
         Args:
             ranked_tweets: List of ranked tweets to analyze
             context: Additional context for decision making
@@ -185,10 +450,42 @@ Analyze this tweet and provide your decision.
         Returns:
             List of tuples (ranked_tweet, decision) for successful decisions
         """
-        results = []
+        if not ranked_tweets:
+            return []
         
-        for ranked_tweet in ranked_tweets:
-            decision = self.decide(ranked_tweet, context)
+        # Exact hits first, then embed the remaining tweets in one call for the semantic cache
+        context_key = self._context_key(context)
+        keys = [(ranked_tweet.tweet.id, context_key) for ranked_tweet in ranked_tweets]
+        decisions: List[Optional[TweetDecision]] = [self._exact_cache.get(key) for key in keys]
+        misses = [index for index, decision in enumerate(decisions) if decision is None]
+        
+        vectors = {}
+        if misses:
+            miss_vectors = self._cache_vectors([ranked_tweets[index] for index in misses], context)
+            if miss_vectors is not None:
+                vectors = dict(zip(misses, miss_vectors))
+                for index in misses:
+                    decisions[index] = self.semantic_cache.get(vectors[index])
+                    if decisions[index] is not None:
+                        self._exact_cache.set(keys[index], decisions[index])
+                misses = [index for index in misses if decisions[index] is None]
+        
+        self._record_cache_lookups(len(ranked_tweets) - len(misses), len(misses))
+        if len(misses) < len(ranked_tweets):
+            logger.info(f"Decision cache: {len(ranked_tweets) - len(misses)} hits, {len(misses)} misses")
+        
+        # One trip to the event loop decides every miss
+        if misses:
+            new_decisions = self.run_coroutine(self._decide_uncached_async([ranked_tweets[index] for index in misses], context))
+            for index, decision in zip(misses, new_decisions):
+                decisions[index] = decision
+                if decision:
+                    self._exact_cache.set(keys[index], decision)
+                    if index in vectors and self._is_reusable(decision):
+                        self.semantic_cache.put(vectors[index], decision)
+        
+        results = []
+        for ranked_tweet, decision in zip(ranked_tweets, decisions):
             if decision:
                 results.append((ranked_tweet, decision))
             else:
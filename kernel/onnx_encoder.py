@@ -0,0 +1,90 @@
+"""
+ONNX Runtime sentence encoder.
+
+This module provides a drop-in replacement for SentenceTransformer.encode that
+runs an exported (typically int8-quantized) ONNX model through ONNX Runtime,
+for faster CPU inference of the ranking model.
+
+Export and quantize the model once, for example:
+
+    optimum-cli export onnx --model sentence-transformers/all-MiniLM-L6-v2 minilm-onnx/
+    optimum-cli onnxruntime quantize --onnx_model minilm-onnx/ --avx512_vnni -o minilm-onnx-int8/
+"""
+
+import logging
+import os
+from typing import List
+
+try:
+    import numpy as np
+    from optimum.onnxruntime import ORTModelForFeatureExtraction
+    from transformers import AutoTokenizer
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+    np = None
+    ORTModelForFeatureExtraction = None
+    AutoTokenizer = None
+
+logger = logging.getLogger(__name__)
+
+
+class OnnxSentenceEncoder:
+    """Mean-pooled sentence embeddings from an ONNX feature-extraction model."""
+    
+    # File written by `optimum-cli onnxruntime quantize`
+    QUANTIZED_FILE_NAME = "model_quantized.onnx"
+    
+    def __init__(self, model_path: str):
+        """Load the tokenizer and ONNX model.
+        
+        Args:
+            model_path: Directory holding the exported model and tokenizer files
+        """
+        if not ONNX_AVAILABLE:
+            raise ImportError("optimum[onnxruntime] is required for the ONNX ranker backend")
+        
+        kwargs = {}
+        if os.path.exists(os.path.join(model_path, self.QUANTIZED_FILE_NAME)):
+            kwargs["file_name"] = self.QUANTIZED_FILE_NAME
+        
+        self.tokenizer = AutoTokenizer.from_pretrained(model_path)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(model_path, **kwargs)
+    
+    def encode(self, texts: List[str], batch_size: int = 64, convert_to_numpy: bool = True,
+               normalize_embeddings: bool = True, show_progress_bar: bool = False):
+        """
+        Embed texts, matching the SentenceTransformer.encode call used by the ranker.
+        
+        Args:
+            texts: Texts to embed
+            batch_size: Number of texts per inference call
+            convert_to_numpy: Accepted for compatibility; output is always numpy
+            normalize_embeddings: L2-normalize each embedding
+            show_progress_bar: Accepted for compatibility; ignored
+        
+        Returns:
+            float32 array of shape (len(texts), dim)
+        """
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            inputs = self.tokenizer(
+                list(texts[start:start + batch_size]),
+                padding=True,
+                truncation=True,
+                return_tensors="np"
+            )
+            outputs = self.model(**inputs)
+            token_embeddings = np.asarray(outputs.last_hidden_state, dtype=np.float32)
+            
+            # Mean pooling over real (non-padding) tokens
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            embeddings = (token_embeddings * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+            
+            if normalize_embeddings:
+                embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+            batches.append(embeddings)
+        
+        if not batches:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.concatenate(batches)
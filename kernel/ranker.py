@@ -5,28 +5,44 @@ This module provides fast semantic ranking of tweets using pre-trained
 sentence transformers to filter and prioritize content.
 """
 
+import hashlib
 import logging
-from typing import List, Dict, Tuple, Optional
+import re
+import threading
+from typing import List, Dict, Tuple, Optional, Sequence
 from dataclasses import dataclass
 
 try:
-    from sentence_transformers import SentenceTransformer
     import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from sentence_transformers import SentenceTransformer
     SENTENCE_TRANSFORMERS_AVAILABLE = True
 except ImportError:
     SENTENCE_TRANSFORMERS_AVAILABLE = False
     SentenceTransformer = None
-    np = None
+
+try:
+    import torch
+except ImportError:
+    torch = None
 
 from sources.tweepy_client import Tweet
+from kernel.onnx_encoder import OnnxSentenceEncoder, ONNX_AVAILABLE
+from caching import TTLCache
 from config import settings
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(frozen=True)
 class RankedTweet:
     """A tweet with its semantic ranking score."""
+    # Explicit slots (rather than slots=True) keep Python 3.9 support
+    __slots__ = ("tweet", "score", "relevance_reason")
+    
     tweet: Tweet
     score: float
     relevance_reason: str
@@ -35,26 +51,169 @@ class RankedTweet:
 class SemanticRanker:
     """Semantic ranker using sentence transformers for fast filtering."""
     
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    # Score thresholds separating the relevance labels (a score must exceed a threshold)
+    RELEVANCE_THRESHOLDS = (0.6, 0.8)
+    RELEVANCE_LABELS = ("Somewhat relevant", "Moderately relevant", "Highly relevant")
+    
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", batch_size: int = 64):
         """Initialize the semantic ranker.
         
         Args:
             model_name: Name of the sentence transformer model to use
+            batch_size: Number of texts per forward pass when encoding
         """
+        self.model_name = model_name
+        self.batch_size = batch_size
+        
+        # Embeddings keyed by a hash of model name and text; they never go stale
+        self._embedding_cache = TTLCache(maxsize=settings.embedding_cache_size, ttl=float("inf"))
+        
+        # Serializes model inference when ranking from multiple threads
+        self._lock = threading.Lock()
+        
         if not SENTENCE_TRANSFORMERS_AVAILABLE:
             logger.warning("sentence-transformers not available. Using simple text matching.")
             self.model = None
             return
         
+        # The ONNX encoder is already optimized; precision and compile settings apply to torch only
+        if settings.ranker_backend == "onnx" and self._load_onnx_model():
+            return
+        
         try:
             self.model = SentenceTransformer(model_name)
             logger.info(f"Loaded semantic ranker model: {model_name}")
         except Exception as e:
             logger.error(f"Failed to load semantic ranker model: {e}")
             self.model = None
+            return
+        
+        if settings.ranker_precision == "int8":
+            self._quantize_model()
+        
+        if settings.ranker_compile:
+            self._compile_model()
+    
+    def _load_onnx_model(self) -> bool:
+        """Load the ONNX Runtime encoder; returns False to fall back to sentence-transformers."""
+        if not ONNX_AVAILABLE:
+            logger.warning("optimum[onnxruntime] not available. Using the sentence-transformers backend.")
+            return False
+        
+        if not settings.ranker_onnx_path:
+            logger.warning("RANKER_ONNX_PATH not set. Using the sentence-transformers backend.")
+            return False
+        
+        try:
+            self.model = OnnxSentenceEncoder(settings.ranker_onnx_path)
+            logger.info(f"Loaded ONNX semantic ranker model from {settings.ranker_onnx_path}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to load ONNX semantic ranker model: {e}")
+            return False
+    
+    def _quantize_model(self) -> None:
+        """Replace the model's linear layers with dynamically quantized int8 versions."""
+        if torch is None:
+            logger.warning("torch not available. Using the fp32 ranker model.")
+            return
+        
+        if self.model.device.type != "cpu":
+            logger.warning(f"int8 dynamic quantization only runs on CPU, keeping fp32 model on {self.model.device}")
+            return
+        
+        try:
+            self.model = torch.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+            logger.info("Quantized semantic ranker model to int8")
+        except Exception as e:
+            logger.error(f"Failed to quantize semantic ranker model: {e}")
+    
+    def _compile_model(self) -> None:
+        """
+        Compile the underlying transformer with torch.compile.
+        
+        sentence-transformers pads each batch to its longest text, so both the
+        batch size and the sequence length vary between calls; the graph is
+        compiled with dynamic shapes so those changes do not force recompiles.
+        """
+        if torch is None or not hasattr(torch, "compile"):
+            logger.warning("torch.compile not available. Using the uncompiled ranker model.")
+            return
+        
+        try:
+            transformer = self.model[0]
+            transformer.auto_model = torch.compile(transformer.auto_model, dynamic=True)
+            logger.info("Compiled semantic ranker model")
+        except Exception as e:
+            logger.error(f"Failed to compile semantic ranker model: {e}")
+    
+    def _text_key(self, text: str) -> bytes:
+        """Hash a text into an embedding cache key, namespaced by model."""
+        return hashlib.blake2b(f"{self.model_name}\0{text}".encode("utf-8"), digest_size=16).digest()
+    
+    def _encode(self, texts: List[str]):
+        """
+        Embed texts as L2-normalized numpy vectors, reusing cached embeddings.
+        
+        Only texts not seen before (and each distinct text once) go through the
+        model; results are reassembled in input order.
+        """
+        if not texts:
+            return self._encode_uncached(texts)
+        
+        keys = [self._text_key(text) for text in texts]
+        embeddings = [self._embedding_cache.get(key) for key in keys]
+        
+        missing = {}
+        for key, text, embedding in zip(keys, texts, embeddings):
+            if embedding is None:
+                missing.setdefault(key, text)
+        
+        if missing:
+            # Copy each row out of the batch matrix; a cached view would keep the
+            # whole (n, dim) batch alive for as long as any of its rows is cached
+            new_embeddings = {
+                key: row.copy()
+                for key, row in zip(missing, self._encode_uncached(list(missing.values())))
+            }
+            for key, embedding in new_embeddings.items():
+                self._embedding_cache.set(key, embedding)
+            embeddings = [
+                new_embeddings[key] if embedding is None else embedding
+                for key, embedding in zip(keys, embeddings)
+            ]
+        
+        # One contiguous float32 matrix, so the similarity products run as BLAS gemv/gemm
+        return np.ascontiguousarray(np.stack(embeddings), dtype=np.float32)
+    
+    def _encode_uncached(self, texts: List[str]):
+        """Embed texts with the model as L2-normalized numpy vectors."""
+        with self._lock:
+            return self.model.encode(
+                texts,
+                batch_size=self.batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False
+            )
+    
+    def embed(self, texts: List[str]):
+        """
+        Embed texts as L2-normalized vectors, so dot products are cosine similarities.
+        
+        Args:
+            texts: Texts to embed
+        
+        Returns:
+            Array of shape (len(texts), dim), or None if the model is unavailable
+        """
+        if not self.model or not texts:
+            return None
+        
+        return self._encode(texts)
     
     def rank_tweets(self, tweets: List[Tweet], query_terms: List[str], 
-                   min_score: float = 0.3) -> List[RankedTweet]:
+                   min_score: float = 0.3, top_k: Optional[int] = None) -> List[RankedTweet]:
         """
         Rank tweets based on semantic similarity to query terms.
         
@@ -62,57 +221,145 @@ class SemanticRanker:
             tweets: List of tweets to rank
             query_terms: Search terms to match against
             min_score: Minimum similarity score threshold
+            top_k: Return at most this many of the best tweets (all above the threshold if None)
             
         Returns:
             List of ranked tweets sorted by relevance
+        
+        Raises:
+            ValueError: If top_k is less than 1
         """
+        if top_k is not None and top_k < 1:
+            raise ValueError(f"top_k must be at least 1, got {top_k}")
+        
         if not tweets:
             return []
         
         if not self.model:
             # Fallback to simple text matching
-            return self._simple_ranking(tweets, query_terms, min_score)
+            return self._simple_ranking(tweets, query_terms, min_score)[:top_k]
         
         try:
             # Prepare texts for embedding
             tweet_texts = [tweet.text for tweet in tweets]
             query_text = " ".join(query_terms)
             
-            # Generate embeddings
-            tweet_embeddings = self.model.encode(tweet_texts)
-            query_embedding = self.model.encode([query_text])
-            
-            # Calculate similarities
-            similarities = np.dot(tweet_embeddings, query_embedding.T).flatten()
-            
-            # Create ranked tweets
-            ranked_tweets = []
-            for tweet, score in zip(tweets, similarities):
-                if score >= min_score:
-                    relevance_reason = self._generate_relevance_reason(tweet.text, query_terms, score)
-                    ranked_tweets.append(RankedTweet(
-                        tweet=tweet,
-                        score=float(score),
-                        relevance_reason=relevance_reason
-                    ))
+            # Embed the query and tweets in one pass; vectors are normalized,
+            # so the dot product is the cosine similarity
+            embeddings = self._encode([query_text] + tweet_texts)
+            similarities = embeddings[1:] @ embeddings[0]
             
-            # Sort by score (highest first)
-            ranked_tweets.sort(key=lambda x: x.score, reverse=True)
+            ranked_tweets = self._select_ranked(tweets, similarities, min_score, top_k)
             
             logger.info(f"Ranked {len(tweets)} tweets, {len(ranked_tweets)} above threshold {min_score}")
             return ranked_tweets
             
         except Exception as e:
             logger.error(f"Error in semantic ranking: {e}")
-            return self._simple_ranking(tweets, query_terms, min_score)
+            return self._simple_ranking(tweets, query_terms, min_score)[:top_k]
+    
+    def rank_tweets_by_terms(self, tweets: List[Tweet], query_terms: List[str],
+                             min_score: float = 0.3) -> List[RankedTweet]:
+        """
+        Rank tweets by their similarity to the closest of several query terms.
+        
+        Tweets and terms are embedded in a single model call, so the results of
+        several searches can be ranked together in one pass.
+        
+        Args:
+            tweets: List of tweets to rank
+            query_terms: Search terms to match against individually
+            min_score: Minimum similarity score threshold
+        
+        Returns:
+            List of ranked tweets sorted by relevance
+        """
+        if not tweets or not query_terms:
+            return []
+        
+        if not self.model:
+            return self._simple_ranking_by_terms(tweets, query_terms, min_score)
+        
+        try:
+            tweet_texts = [tweet.text for tweet in tweets]
+            
+            embeddings = self._encode(tweet_texts + list(query_terms))
+            tweet_embeddings = embeddings[:len(tweets)]
+            term_embeddings = embeddings[len(tweets):]
+            
+            # Best score over all terms for each tweet
+            similarities = (tweet_embeddings @ term_embeddings.T).max(axis=1)
+            
+            ranked_tweets = self._select_ranked(tweets, similarities, min_score)
+            
+            logger.info(f"Ranked {len(tweets)} tweets against {len(query_terms)} terms, "
+                        f"{len(ranked_tweets)} above threshold {min_score}")
+            return ranked_tweets
+        
+        except Exception as e:
+            logger.error(f"Error in semantic ranking: {e}")
+            return self._simple_ranking_by_terms(tweets, query_terms, min_score)
+    
+    def _select_ranked(self, tweets: List[Tweet], similarities, min_score: float,
+                       top_k: Optional[int] = None) -> List[RankedTweet]:
+        """
+        Build ranked tweets for scores at or above the threshold, highest first.
+        
+        Thresholding, ordering and relevance labelling are done on the score
+        array, so Python objects are only created for the surviving tweets.
+        
+        Args:
+            tweets: Tweets the similarities were computed for
+            similarities: Similarity score per tweet
+            min_score: Minimum similarity score threshold
+            top_k: Keep at most this many of the best tweets (at least 1)
+        
+        Returns:
+            List of ranked tweets sorted by relevance
+        """
+        keep = np.flatnonzero(similarities >= min_score)
+        if top_k is not None and top_k < keep.size:
+            # Linear-time partial selection, so only the k survivors get sorted
+            keep = keep[np.argpartition(-similarities[keep], top_k - 1)[:top_k]]
+        order = keep[np.argsort(-similarities[keep], kind="stable")]
+        scores = similarities[order].tolist()
+        labels = np.digitize(similarities[order], self.RELEVANCE_THRESHOLDS, right=True).tolist()
+        
+        return [
+            RankedTweet(
+                tweet=tweets[i],
+                score=score,
+                relevance_reason=f"{self.RELEVANCE_LABELS[label]} (score: {score:.2f})"
+            )
+            for i, score, label in zip(order.tolist(), scores, labels)
+        ]
+    
+    def _simple_ranking_by_terms(self, tweets: List[Tweet], query_terms: List[str],
+                                 min_score: float = 0.3) -> List[RankedTweet]:
+        """Fallback text-based ranking scoring each tweet against its best term."""
+        ranked_tweets = []
+        lowered_terms = [(term.lower(),) for term in query_terms]
+        
+        for tweet in tweets:
+            score = max(self._calculate_simple_score(tweet.text, term) for term in lowered_terms)
+            if score >= min_score:
+                ranked_tweets.append(RankedTweet(
+                    tweet=tweet,
+                    score=score,
+                    relevance_reason=f"Text contains {score:.2f} matching terms"
+                ))
+        
+        ranked_tweets.sort(key=lambda x: x.score, reverse=True)
+        return ranked_tweets
     
     def _simple_ranking(self, tweets: List[Tweet], query_terms: List[str], 
                        min_score: float = 0.3) -> List[RankedTweet]:
         """Fallback simple text-based ranking."""
         ranked_tweets = []
+        lowered_terms = tuple(term.lower() for term in query_terms)
         
         for tweet in tweets:
-            score = self._calculate_simple_score(tweet.text, query_terms)
+            score = self._calculate_simple_score(tweet.text, lowered_terms)
             if score >= min_score:
                 relevance_reason = f"Text contains {score:.2f} matching terms"
                 ranked_tweets.append(RankedTweet(
@@ -124,31 +371,20 @@ class SemanticRanker:
         ranked_tweets.sort(key=lambda x: x.score, reverse=True)
         return ranked_tweets
     
-    def _calculate_simple_score(self, text: str, query_terms: List[str]) -> float:
-        """Calculate a simple text matching score."""
+    def _calculate_simple_score(self, text: str, lowered_terms: Sequence[str]) -> float:
+        """Calculate a simple text matching score against already-lowercased terms."""
         text_lower = text.lower()
-        matches = sum(1 for term in query_terms if term.lower() in text_lower)
-        return matches / len(query_terms) if query_terms else 0.0
-    
-    def _generate_relevance_reason(self, text: str, query_terms: List[str], score: float) -> str:
-        """Generate a human-readable relevance reason."""
-        if score > 0.8:
-            return f"Highly relevant (score: {score:.2f})"
-        elif score > 0.6:
-            return f"Moderately relevant (score: {score:.2f})"
-        else:
-            return f"Somewhat relevant (score: {score:.2f})"
+        matches = sum(1 for term in lowered_terms if term in text_lower)
+        return matches / len(lowered_terms) if lowered_terms else 0.0
     
     def filter_by_keywords(self, tweets: List[Tweet], keywords: List[str]) -> List[Tweet]:
         """Filter tweets by keyword presence."""
         if not keywords:
             return tweets
         
-        filtered = []
-        for tweet in tweets:
-            text_lower = tweet.text.lower()
-            if any(keyword.lower() in text_lower for keyword in keywords):
-                filtered.append(tweet)
+        # One alternation pattern scans each tweet once instead of once per keyword
+        pattern = re.compile("|".join(re.escape(keyword.lower()) for keyword in keywords))
+        filtered = [tweet for tweet in tweets if pattern.search(tweet.text.lower())]
         
         logger.info(f"Filtered {len(tweets)} tweets to {len(filtered)} by keywords")
         return filtered
@@ -156,3 +392,21 @@ class SemanticRanker:
     def is_available(self) -> bool:
         """Check if semantic ranking is available."""
         return self.model is not None
+
+
+_shared_ranker: Optional[SemanticRanker] = None
+_shared_ranker_lock = threading.Lock()
+
+
+def get_shared_ranker() -> SemanticRanker:
+    """Return the process-wide ranker, loading the model on first use.
+    
+    Agents and the decider default to this instance so the embedding model
+    (and its embedding cache) is loaded once rather than once per component.
+    """
+    global _shared_ranker
+    if _shared_ranker is None:
+        with _shared_ranker_lock:
+            if _shared_ranker is None:
+                _shared_ranker = SemanticRanker()
+    return _shared_ranker
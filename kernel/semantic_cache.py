@@ -0,0 +1,96 @@
+"""
+Embedding-keyed cache for LLM decisions.
+
+This module provides a similarity cache that returns a stored value when a
+new embedding is close enough to one seen before, so paraphrased or repeated
+tweets can reuse an earlier decision instead of a new LLM call.
+"""
+
+import threading
+import time
+from typing import Any, List, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class SemanticCache:
+    """Cosine-similarity cache over L2-normalized embeddings with LRU and TTL eviction.
+    
+    Lookups are an exact inner-product search over all stored vectors (the
+    same search a flat inner-product index performs), vectorized with numpy.
+    """
+    
+    def __init__(self, threshold: float = 0.87, maxsize: int = 10000, ttl: float = 3600):
+        """Initialize the cache.
+        
+        Args:
+            threshold: Minimum cosine similarity for a lookup to count as a hit
+            maxsize: Maximum number of entries before least recently used ones are replaced
+            ttl: Lifetime of an entry in seconds
+        """
+        if np is None:
+            raise ImportError("numpy is required for SemanticCache")
+        
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.ttl = ttl
+        
+        # Storage is allocated on the first put, once the embedding size is known
+        self._vectors = None
+        self._expires_at = np.zeros(maxsize, dtype=np.float64)
+        self._last_used = np.zeros(maxsize, dtype=np.int64)
+        self._values: List[Any] = [None] * maxsize
+        self._size = 0
+        self._tick = 0
+        self._lock = threading.Lock()
+    
+    def get(self, vector) -> Optional[Any]:
+        """Return the value stored for the most similar live embedding, if similar enough."""
+        with self._lock:
+            if self._size == 0:
+                return None
+            
+            similarities = self._vectors[:self._size] @ np.asarray(vector, dtype=np.float32)
+            similarities[self._expires_at[:self._size] <= time.monotonic()] = -np.inf
+            
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                return None
+            
+            self._tick += 1
+            self._last_used[best] = self._tick
+            return self._values[best]
+    
+    def put(self, vector, value: Any) -> None:
+        """Store `value` under an embedding, replacing an expired or the least recently used entry if full."""
+        vector = np.asarray(vector, dtype=np.float32)
+        now = time.monotonic()
+        
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.maxsize, vector.shape[0]), dtype=np.float32)
+            
+            if self._size < self.maxsize:
+                slot = self._size
+                self._size += 1
+            else:
+                expired = np.flatnonzero(self._expires_at <= now)
+                slot = int(expired[0]) if expired.size else int(np.argmin(self._last_used))
+            
+            self._tick += 1
+            self._vectors[slot] = vector
+            self._expires_at[slot] = now + self.ttl
+            self._last_used[slot] = self._tick
+            self._values[slot] = value
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._values = [None] * self.maxsize
+            self._size = 0
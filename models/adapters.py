@@ -5,13 +5,15 @@ This module provides a unified interface for working with different LLM provider
 through the ADK framework. It supports both Google Gemini and OpenAI models.
 """
 
-import os
+import asyncio
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from typing import Dict, Any, Optional
 
+from google import genai
 from google.adk.agents import LlmAgent
-from google.genai import types
-import openai
+from google.adk.models import Gemini
+import httpx
 
 from config import settings
 
@@ -38,19 +40,27 @@ class ModelAdapter(ABC):
     def validate_connection(self) -> bool:
         """Validate that the connection to the model works."""
         pass
+    
+    async def avalidate_connection(self) -> bool:
+        """Validate the connection without blocking the event loop."""
+        return await asyncio.to_thread(self.validate_connection)
 
 
 class GeminiAdapter(ModelAdapter):
     """Adapter for Google Gemini models."""
     
     def _setup_client(self) -> None:
-        """Set up the Gemini client."""
-        os.environ["GOOGLE_API_KEY"] = self.api_key
+        """Set up the Gemini client.
+        
+        The client is handed to every agent this adapter creates, so the key
+        stays per adapter instead of going through the process environment.
+        """
+        self._client = genai.Client(api_key=self.api_key)
     
     def create_agent(self, name: str, description: str, instruction: str, output_key: str = "result") -> LlmAgent:
         """Create a Gemini LLM agent."""
         return LlmAgent(
-            model=self.model_name,
+            model=Gemini(model=self.model_name, client=self._client),
             name=name,
             description=description,
             instruction=instruction,
@@ -61,9 +71,15 @@ class GeminiAdapter(ModelAdapter):
         """Validate Gemini connection."""
         try:
             # Simple test to validate the connection
-            from google.genai import GenerativeModel
-            model = GenerativeModel(self.model_name)
-            response = model.generate_content("Hello")
+            response = self._client.models.generate_content(model=self.model_name, contents="Hello")
+            return response.text is not None
+        except Exception:
+            return False
+    
+    async def avalidate_connection(self) -> bool:
+        """Validate Gemini connection with the async google-genai client."""
+        try:
+            response = await self._client.aio.models.generate_content(model=self.model_name, contents="Hello")
             return response.text is not None
         except Exception:
             return False
@@ -73,8 +89,25 @@ class OpenAIAdapter(ModelAdapter):
     """Adapter for OpenAI models."""
     
     def _setup_client(self) -> None:
-        """Set up the OpenAI client."""
-        openai.api_key = self.api_key
+        """Set up the OpenAI client.
+        
+        The sync client is shared by every adapter using the same API key, so
+        its connection pool keeps sockets alive across adapters and requests.
+        """
+        _get_openai().api_key = self.api_key
+        self._limits, self._timeout = _openai_http_settings()
+        self._client = _get_openai_client(self.api_key)
+        # Created on first async use; its connections belong to the loop that uses it
+        self._async_client = None
+    
+    def _get_async_client(self) -> "openai.AsyncOpenAI":
+        """Return the shared async client, creating it on first use."""
+        if self._async_client is None:
+            self._async_client = _get_openai().AsyncOpenAI(
+                api_key=self.api_key,
+                http_client=httpx.AsyncClient(limits=self._limits, timeout=self._timeout)
+            )
+        return self._async_client
     
     def create_agent(self, name: str, description: str, instruction: str, output_key: str = "result") -> LlmAgent:
         """Create an OpenAI LLM agent."""
@@ -91,8 +124,19 @@ class OpenAIAdapter(ModelAdapter):
     def validate_connection(self) -> bool:
         """Validate OpenAI connection."""
         try:
-            client = openai.OpenAI(api_key=self.api_key)
-            response = client.chat.completions.create(
+            response = self._client.chat.completions.create(
+                model=self.model_name,
+                messages=[{"role": "user", "content": "Hello"}],
+                max_tokens=10
+            )
+            return response.choices[0].message.content is not None
+        except Exception:
+            return False
+    
+    async def avalidate_connection(self) -> bool:
+        """Validate OpenAI connection with the shared async client."""
+        try:
+            response = await self._get_async_client().chat.completions.create(
                 model=self.model_name,
                 messages=[{"role": "user", "content": "Hello"}],
                 max_tokens=10
@@ -102,6 +146,32 @@ class OpenAIAdapter(ModelAdapter):
             return False
 
 
+@lru_cache(maxsize=None)
+def _get_openai():
+    """Import the OpenAI SDK on first use so Gemini-only runs never load it."""
+    import openai
+    return openai
+
+
+def _openai_http_settings():
+    """Return the httpx pool limits and timeout used for OpenAI clients."""
+    limits = httpx.Limits(
+        max_connections=settings.llm_max_connections,
+        max_keepalive_connections=settings.llm_max_connections
+    )
+    return limits, httpx.Timeout(settings.llm_request_timeout)
+
+
+@lru_cache(maxsize=8)
+def _get_openai_client(api_key: str) -> "openai.OpenAI":
+    """Return the process-wide pooled OpenAI client for an API key."""
+    limits, timeout = _openai_http_settings()
+    return _get_openai().OpenAI(
+        api_key=api_key,
+        http_client=httpx.Client(limits=limits, timeout=timeout)
+    )
+
+
 def create_adapter(model_name: str = None, api_key: str = None) -> ModelAdapter:
     """
     Create a model adapter based on the model name.
@@ -111,28 +181,39 @@ def create_adapter(model_name: str = None, api_key: str = None) -> ModelAdapter:
         api_key: The API key (defaults to appropriate key from settings)
     
     Returns:
-        A configured model adapter
+        A configured model adapter, shared with earlier calls for the same model and key
     """
     model_name = model_name or settings.model_name
     api_key = api_key or _get_api_key_for_model(model_name)
-    
-    if model_name.startswith('gemini'):
-        return GeminiAdapter(model_name, api_key)
-    elif model_name.startswith('gpt'):
-        return OpenAIAdapter(model_name, api_key)
-    else:
+    return _create_cached_adapter(model_name, api_key)
+
+
+@lru_cache(maxsize=16)
+def _create_cached_adapter(model_name: str, api_key: str) -> ModelAdapter:
+    """Build the adapter for a resolved model and key, reusing earlier instances."""
+    adapter_class, _, _ = _provider_for_model(model_name)
+    return adapter_class(model_name, api_key)
+
+
+# Model name prefix -> (adapter class, settings attribute holding its key, provider label)
+_PROVIDERS = {
+    "gemini": (GeminiAdapter, "google_api_key", "Gemini"),
+    "gpt": (OpenAIAdapter, "openai_api_key", "OpenAI"),
+}
+
+
+def _provider_for_model(model_name: str):
+    """Look up the provider registry entry for a model name."""
+    provider = next((entry for prefix, entry in _PROVIDERS.items() if model_name.startswith(prefix)), None)
+    if provider is None:
         raise ValueError(f"Unknown model type: {model_name}")
+    return provider
 
 
 def _get_api_key_for_model(model_name: str) -> str:
     """Get the appropriate API key for the given model."""
-    if model_name.startswith('gemini'):
-        if not settings.google_api_key:
-            raise ValueError("GOOGLE_API_KEY is required for Gemini models")
-        return settings.google_api_key
-    elif model_name.startswith('gpt'):
-        if not settings.openai_api_key:
-            raise ValueError("OPENAI_API_KEY is required for OpenAI models")
-        return settings.openai_api_key
-    else:
-        raise ValueError(f"Unknown model type: {model_name}")
+    _, key_attr, label = _provider_for_model(model_name)
+    api_key = getattr(settings, key_attr)
+    if not api_key:
+        raise ValueError(f"{key_attr.upper()} is required for {label} models")
+    return api_key
@@ -0,0 +1,79 @@
+"""
+Token-bucket rate limiting for outbound API calls.
+
+This module provides a small in-process token bucket used to pace actions
+against the Twitter API without resorting to fixed sleeps between calls.
+"""
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass
+class TokenBucket:
+    """Token bucket with a burst capacity and a constant refill rate.
+
+    Attributes:
+        capacity: Maximum number of tokens the bucket can hold (burst size)
+        refill_rate: Tokens added per second
+        tokens: Currently available tokens (defaults to a full bucket)
+        last_refill: Monotonic timestamp of the last refill
+    """
+    capacity: float
+    refill_rate: float
+    tokens: Optional[float] = None
+    last_refill: float = field(default_factory=time.monotonic)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.tokens is None:
+            self.tokens = float(self.capacity)
+
+    @classmethod
+    def per_window(cls, capacity: int, window_seconds: float) -> "TokenBucket":
+        """Create a bucket allowing `capacity` calls per `window_seconds`."""
+        return cls(capacity=capacity, refill_rate=capacity / window_seconds)
+
+    def _refill(self) -> None:
+        """Add the tokens accumulated since the last refill."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.refill_rate)
+        self.last_refill = now
+
+    def try_consume(self, n: int = 1) -> bool:
+        """Take `n` tokens if available.
+
+        Args:
+            n: Number of tokens to take
+
+        Returns:
+            True if the tokens were taken, False if the bucket is short
+        """
+        with self._lock:
+            self._refill()
+            if self.tokens >= n:
+                self.tokens -= n
+                return True
+            return False
+
+    def time_until(self, n: int = 1) -> float:
+        """Seconds until `n` tokens will be available (0 if available now)."""
+        with self._lock:
+            self._refill()
+            missing = n - self.tokens
+            if missing <= 0:
+                return 0.0
+            return missing / self.refill_rate
+
+    def consume(self, n: int = 1) -> None:
+        """Take `n` tokens, blocking only as long as the bucket is empty."""
+        while not self.try_consume(n):
+            time.sleep(self.time_until(n))
+    
+    async def consume_async(self, n: int = 1) -> None:
+        """Take `n` tokens, yielding to the event loop while the bucket is empty."""
+        while not self.try_consume(n):
+            await asyncio.sleep(self.time_until(n))
@@ -7,37 +7,60 @@ either once or on a schedule.
 """
 
 import argparse
+import atexit
+import hashlib
 import logging
+import logging.handlers
+import queue
 import sys
+import time
 from pathlib import Path
 
 # Add the current directory to the Python path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from config import settings, validate_required_credentials
-from scheduler import run_scheduler_forever, run_agent_once
 from storage import storage
 
 logger = logging.getLogger(__name__)
 
+# Records a recent successful validation so scheduled starts skip the live probes
+VALIDATION_SENTINEL = Path.home() / ".cache" / "social-agent" / "validated"
+
 
 def setup_logging(log_level: str = None):
-    """Set up logging configuration."""
+    """Set up logging configuration.
+    
+    Log calls only enqueue the record; a listener thread does the console and
+    file writes, so disk I/O stays off the agent threads.
+    """
     log_level = log_level or settings.log_level
-    logging.basicConfig(
-        level=getattr(logging, log_level),
-        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-        handlers=[
-            logging.StreamHandler(),
-            logging.FileHandler("logs/agent.log", mode="a")
-        ]
-    )
+    formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    handlers = [
+        logging.StreamHandler(),
+        logging.FileHandler("logs/agent.log", mode="a", delay=True)
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    
+    log_queue = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    
+    # The queued record carries only the message; the listener's handlers format it
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
+    logging.basicConfig(level=getattr(logging, log_level), handlers=[queue_handler])
 
 
 def run_once():
     """Run the agent once."""
     logger.info("Running agent once")
     try:
+        # Imported here so --validate and --help skip loading the agent stack
+        from scheduler import run_agent_once
+        
         results = run_agent_once()
         
         if "error" in results:
@@ -56,6 +79,8 @@ def run_scheduled():
     """Run the agent on a schedule."""
     logger.info("Starting scheduled agent")
     try:
+        from scheduler import run_scheduler_forever
+        
         run_scheduler_forever()
         return 0
     except KeyboardInterrupt:
@@ -101,6 +126,32 @@ def validate_setup():
     return True
 
 
+def _setup_fingerprint() -> str:
+    """Hash the settings a validation result depends on."""
+    parts = [settings.twitter_bearer_token, settings.twitter_user_id, settings.model_name, settings.database_path]
+    return hashlib.blake2b("\0".join(str(part) for part in parts).encode(), digest_size=16).hexdigest()
+
+
+def setup_recently_validated() -> bool:
+    """Check whether setup passed validation within the last VALIDATION_CACHE_TTL seconds."""
+    if settings.validation_cache_ttl <= 0:
+        return False
+    try:
+        age = time.time() - VALIDATION_SENTINEL.stat().st_mtime
+        return age < settings.validation_cache_ttl and VALIDATION_SENTINEL.read_text() == _setup_fingerprint()
+    except OSError:
+        return False
+
+
+def mark_setup_validated() -> None:
+    """Record a successful validation for the current settings."""
+    try:
+        VALIDATION_SENTINEL.parent.mkdir(parents=True, exist_ok=True)
+        VALIDATION_SENTINEL.write_text(_setup_fingerprint())
+    except OSError as e:
+        logger.warning(f"Could not record setup validation: {e}")
+
+
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(description="Social Media Agent")
@@ -130,14 +181,19 @@ def main():
     # Validate setup if requested
     if args.validate:
         if validate_setup():
+            mark_setup_validated()
             logger.info("Setup validation passed")
             return 0
         else:
             logger.error("Setup validation failed")
             return 1
     
-    # Validate setup before running
-    if not validate_setup():
+    # Validate setup before running, unless it passed recently with the same settings
+    if setup_recently_validated():
+        logger.info("Setup validated recently, skipping checks")
+    elif validate_setup():
+        mark_setup_validated()
+    else:
         logger.error("Setup validation failed. Please check your configuration.")
         return 1
     
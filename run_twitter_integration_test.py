@@ -21,8 +21,10 @@ The test will:
 """
 
 import os
+import signal
 import sys
-import subprocess
+import threading
+from pathlib import Path
 
 def main():
     print("🐦 Twitter Client Integration Test Runner")
@@ -54,10 +56,15 @@ def main():
     print("This will make actual API calls to Twitter!")
     print("\nPress Ctrl+C to cancel, or wait 5 seconds to continue...")
     
+    # Wait on an event so Ctrl+C cancels immediately on every platform
+    cancelled = threading.Event()
+    previous_handler = signal.signal(signal.SIGINT, lambda *_: cancelled.set())
     try:
-        import time
-        time.sleep(5)
-    except KeyboardInterrupt:
+        cancelled.wait(5)
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
+    
+    if cancelled.is_set():
         print("\n❌ Test cancelled by user")
         return 1
     
@@ -67,14 +74,12 @@ def main():
         print("Running integration test...")
         print("=" * 50)
         
-        # Run the test using pytest
-        result = subprocess.run([
-            sys.executable, '-m', 'pytest', 
-            'sources/test/test_tweetpy_client.py::test_real_integration',
-            '-v', '-s'
-        ], cwd='/workspaces/social-agent')
+        # Run the test with pytest in this interpreter rather than a subprocess
+        import pytest
+        test_path = Path(__file__).parent / 'sources' / 'test' / 'test_tweetpy_client.py'
+        returncode = pytest.main([f'{test_path}::test_real_integration', '-m', 'integration', '-v', '-s'])
         
-        if result.returncode == 0:
+        if returncode == 0:
             print("\n🎉 Integration test PASSED!")
             print("Your Twitter client is working perfectly!")
             print("\n✅ Verified functionality:")
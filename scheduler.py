@@ -6,20 +6,27 @@ jitter, rate limiting, and error handling.
 """
 
 import logging
-import random
+import queue
+import secrets
+import signal
+import threading
 import time
 from typing import Optional, Callable, Dict, Any
 from datetime import datetime, timedelta
 
 try:
     from apscheduler.schedulers.background import BackgroundScheduler
+    from apscheduler.executors.pool import ThreadPoolExecutor
     from apscheduler.triggers.cron import CronTrigger
+    from apscheduler.triggers.interval import IntervalTrigger
     from apscheduler.events import EVENT_JOB_EXECUTED, EVENT_JOB_ERROR
     APSCHEDULER_AVAILABLE = True
 except ImportError:
     APSCHEDULER_AVAILABLE = False
     BackgroundScheduler = None
+    ThreadPoolExecutor = None
     CronTrigger = None
+    IntervalTrigger = None
 
 from agents.supervisor import SupervisorAgent
 from storage import storage
@@ -27,6 +34,14 @@ from config import settings
 
 logger = logging.getLogger(__name__)
 
+# Queued to tell the stats writer thread to flush and exit
+_STOP_STATS = object()
+
+# Database upkeep jobs, run alongside the agent cycle but not counted in its stats
+_STORAGE_OPTIMIZE_JOB_ID = "storage_optimize"
+_STORAGE_CHECKPOINT_JOB_ID = "storage_checkpoint"
+_MAINTENANCE_JOB_IDS = frozenset({_STORAGE_OPTIMIZE_JOB_ID, _STORAGE_CHECKPOINT_JOB_ID})
+
 
 class AgentScheduler:
     """Scheduler for running the social media agent with proper error handling."""
@@ -41,10 +56,18 @@ class AgentScheduler:
             raise ImportError("APScheduler is required for scheduling functionality")
         
         self.supervisor = supervisor_agent or SupervisorAgent()
-        self.scheduler = BackgroundScheduler()
+        # One cycle in flight at a time; runs missed while it was busy are dropped, not replayed
+        self.scheduler = BackgroundScheduler(
+            executors={"default": ThreadPoolExecutor(max_workers=2)},
+            job_defaults={"coalesce": True, "max_instances": 1, "misfire_grace_time": 60}
+        )
         self.job_id = "social_media_agent_job"
         self.is_running = False
         
+        # Listener stats are coalesced here and written by a background thread
+        self._stats_queue = queue.Queue()
+        self._stats_thread = None
+        
         # Set up event listeners
         self.scheduler.add_listener(self._job_executed_listener, EVENT_JOB_EXECUTED)
         self.scheduler.add_listener(self._job_error_listener, EVENT_JOB_ERROR)
@@ -53,22 +76,71 @@ class AgentScheduler:
     
     def _job_executed_listener(self, event):
         """Handle successful job execution."""
+        if event.job_id in _MAINTENANCE_JOB_IDS:
+            return
         logger.info(f"Job {event.job_id} executed successfully")
         
-        # Update daily stats
-        storage.update_daily_stats({
-            "tweets_processed": 1,
-            "errors_encountered": 0
-        })
+        cache_stats = self.supervisor.decider.get_cache_stats()
+        logger.info(f"Decision cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+                    f"({cache_stats['hit_rate']:.0%} hit rate)")
+        
+        self._stats_queue.put_nowait({"tweets_processed": 1})
     
     def _job_error_listener(self, event):
         """Handle job execution errors."""
         logger.error(f"Job {event.job_id} failed with error: {event.exception}")
+        if event.job_id in _MAINTENANCE_JOB_IDS:
+            return
         
-        # Update daily stats
-        storage.update_daily_stats({
-            "errors_encountered": 1
-        })
+        self._stats_queue.put_nowait({"errors_encountered": 1})
+    
+    def _flush_stats(self, pending: Dict[str, int]) -> None:
+        """Write coalesced stat increments in a single storage update."""
+        if not pending:
+            return
+        try:
+            storage.update_daily_stats(pending)
+        except Exception as e:
+            logger.error(f"Error writing daily stats: {e}")
+    
+    def _stats_writer(self) -> None:
+        """Drain the stats queue, writing the summed increments every flush interval."""
+        pending: Dict[str, int] = {}
+        next_flush = time.monotonic() + settings.stats_flush_interval
+        
+        while True:
+            try:
+                delta = self._stats_queue.get(timeout=max(0.0, next_flush - time.monotonic()))
+            except queue.Empty:
+                delta = None
+            
+            if delta is _STOP_STATS:
+                break
+            if delta:
+                for key, increment in delta.items():
+                    pending[key] = pending.get(key, 0) + increment
+            
+            if time.monotonic() >= next_flush:
+                self._flush_stats(pending)
+                pending = {}
+                next_flush = time.monotonic() + settings.stats_flush_interval
+        
+        self._flush_stats(pending)
+    
+    def _start_stats_writer(self) -> None:
+        """Start the background stats writer thread."""
+        self._stats_thread = threading.Thread(
+            target=self._stats_writer, name="scheduler-stats-writer", daemon=True
+        )
+        self._stats_thread.start()
+    
+    def _stop_stats_writer(self) -> None:
+        """Flush any queued stats and stop the writer thread."""
+        if self._stats_thread is None:
+            return
+        self._stats_queue.put(_STOP_STATS)
+        self._stats_thread.join()
+        self._stats_thread = None
     
     def _run_agent_cycle(self) -> Dict[str, Any]:
         """Run a single cycle of the agent and return results."""
@@ -115,7 +187,8 @@ class AgentScheduler:
             Jittered minute value
         """
         # Add random jitter of ±10 minutes
-        jitter = random.randint(-10, 10)
+        # secrets draws from the OS, independent of any random.seed() elsewhere
+        jitter = secrets.randbelow(21) - 10
         jittered_minute = base_minute + jitter
         
         # Ensure minute is within valid range (0-59)
@@ -153,13 +226,25 @@ class AgentScheduler:
             func=self._run_agent_cycle,
             trigger=trigger,
             id=self.job_id,
-            name="Social Media Agent Cycle",
-            max_instances=1,  # Prevent overlapping executions
-            coalesce=True,    # Skip missed executions
-            misfire_grace_time=300  # 5 minutes grace time
+            name="Social Media Agent Cycle"
+        )
+        
+        # Keep the database's planner statistics fresh and its WAL small
+        self.scheduler.add_job(
+            func=storage.optimize,
+            trigger=IntervalTrigger(seconds=settings.storage_optimize_interval),
+            id=_STORAGE_OPTIMIZE_JOB_ID,
+            name="Storage Optimize"
+        )
+        self.scheduler.add_job(
+            func=storage.checkpoint,
+            trigger=IntervalTrigger(seconds=settings.storage_checkpoint_interval),
+            id=_STORAGE_CHECKPOINT_JOB_ID,
+            name="Storage WAL Checkpoint"
         )
         
         # Start the scheduler
+        self._start_stats_writer()
         self.scheduler.start()
         self.is_running = True
         
@@ -176,6 +261,7 @@ class AgentScheduler:
             return
         
         self.scheduler.shutdown()
+        self._stop_stats_writer()
         self.is_running = False
         logger.info("Scheduler stopped")
     
@@ -241,10 +327,7 @@ class AgentScheduler:
             func=self._run_agent_cycle,
             trigger=trigger,
             id=self.job_id,
-            name="Social Media Agent Cycle",
-            max_instances=1,
-            coalesce=True,
-            misfire_grace_time=300
+            name="Social Media Agent Cycle"
         )
         
         logger.info(f"Schedule updated: every {schedule_hours} hours at minute {jittered_minute}")
@@ -254,6 +337,24 @@ class AgentScheduler:
         logger.info(f"Next scheduled run: {next_run}")
 
 
+_shared_scheduler: Optional[AgentScheduler] = None
+_shared_scheduler_lock = threading.Lock()
+
+
+def get_shared_scheduler() -> AgentScheduler:
+    """Return the process-wide scheduler, building its SupervisorAgent on first use.
+    
+    run_agent_once and run_scheduler_forever share this instance so the agents,
+    model adapter and ranker are initialized once per process.
+    """
+    global _shared_scheduler
+    if _shared_scheduler is None:
+        with _shared_scheduler_lock:
+            if _shared_scheduler is None:
+                _shared_scheduler = AgentScheduler()
+    return _shared_scheduler
+
+
 def run_scheduler_forever(schedule_hours: str = None, schedule_minutes: str = None) -> None:
     """Run the scheduler indefinitely with the specified schedule.
     
@@ -266,18 +367,19 @@ def run_scheduler_forever(schedule_hours: str = None, schedule_minutes: str = No
         return
     
     try:
-        scheduler = AgentScheduler()
+        scheduler = get_shared_scheduler()
         scheduler.start_scheduler(schedule_hours, schedule_minutes)
         
+        # Block the main thread until Ctrl+C or SIGTERM instead of polling
+        stop_event = threading.Event()
+        signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+        signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+        
         logger.info("Scheduler running. Press Ctrl+C to stop.")
+        stop_event.wait()
         
-        # Keep the main thread alive
-        try:
-            while True:
-                time.sleep(60)  # Check every minute
-        except KeyboardInterrupt:
-            logger.info("Received interrupt signal. Stopping scheduler...")
-            scheduler.stop_scheduler()
+        logger.info("Received interrupt signal. Stopping scheduler...")
+        scheduler.stop_scheduler()
             
     except Exception as e:
         logger.error(f"Error running scheduler: {e}")
@@ -291,8 +393,7 @@ def run_agent_once() -> Dict[str, Any]:
         Results from the agent cycle
     """
     try:
-        scheduler = AgentScheduler()
-        return scheduler.run_once()
+        return get_shared_scheduler().run_once()
     except Exception as e:
         logger.error(f"Error running agent once: {e}")
         return {"error": str(e)}
@@ -39,28 +39,39 @@ examples【161930785819024†L246-L260】【100028572330983†L150-L198】.
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import json
 import logging
 import os
 import random
+import re
 import sqlite3
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # APScheduler is an optional dependency used for scheduling repeated runs of
 # the agent.  When the library is unavailable (for example in a testing
 # environment), the scheduler parts of this script will gracefully degrade.
 try:
-    from apscheduler.schedulers.background import BackgroundScheduler  # type: ignore
+    from apscheduler.schedulers.blocking import BlockingScheduler  # type: ignore
 except ImportError:
-    BackgroundScheduler = None  # type: ignore
+    BlockingScheduler = None  # type: ignore
 
 # ADK imports.  The ADK library exposes agent types and a lightweight in‑memory
 # runner for executing them directly in Python【100028572330983†L150-L208】.
+# orjson speeds up parsing the kernel's JSON replies when it is installed.
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None  # type: ignore
+
 from google.adk.agents import LlmAgent
 from google.adk.runners import InMemoryRunner
 from google.adk.sessions import InMemorySessionService
@@ -108,6 +119,41 @@ value modest helps stay within the free tier limits for Twitter's API
 【100028572330983†L150-L198】.
 """
 
+SEARCH_CONCURRENCY: int = int(os.environ.get("SEARCH_CONCURRENCY", "8"))
+"""Maximum number of search queries sent to Twitter at the same time.
+"""
+
+ACTION_CONCURRENCY: int = int(os.environ.get("ACTION_CONCURRENCY", "4"))
+"""Maximum number of like/reply requests sent to Twitter at the same time.
+"""
+
+MAX_QUERY_LENGTH = 512
+"""Longest query string the recent-search endpoint accepts.
+"""
+
+
+def _build_queries(terms: List[str]) -> List[Tuple[str, str, int]]:
+    """Return (label, query, max_results) for each search request of a run.
+
+    All terms are combined into one OR query when it fits within
+    `MAX_QUERY_LENGTH`, replacing one request per term with a single call;
+    otherwise each term is searched separately.  Retweets are filtered out
+    to reduce noise.
+    """
+    terms = [term.strip() for term in terms if term.strip()]
+    if len(terms) > 1:
+        # Parenthesise multi-word terms so OR applies to the whole phrase
+        alternatives = [f"({term})" if " " in term else term for term in terms]
+        combined = "(" + " OR ".join(alternatives) + ") -is:retweet"
+        if len(combined) <= MAX_QUERY_LENGTH:
+            return [(", ".join(terms), combined, min(100, MAX_TWEETS_PER_RUN * len(terms)))]
+    return [(term, f"{term} -is:retweet", MAX_TWEETS_PER_RUN) for term in terms]
+
+
+QUERIES: List[Tuple[str, str, int]] = _build_queries(SEARCH_TERMS)
+"""Search requests issued on every run, computed once at import.
+"""
+
 DATABASE_PATH = os.environ.get("DATABASE_PATH", "/tmp/agent_state.db")
 """Path to the SQLite database used to record processed tweets.  This
 prevents acting on the same tweet multiple times.
@@ -136,20 +182,50 @@ if not TWITTER_USER_ID:
 # Twitter API helper functions
 # ---------------------------------------------------------------------------
 
+_TWITTER_HEADERS: Dict[str, str] = {
+    "Authorization": f"Bearer {TWITTER_BEARER_TOKEN}",
+    "Content-Type": "application/json",
+}
+
+
 def twitter_headers() -> Dict[str, str]:
-    """Return HTTP headers required for Twitter API requests."""
-    return {
-        "Authorization": f"Bearer {TWITTER_BEARER_TOKEN}",
-        "Content-Type": "application/json",
-    }
+    """Return HTTP headers required for Twitter API requests.
+
+    The dictionary is built once at import and shared; do not modify it.
+    """
+    return _TWITTER_HEADERS
+
+
+def _build_session() -> requests.Session:
+    """Create the pooled HTTP session shared by all Twitter API helpers.
+
+    Reusing one session keeps TCP/TLS connections alive between calls instead
+    of paying a fresh handshake per request.  Idempotent requests are retried
+    on transient server errors; 429s are not, since the rate-limit window
+    lasts far longer than any short backoff.
+    """
+    session = requests.Session()
+    session.headers.update(twitter_headers())
+    retry = Retry(total=3, backoff_factor=0.3, status_forcelist=(500, 502, 503, 504))
+    session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry))
+    return session
+
+
+_SESSION = _build_session()
 
 
-def search_tweets(query: str, max_results: int = 10) -> List[Dict]:
+def close_session() -> None:
+    """Close the shared HTTP session and its pooled connections."""
+    _SESSION.close()
+
+
+def search_tweets(query: str, max_results: int = 10, since_id: Optional[str] = None) -> List[Dict]:
     """Perform a recent search on Twitter for the given query.
 
     Args:
         query: The search terms.
         max_results: Maximum number of tweets to return (1–100).
+        since_id: When given, only tweets newer than this ID are returned.
 
     Returns:
         A list of tweet objects returned by the Twitter API.  Each object
@@ -164,13 +240,15 @@ def search_tweets(query: str, max_results: int = 10) -> List[Dict]:
         "max_results": max_results,
         "tweet.fields": "conversation_id,author_id"
     }
+    if since_id:
+        params["since_id"] = since_id
     try:
-        response = requests.get(url, headers=twitter_headers(), params=params)
+        response = _SESSION.get(url, params=params)
         response.raise_for_status()
         data = response.json()
         return data.get("data", [])
     except Exception as exc:
-        logger.error(f"Error searching tweets: {exc}")
+        logger.error("Error searching tweets: %s", exc)
         return []
 
 
@@ -185,18 +263,18 @@ def like_tweet(tweet_id: str) -> None:
         limited【100028572330983†L150-L198】.  Errors are logged but not raised.
     """
     if not (TWITTER_BEARER_TOKEN and TWITTER_USER_ID):
-        logger.info(f"Skipping like for tweet {tweet_id} – missing credentials.")
+        logger.info("Skipping like for tweet %s – missing credentials.", tweet_id)
         return
     url = f"https://api.twitter.com/2/users/{TWITTER_USER_ID}/likes"
     payload = {"tweet_id": tweet_id}
     try:
-        resp = requests.post(url, headers=twitter_headers(), json=payload)
+        resp = _SESSION.post(url, json=payload)
         if resp.status_code == 200 or resp.status_code == 201:
-            logger.info(f"Liked tweet {tweet_id}.")
+            logger.info("Liked tweet %s.", tweet_id)
         else:
-            logger.warning(f"Failed to like tweet {tweet_id}: {resp.status_code} {resp.text}")
+            logger.warning("Failed to like tweet %s: %s %s", tweet_id, resp.status_code, resp.text)
     except Exception as exc:
-        logger.error(f"Error liking tweet {tweet_id}: {exc}")
+        logger.error("Error liking tweet %s: %s", tweet_id, exc)
 
 
 def reply_to_tweet(tweet_id: str, text: str) -> None:
@@ -212,7 +290,7 @@ def reply_to_tweet(tweet_id: str, text: str) -> None:
         raising on failure.
     """
     if not TWITTER_BEARER_TOKEN:
-        logger.info(f"Skipping reply to tweet {tweet_id} – missing credentials.")
+        logger.info("Skipping reply to tweet %s – missing credentials.", tweet_id)
         return
     url = "https://api.twitter.com/2/tweets"
     payload = {
@@ -220,13 +298,13 @@ def reply_to_tweet(tweet_id: str, text: str) -> None:
         "reply": {"in_reply_to_tweet_id": tweet_id},
     }
     try:
-        resp = requests.post(url, headers=twitter_headers(), json=payload)
+        resp = _SESSION.post(url, json=payload)
         if resp.status_code in (200, 201):
-            logger.info(f"Replied to tweet {tweet_id}: {text[:30]}…")
+            logger.info("Replied to tweet %s: %.30s…", tweet_id, text)
         else:
-            logger.warning(f"Failed to reply to tweet {tweet_id}: {resp.status_code} {resp.text}")
+            logger.warning("Failed to reply to tweet %s: %s %s", tweet_id, resp.status_code, resp.text)
     except Exception as exc:
-        logger.error(f"Error replying to tweet {tweet_id}: {exc}")
+        logger.error("Error replying to tweet %s: %s", tweet_id, exc)
 
 
 def get_conversation_replies(conversation_id: str, max_results: int = 20) -> List[Dict]:
@@ -249,12 +327,12 @@ def get_conversation_replies(conversation_id: str, max_results: int = 20) -> Lis
         "tweet.fields": "conversation_id,author_id"
     }
     try:
-        response = requests.get(url, headers=twitter_headers(), params=params)
+        response = _SESSION.get(url, params=params)
         response.raise_for_status()
         data = response.json()
         return data.get("data", [])
     except Exception as exc:
-        logger.error(f"Error retrieving conversation replies: {exc}")
+        logger.error("Error retrieving conversation replies: %s", exc)
         return []
 
 
@@ -262,31 +340,116 @@ def get_conversation_replies(conversation_id: str, max_results: int = 20) -> Lis
 # Database helper functions
 # ---------------------------------------------------------------------------
 
+class SeenFilter:
+    """A small Bloom filter of processed tweet IDs.
+
+    `has_seen` consults it before SQLite: a negative answer is definite, so
+    the common case of a new tweet never touches the database.  Only a
+    "maybe" falls through to the real lookup.
+    """
+
+    # Odd 64-bit multipliers; each gives an independent probe position
+    _MULTIPLIERS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9)
+    _MASK = (1 << 64) - 1
+
+    def __init__(self, bits_log2: int = 23) -> None:
+        self._shift = 64 - bits_log2
+        self._bits = bytearray(1 << (bits_log2 - 3))
+
+    def _positions(self, tweet_id: int):
+        for multiplier in self._MULTIPLIERS:
+            yield ((tweet_id * multiplier) & self._MASK) >> self._shift
+
+    def add(self, tweet_id: int) -> None:
+        for position in self._positions(tweet_id):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def might_contain(self, tweet_id: int) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(tweet_id))
+
+
+# Loaded from `seen_tweets` on the first `init_db` and kept current by
+# `mark_seen_many`; this process is the only writer of the table.
+_SEEN_FILTER: Optional[SeenFilter] = None
+
+
 def init_db() -> sqlite3.Connection:
     """Initialise the SQLite database and return a connection.
 
-    The database contains a single table `seen_tweets` with a primary key on
-    `tweet_id`.  A simple index prevents duplicate actions for the same tweet.
+    The table `seen_tweets` has a primary key on `tweet_id`, which prevents
+    duplicate actions for the same tweet.  The table `query_state` records the
+    newest tweet ID seen for each search query so later runs only fetch newer
+    tweets, and `kernel_cache` keeps kernel decisions for repeated tweet texts.
     """
     conn = sqlite3.connect(DATABASE_PATH)
+    # Single writer with small, frequent commits: WAL with synchronous=NORMAL
+    # avoids an fsync of a rollback journal on every commit and stays durable
+    # across application crashes.
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")
+    # Tweet IDs fit in 64 bits, so the key doubles as the rowid instead of a
+    # separate TEXT index.  Databases created with the old TEXT schema still
+    # work: SQLite converts the integer IDs to text when comparing.
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS seen_tweets (tweet_id INTEGER PRIMARY KEY, processed_at INTEGER)"
+    )
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS query_state (query TEXT PRIMARY KEY, since_id TEXT)"
+    )
     conn.execute(
-        "CREATE TABLE IF NOT EXISTS seen_tweets (tweet_id TEXT PRIMARY KEY, processed_at TEXT)"
+        "CREATE TABLE IF NOT EXISTS kernel_cache (hash TEXT PRIMARY KEY, decision TEXT, comment TEXT)"
     )
     conn.commit()
+    global _SEEN_FILTER
+    if _SEEN_FILTER is None:
+        _SEEN_FILTER = SeenFilter()
+        for (tweet_id,) in conn.execute("SELECT tweet_id FROM seen_tweets"):
+            _SEEN_FILTER.add(int(tweet_id))
     return conn
 
 
 def has_seen(conn: sqlite3.Connection, tweet_id: str) -> bool:
     """Check whether a tweet ID has already been processed."""
+    tweet_id = int(tweet_id)
+    if _SEEN_FILTER is not None and not _SEEN_FILTER.might_contain(tweet_id):
+        return False
     cur = conn.execute("SELECT 1 FROM seen_tweets WHERE tweet_id = ?", (tweet_id,))
     return cur.fetchone() is not None
 
 
 def mark_seen(conn: sqlite3.Connection, tweet_id: str) -> None:
     """Record that a tweet has been processed."""
+    mark_seen_many(conn, [tweet_id])
+
+
+def mark_seen_many(conn: sqlite3.Connection, tweet_ids: List[str]) -> None:
+    """Record several processed tweets in a single transaction."""
+    processed_at = int(time.time())
+    tweet_ids = [int(tweet_id) for tweet_id in tweet_ids]
+    with conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO seen_tweets (tweet_id, processed_at) VALUES (?, ?)",
+            [(tweet_id, processed_at) for tweet_id in tweet_ids],
+        )
+    if _SEEN_FILTER is not None:
+        for tweet_id in tweet_ids:
+            _SEEN_FILTER.add(tweet_id)
+
+
+def get_since_id(conn: sqlite3.Connection, query: str) -> Optional[str]:
+    """Return the newest tweet ID already fetched for a query, if any."""
+    cur = conn.execute("SELECT since_id FROM query_state WHERE query = ?", (query,))
+    row = cur.fetchone()
+    return row[0] if row else None
+
+
+def set_since_id(conn: sqlite3.Connection, query: str, since_id: str) -> None:
+    """Record the newest tweet ID fetched for a query."""
     conn.execute(
-        "INSERT OR IGNORE INTO seen_tweets (tweet_id, processed_at) VALUES (?, ?)",
-        (tweet_id, datetime.utcnow().isoformat()),
+        "INSERT OR REPLACE INTO query_state (query, since_id) VALUES (?, ?)",
+        (query, since_id),
     )
     conn.commit()
 
@@ -295,6 +458,65 @@ def mark_seen(conn: sqlite3.Connection, tweet_id: str) -> None:
 # Kernel: define the classification agent using ADK
 # ---------------------------------------------------------------------------
 
+def _load_json(payload: str):
+    """Parse JSON with orjson when available, falling back to `json`.
+
+    orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers only
+    need to handle the standard exception.
+    """
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+def _compact_prompt(text: str) -> str:
+    """Collapse runs of spaces and trim each line of a prompt.
+
+    The instruction is sent with every kernel call, so whitespace the model
+    does not need is removed once at import time rather than billed per call.
+    """
+    return "\n".join(" ".join(line.split()) for line in text.splitlines()).strip()
+
+
+KERNEL_INSTRUCTION: str = _compact_prompt(
+    "You are a social media analysis agent.  You will be given the text of a "
+    "tweet.  Carefully read the tweet and decide which of the following "
+    "actions should be taken: \n"
+    "1. \"interesting\" – the tweet is relevant but no immediate action is needed.\n"
+    "2. \"like\" – the tweet is valuable and should be liked.\n"
+    "3. \"comment\" – reply to the tweet with a concise, positive comment.  Also "
+    "provide the comment text.\n"
+    "4. \"dig_deeper\" – the tweet hints at a valuable thread; the agent should "
+    "read the conversation replies before acting.\n"
+    "\nOutput your answer strictly as a JSON object with two keys: \"decision\" "
+    "and \"comment\".  For example: {\"decision\": \"like\", \"comment\": \"Great post!\"}.\n"
+    "Do not include any additional keys or text outside the JSON.\n"
+    "\nYou may instead be given a JSON array of tweets such as "
+    "[{\"i\": 0, \"t\": \"tweet text\"}, ...].  In that case decide on each "
+    "tweet independently and output only a JSON array with one object per tweet: "
+    "{\"i\": <the tweet's i>, \"decision\": ..., \"comment\": ...}."
+)
+"""The kernel agent's instruction, built once at import."""
+
+
+_URL_PATTERN = re.compile(r"https?://\S+")
+_MENTION_PATTERN = re.compile(r"@\w+")
+
+KERNEL_CACHE_SIZE: int = int(os.environ.get("KERNEL_CACHE_SIZE", "2048"))
+"""Number of kernel decisions kept in memory for repeated tweet texts.
+"""
+
+
+def _normalize_tweet_text(text: str) -> str:
+    """Reduce a tweet to the text that matters for classification.
+
+    Lowercases and drops URLs and @mentions, so template posts that differ
+    only in links or tagged accounts share one cache entry.
+    """
+    text = _MENTION_PATTERN.sub("", _URL_PATTERN.sub("", text.lower()))
+    return " ".join(text.split())
+
+
 def create_kernel_agent() -> LlmAgent:
     """Create and return the kernel agent responsible for classifying tweets.
 
@@ -306,29 +528,15 @@ def create_kernel_agent() -> LlmAgent:
     * `comment` – when the decision is "comment", this field should contain
       the text to reply with.  For other decisions, it may be an empty string.
 
-    You can modify the instruction string below to tune the behaviour of the
+    You can modify `KERNEL_INSTRUCTION` to tune the behaviour of the
     kernel.  The instruction contains a few example cases to guide the model
     (few‑shot examples) and constraints for the JSON output.【161930785819024†L320-L341】
     """
-    instruction = (
-        "You are a social media analysis agent.  You will be given the text of a "
-        "tweet.  Carefully read the tweet and decide which of the following "
-        "actions should be taken: \n"
-        "1. \"interesting\" – the tweet is relevant but no immediate action is needed.\n"
-        "2. \"like\" – the tweet is valuable and should be liked.\n"
-        "3. \"comment\" – reply to the tweet with a concise, positive comment.  Also "
-        "provide the comment text.\n"
-        "4. \"dig_deeper\" – the tweet hints at a valuable thread; the agent should "
-        "read the conversation replies before acting.\n"
-        "\nOutput your answer strictly as a JSON object with two keys: \"decision\" "
-        "and \"comment\".  For example: {\"decision\": \"like\", \"comment\": \"Great post!\"}.\n"
-        "Do not include any additional keys or text outside the JSON."
-    )
     kernel_agent = LlmAgent(
         model=MODEL_NAME,
         name="kernel_agent",
         description="Classifies tweets and optionally generates comments.",
-        instruction=instruction,
+        instruction=KERNEL_INSTRUCTION,
         # The output_key stores the final response in the session state.  We
         # choose a descriptive key name.
         output_key="kernel_result",
@@ -342,57 +550,192 @@ class KernelRunner:
     Running an ADK agent requires a `Runner` and a `Session` service.  This
     helper class hides the boilerplate so that classification can be called
     synchronously from regular Python code.  Internally it manages a single
-    in‑memory session.
+    in‑memory session and one event loop that every synchronous call reuses;
+    async callers can use `aensure_session` and `aclassify` directly.
     """
 
-    def __init__(self, agent: LlmAgent, app_name: str = "twitter_kernel_app") -> None:
+    def __init__(self, agent: LlmAgent, app_name: str = "twitter_kernel_app",
+                 conn: Optional[sqlite3.Connection] = None) -> None:
         self.agent = agent
         self.app_name = app_name
         self.session_service = InMemorySessionService()
         # Create runner
         self.runner = InMemoryRunner(agent=agent, app_name=app_name, session_service=self.session_service)
-        # Create a session immediately
+        # The session is created lazily on first use
         self.session_id = None
-
-    def ensure_session(self) -> str:
+        # Reused by the synchronous wrappers instead of a new loop per call
+        self._loop = asyncio.new_event_loop()
+        # Decisions for repeated tweet texts, in memory (LRU) and optionally
+        # persisted in the `kernel_cache` table of `conn`
+        self.conn = conn
+        self._decision_cache: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+
+    async def aensure_session(self) -> str:
         """Ensure that a session exists and return its ID."""
         if self.session_id is None:
-            session = asyncio.run(self.session_service.create_session(app_name=self.app_name, user_id="user"))
+            session = await self.session_service.create_session(app_name=self.app_name, user_id="user")
             self.session_id = session.id
         return self.session_id
 
-    def classify(self, tweet_text: str) -> Optional[Dict[str, str]]:
-        """Run the kernel agent on a single tweet and return the JSON decision.
-
-        Args:
-            tweet_text: The raw text of the tweet to classify.
+    def ensure_session(self) -> str:
+        """Synchronous wrapper around `aensure_session`."""
+        if self.session_id is None:
+            self._loop.run_until_complete(self.aensure_session())
+        return self.session_id
 
-        Returns:
-            A dictionary with keys "decision" and "comment" if classification
-            succeeds.  Returns None if the agent fails to return a JSON result.
-        """
-        session_id = self.ensure_session()
-        user_content = types.Content(role="user", parts=[types.Part.from_text(tweet_text)])
+    async def _arun(self, message: str) -> Optional[str]:
+        """Send one message to the kernel agent and return its final text."""
+        session_id = await self.aensure_session()
+        user_content = types.Content(role="user", parts=[types.Part.from_text(text=message)])
         final_response: Optional[str] = None
         # Run the agent.  Iterate over events to collect the final response.
-        for event in self.runner.run(user_id="user", session_id=session_id, new_message=user_content):
+        async for event in self.runner.run_async(user_id="user", session_id=session_id, new_message=user_content):
             if event.is_final_response() and event.content and event.content.parts:
                 final_response = event.content.parts[0].text
+        return final_response
+
+    def _run(self, message: str) -> Optional[str]:
+        """Synchronous wrapper around `_arun` on the runner's own loop."""
+        return self._loop.run_until_complete(self._arun(message))
+
+    def close(self) -> None:
+        """Close the event loop used by the synchronous wrappers."""
+        self._loop.close()
+
+    @staticmethod
+    def _parse_decision(final_response: Optional[str]) -> Optional[Dict[str, str]]:
+        """Parse a single-tweet kernel response into a decision dictionary."""
         if not final_response:
             logger.warning("Kernel agent returned no final response for tweet.")
             return None
         # Parse the JSON safely
         try:
-            result = json.loads(final_response)
+            result = _load_json(final_response)
             if isinstance(result, dict) and "decision" in result and "comment" in result:
                 return {"decision": result.get("decision", ""), "comment": result.get("comment", "")}
             else:
-                logger.warning(f"Kernel result missing expected keys: {result}")
+                logger.warning("Kernel result missing expected keys: %s", result)
                 return None
         except json.JSONDecodeError:
-            logger.warning(f"Kernel result is not valid JSON: {final_response}")
+            logger.warning("Kernel result is not valid JSON: %s", final_response)
             return None
 
+    async def aclassify(self, tweet_text: str) -> Optional[Dict[str, str]]:
+        """Async form of `classify` for callers already inside an event loop."""
+        return self._parse_decision(await self._arun(tweet_text))
+
+    def classify(self, tweet_text: str) -> Optional[Dict[str, str]]:
+        """Run the kernel agent on a single tweet and return the JSON decision.
+
+        Args:
+            tweet_text: The raw text of the tweet to classify.
+
+        Returns:
+            A dictionary with keys "decision" and "comment" if classification
+            succeeds.  Returns None if the agent fails to return a JSON result.
+        """
+        key = self._cache_key(tweet_text)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        result = self._parse_decision(self._run(tweet_text))
+        self._cache_put(key, result)
+        return result
+
+    @staticmethod
+    def _cache_key(tweet_text: str) -> Optional[str]:
+        """Hash the normalized tweet text; None when nothing is left to key on."""
+        normalized = _normalize_tweet_text(tweet_text)
+        if not normalized:
+            return None
+        return hashlib.blake2b(normalized.encode(), digest_size=16).hexdigest()
+
+    def _cache_get(self, key: Optional[str]) -> Optional[Dict[str, str]]:
+        """Return a copy of the cached decision for a key, if any."""
+        if key is None:
+            return None
+        if key in self._decision_cache:
+            self._decision_cache.move_to_end(key)
+            return dict(self._decision_cache[key])
+        if self.conn is not None:
+            row = self.conn.execute(
+                "SELECT decision, comment FROM kernel_cache WHERE hash = ?", (key,)
+            ).fetchone()
+            if row:
+                result = {"decision": row[0], "comment": row[1]}
+                self._remember(key, result)
+                return dict(result)
+        return None
+
+    def _cache_put(self, key: Optional[str], result: Optional[Dict[str, str]]) -> None:
+        """Cache a decision unless it is a reply.
+
+        Replies are never reused: repeating one comment under every copy of a
+        templated tweet is exactly the spam pattern the agent must avoid.
+        """
+        if key is None or result is None or result["decision"].lower() == "comment":
+            return
+        self._remember(key, result)
+        if self.conn is not None:
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO kernel_cache (hash, decision, comment) VALUES (?, ?, ?)",
+                    (key, result["decision"], result["comment"]),
+                )
+
+    def _remember(self, key: str, result: Dict[str, str]) -> None:
+        self._decision_cache[key] = result
+        self._decision_cache.move_to_end(key)
+        while len(self._decision_cache) > KERNEL_CACHE_SIZE:
+            self._decision_cache.popitem(last=False)
+
+    def classify_batch(self, tweet_texts: List[str]) -> List[Optional[Dict[str, str]]]:
+        """Classify several tweets with a single kernel agent call.
+
+        The tweets are sent as one JSON array so the request and prompt
+        overhead is paid once per batch rather than once per tweet.  Tweets
+        whose normalized text already has a cached decision are not sent.
+        Tweets the response does not cover, or every tweet if the response
+        cannot be parsed, fall back to individual `classify` calls.
+
+        Args:
+            tweet_texts: The raw texts of the tweets to classify.
+
+        Returns:
+            One decision dictionary (or None) per input text, in input order.
+        """
+        keys = [self._cache_key(text) for text in tweet_texts]
+        results = [self._cache_get(key) for key in keys]
+        misses = [i for i, result in enumerate(results) if result is None]
+        if misses:
+            decided = self._classify_batch_uncached([tweet_texts[i] for i in misses])
+            for i, result in zip(misses, decided):
+                self._cache_put(keys[i], result)
+                results[i] = result
+        return results
+
+    def _classify_batch_uncached(self, tweet_texts: List[str]) -> List[Optional[Dict[str, str]]]:
+        """Send tweets to the kernel in one call, falling back per tweet."""
+        if len(tweet_texts) <= 1:
+            return [self.classify(text) for text in tweet_texts]
+
+        payload = json.dumps([{"i": i, "t": text} for i, text in enumerate(tweet_texts)])
+        final_response = self._run(payload)
+        decisions: Dict[int, Dict[str, str]] = {}
+        try:
+            items = _load_json(final_response or "")
+            if not isinstance(items, list):
+                raise ValueError("expected a JSON array")
+            for item in items:
+                if isinstance(item, dict) and "decision" in item and "comment" in item:
+                    decisions[item.get("i")] = {"decision": item.get("decision", ""),
+                                                "comment": item.get("comment", "")}
+        except ValueError:
+            logger.warning("Kernel batch result is not a valid JSON array: %s", final_response)
+
+        return [decisions[i] if i in decisions else self.classify(text)
+                for i, text in enumerate(tweet_texts)]
+
 
 # ---------------------------------------------------------------------------
 # Main agent loop
@@ -401,8 +744,9 @@ class KernelRunner:
 def process_tweets_once(conn: sqlite3.Connection, kernel: KernelRunner) -> None:
     """Perform a single run of the agent: search, classify and act on tweets.
 
-    This function searches Twitter for each term in `SEARCH_TERMS`, takes up
-    to `MAX_TWEETS_PER_RUN` results, and processes them using the kernel
+    This function searches Twitter for the terms in `SEARCH_TERMS` (one
+    combined query when possible, see `QUERIES`), takes up to
+    `MAX_TWEETS_PER_RUN` results per term, and processes them using the kernel
     agent.  For each tweet, the decision returned by the kernel dictates the
     next action:
 
@@ -414,67 +758,96 @@ def process_tweets_once(conn: sqlite3.Connection, kernel: KernelRunner) -> None:
 
     The function keeps track of processed tweets in a SQLite database to avoid
     acting on the same tweet repeatedly.  Any errors encountered during
-    network calls are logged but do not halt processing.
+    network calls are logged but do not halt processing.  The searches for
+    all queries are issued concurrently and each query's tweets are classified
+    as soon as its results arrive, in query order.  Likes and replies run on a small
+    worker pool so the kernel never waits on them.
     """
-    for term in SEARCH_TERMS:
-        # Compose a query; filter out retweets and replies to reduce noise.
-        query = f"{term} -is:retweet"
-        tweets = search_tweets(query, max_results=MAX_TWEETS_PER_RUN)
-        logger.info(f"Found {len(tweets)} tweets for query '{term}'.")
-        for tweet in tweets:
-            tweet_id = tweet.get("id")
-            text = tweet.get("text", "")
-            conversation_id = tweet.get("conversation_id")
-            if not tweet_id or not text:
-                continue
-            if has_seen(conn, tweet_id):
-                logger.debug(f"Skipping already processed tweet {tweet_id}.")
+    # Only ask for tweets newer than the last run saw for each query
+    since_ids = [get_since_id(conn, query) for _, query, _ in QUERIES]
+    search_workers = max(1, min(len(QUERIES), SEARCH_CONCURRENCY))
+    max_tweets = MAX_TWEETS_PER_RUN
+    # Tweets already handled this run; terms often match the same tweet
+    run_ids = set()
+    # Stages overlap: later searches are still in flight while earlier terms are
+    # classified, and likes/replies are sent while the next batch is classified.
+    with ThreadPoolExecutor(max_workers=search_workers) as searches, \
+            ThreadPoolExecutor(max_workers=ACTION_CONCURRENCY) as actions:
+        results = searches.map(
+            lambda query, limit, since_id: search_tweets(query, max_results=limit, since_id=since_id),
+            [query for _, query, _ in QUERIES], [limit for _, _, limit in QUERIES], since_ids,
+        )
+        for (term, query, _), tweets in zip(QUERIES, results):
+            logger.info("Found %d tweets for query '%s'.", len(tweets), term)
+            # Tweet IDs are snowflakes, so the numerically largest is the newest
+            tweet_ids = [int(tweet["id"]) for tweet in tweets if str(tweet.get("id", "")).isdigit()]
+            if tweet_ids:
+                set_since_id(conn, query, str(max(tweet_ids)))
+            pending = []
+            for tweet in tweets:
+                tweet_id = tweet.get("id")
+                text = tweet.get("text", "")
+                if not tweet_id or not text or tweet_id in run_ids:
+                    continue
+                run_ids.add(tweet_id)
+                if has_seen(conn, tweet_id):
+                    logger.debug("Skipping already processed tweet %s.", tweet_id)
+                    continue
+                pending.append(tweet)
+            if not pending:
                 continue
-            # Mark as seen immediately to avoid duplicate processing even if
+            # Mark as seen before acting to avoid duplicate processing even if
             # subsequent actions fail.
-            mark_seen(conn, tweet_id)
-            logger.info(f"Processing tweet {tweet_id}: {text[:50]}…")
-            result = kernel.classify(text)
-            if result is None:
-                logger.warning(f"Kernel classification failed for tweet {tweet_id}.")
-                continue
-            decision = result["decision"].lower()
-            comment = result["comment"]
-            # Dispatch action based on decision
-            if decision == "interesting":
-                logger.info(f"Tweet {tweet_id} considered interesting – no action taken.")
-            elif decision == "like":
-                like_tweet(tweet_id)
-            elif decision == "comment":
-                # Use the model's suggestion or fallback to a default
-                reply_text = comment.strip() or "Thanks for sharing!"
-                reply_to_tweet(tweet_id, reply_text)
-            elif decision == "dig_deeper":
-                logger.info(f"Digging deeper into conversation for tweet {tweet_id}…")
-                if conversation_id:
-                    replies = get_conversation_replies(conversation_id)
-                    # Shuffle replies slightly to avoid always processing the same order
-                    random.shuffle(replies)
-                    for reply in replies[:MAX_TWEETS_PER_RUN]:
-                        rid = reply.get("id")
-                        rtext = reply.get("text", "")
-                        if not rid or has_seen(conn, rid):
-                            continue
-                        mark_seen(conn, rid)
-                        logger.info(f"Processing reply {rid}: {rtext[:50]}…")
-                        rresult = kernel.classify(rtext)
-                        if rresult:
-                            rdecision = rresult["decision"].lower()
-                            rcomment = rresult["comment"]
-                            if rdecision == "like":
-                                like_tweet(rid)
-                            elif rdecision == "comment":
-                                reply_to_tweet(rid, rcomment.strip() or "Interesting point!")
-                            # We ignore nested dig_deeper to prevent infinite recursion.
+            mark_seen_many(conn, [tweet["id"] for tweet in pending])
+            # Classify all unseen tweets for this term in one kernel call
+            results_for_term = kernel.classify_batch([tweet["text"] for tweet in pending])
+            for tweet, result in zip(pending, results_for_term):
+                tweet_id = tweet["id"]
+                text = tweet["text"]
+                conversation_id = tweet.get("conversation_id")
+                logger.info("Processing tweet %s: %.50s…", tweet_id, text)
+                if result is None:
+                    logger.warning("Kernel classification failed for tweet %s.", tweet_id)
+                    continue
+                decision = result["decision"].lower()
+                comment = result["comment"]
+                # Dispatch action based on decision
+                if decision == "interesting":
+                    logger.info("Tweet %s considered interesting – no action taken.", tweet_id)
+                elif decision == "like":
+                    actions.submit(like_tweet, tweet_id)
+                elif decision == "comment":
+                    # Use the model's suggestion or fallback to a default
+                    reply_text = comment.strip() or "Thanks for sharing!"
+                    actions.submit(reply_to_tweet, tweet_id, reply_text)
+                elif decision == "dig_deeper":
+                    logger.info("Digging deeper into conversation for tweet %s…", tweet_id)
+                    if conversation_id:
+                        replies = get_conversation_replies(conversation_id)
+                        pending_replies = []
+                        # Sample in random order to avoid always processing the same replies
+                        for reply in random.sample(replies, k=min(len(replies), max_tweets)):
+                            rid = reply.get("id")
+                            if not rid or has_seen(conn, rid):
+                                continue
+                            pending_replies.append(reply)
+                        mark_seen_many(conn, [reply["id"] for reply in pending_replies])
+                        rresults = kernel.classify_batch([reply.get("text", "") for reply in pending_replies])
+                        for reply, rresult in zip(pending_replies, rresults):
+                            rid = reply["id"]
+                            logger.info("Processing reply %s: %.50s…", rid, reply.get("text", ""))
+                            if rresult:
+                                rdecision = rresult["decision"].lower()
+                                rcomment = rresult["comment"]
+                                if rdecision == "like":
+                                    actions.submit(like_tweet, rid)
+                                elif rdecision == "comment":
+                                    actions.submit(reply_to_tweet, rid, rcomment.strip() or "Interesting point!")
+                                # We ignore nested dig_deeper to prevent infinite recursion.
+                    else:
+                        logger.info("Conversation ID missing – cannot dig deeper.")
                 else:
-                    logger.info("Conversation ID missing – cannot dig deeper.")
-            else:
-                logger.warning(f"Unknown decision '{decision}' for tweet {tweet_id}.")
+                    logger.warning("Unknown decision '%s' for tweet %s.", decision, tweet_id)
 
 
 def run_scheduler() -> None:
@@ -488,32 +861,34 @@ def run_scheduler() -> None:
     if os.environ.get("DISABLE_SCHEDULER"):
         logger.info("Scheduler disabled.  Exiting after a single run.")
         return
-    if BackgroundScheduler is None:
+    if BlockingScheduler is None:
         logger.error(
             "APScheduler is not installed.  Install `apscheduler` or set the "
             "RUN_FOREVER environment variable to use scheduling."
         )
         return
-    scheduler = BackgroundScheduler()
+    # BlockingScheduler runs in the calling thread, so no keep-alive loop is needed
+    scheduler = BlockingScheduler()
     # Spread jobs evenly: run every 3 hours with a random minute offset (0–59).
     def job_wrapper() -> None:
         conn = init_db()
         kernel_agent = create_kernel_agent()
-        kernel_runner = KernelRunner(kernel_agent)
+        kernel_runner = KernelRunner(kernel_agent, conn=conn)
         process_tweets_once(conn, kernel_runner)
+        kernel_runner.close()
         conn.close()
     # Choose minutes randomly for initial jitter
     minute = random.randint(0, 59)
     scheduler.add_job(job_wrapper, "cron", hour="*/3", minute=minute)
-    scheduler.start()
     logger.info(
         f"Scheduler started – job will run every 3 hours at minute {minute}."
     )
     try:
-        while True:
-            time.sleep(60)
+        scheduler.start()
     except (KeyboardInterrupt, SystemExit):
-        scheduler.shutdown()
+        scheduler.shutdown(wait=False)
+    finally:
+        close_session()
         logger.info("Scheduler stopped.")
 
 
@@ -526,13 +901,16 @@ def main() -> None:
     """
     conn = init_db()
     kernel_agent = create_kernel_agent()
-    kernel_runner = KernelRunner(kernel_agent)
+    kernel_runner = KernelRunner(kernel_agent, conn=conn)
     # Run once immediately
     process_tweets_once(conn, kernel_runner)
+    kernel_runner.close()
     conn.close()
     # Start the scheduler if requested
     if os.environ.get("RUN_FOREVER"):
         run_scheduler()
+    else:
+        close_session()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,15 @@
+"""
+Shared setup for the Tweepy client tests.
+
+Puts the project root and the ``sources`` directory on the import path once
+per session, so the tests can import ``tweepy_client`` directly and it can
+import the project's top-level modules.
+"""
+
+import os
+import sys
+
+_SOURCES_DIR = os.path.join(os.path.dirname(__file__), '..')
+
+sys.path.insert(0, os.path.join(_SOURCES_DIR, '..'))
+sys.path.insert(0, _SOURCES_DIR)
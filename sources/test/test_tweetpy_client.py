@@ -3,243 +3,319 @@ Test suite for TweepyTwitterClient functionality.
 Tests search, like, and reply operations.
 """
 
+import logging
 import os
-import sys
-from unittest.mock import Mock, patch, MagicMock
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType, SimpleNamespace
+from unittest.mock import Mock, MagicMock
+
+import pytest
+import tweepy
 from dotenv import load_dotenv
-load_dotenv()  # Loads variables from .env file
 
+try:
+    import vcr
+except ImportError:
+    vcr = None
 
-# Add the parent directory to the path for imports
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from tweepy_client import TweepyTwitterClient, Tweet, SearchResult, _TWEET_FIELDS
 
-from tweepy_client import TweepyTwitterClient, Tweet, SearchResult
+logger = logging.getLogger(__name__)
 
-try:
-    import pytest
-    HAS_PYTEST = True
-except ImportError:
-    HAS_PYTEST = False
-
-
-class TestTweepyTwitterClient:
-    """Test cases for TweepyTwitterClient."""
-    
-    def setup_method(self):
-        """Set up test fixtures."""
-        # Mock credentials for testing
-        self.test_credentials = {
-            'bearer_token': 'test_bearer_token',
-            'user_id': 'test_user_id',
-            'api_key': 'test_api_key',
-            'api_secret': 'test_api_secret',
-            'access_token': 'test_access_token',
-            'access_token_secret': 'test_access_token_secret'
-        }
-        
-        # Create client instance
-        self.client = TweepyTwitterClient(**self.test_credentials)
-    
-    def test_client_initialization(self):
-        """Test that the client initializes properly."""
-        assert self.client.bearer_token == 'test_bearer_token'
-        assert self.client.user_id == 'test_user_id'
-        assert self.client.api_key == 'test_api_key'
-        assert self.client.api_secret == 'test_api_secret'
-        assert self.client.access_token == 'test_access_token'
-        assert self.client.access_token_secret == 'test_access_token_secret'
-    
-    @patch('tweepy.Client')
-    def test_search_tweets_success(self, mock_client_class):
-        """Test successful tweet search."""
-        # Mock the client and response
-        mock_client = Mock()
-        mock_client_class.return_value = mock_client
-        
-        # Mock tweet data
-        mock_tweet_data = Mock()
-        mock_tweet_data.id = '123456789'
-        mock_tweet_data.text = 'Test tweet about AI'
-        mock_tweet_data.author_id = '987654321'
-        mock_tweet_data.conversation_id = '123456789'
-        mock_tweet_data.created_at = Mock()
-        mock_tweet_data.created_at.isoformat.return_value = '2024-01-01T12:00:00Z'
-        mock_tweet_data.public_metrics = {'like_count': 10, 'retweet_count': 5}
-        
-        # Mock response
-        mock_response = Mock()
-        mock_response.data = [mock_tweet_data]
-        mock_response.meta = {'next_token': 'next_page_token'}
-        mock_client.search_recent_tweets.return_value = mock_response
-        
-        # Initialize client with mocked client
-        self.client.client_v2 = mock_client
-        
-        # Test search
-        result = self.client.search_tweets('AI', max_results=10)
-        
-        # Assertions
-        assert isinstance(result, SearchResult)
-        assert len(result.tweets) == 1
-        assert result.total_count == 1
-        assert result.next_token == 'next_page_token'
-        
-        tweet = result.tweets[0]
-        assert tweet.id == '123456789'
-        assert tweet.text == 'Test tweet about AI'
-        assert tweet.author_id == '987654321'
-        assert tweet.conversation_id == '123456789'
-        assert tweet.created_at == '2024-01-01T12:00:00Z'
-        assert tweet.public_metrics == {'like_count': 10, 'retweet_count': 5}
-        
-        # Verify API call
-        mock_client.search_recent_tweets.assert_called_once_with(
-            query='AI',
-            max_results=10,
-            next_token=None,
-            tweet_fields=['conversation_id', 'author_id', 'created_at', 'public_metrics']
+# Recorded Twitter API traffic replayed by the real integration test
+INTEGRATION_CASSETTE = os.path.join(os.path.dirname(__file__), 'cassettes', 'twitter_integration.yaml')
+
+
+# Mock credentials for testing, read-only so no test can change them for the rest
+TEST_CREDENTIALS = MappingProxyType({
+    'bearer_token': 'test_bearer_token',
+    'user_id': 'test_user_id',
+    'api_key': 'test_api_key',
+    'api_secret': 'test_api_secret',
+    'access_token': 'test_access_token',
+    'access_token_secret': 'test_access_token_secret'
+})
+
+# The search result expected for a response holding one default factory tweet
+EXPECTED_SEARCH_RESULT = SearchResult(
+    tweets=[Tweet(
+        id='123456789',
+        text='Test tweet about AI',
+        author_id='987654321',
+        conversation_id='123456789',
+        created_at='2024-01-01T12:00:00Z',
+        public_metrics={'like_count': 10, 'retweet_count': 5}
+    )],
+    total_count=1,
+    next_token='next_page_token'
+)
+
+
+def _resp(data, meta=None):
+    """Build a stub API response carrying the given ``data`` and ``meta``."""
+    return SimpleNamespace(data=data, meta=meta)
+
+
+def _make_mock_client(**return_data):
+    """Build a mock v2 client whose methods return responses with the given data.
+    
+    Each keyword names a client method (e.g. ``like``) and gives the ``data`` of
+    the response it returns.
+    """
+    mock_client = Mock(spec=tweepy.Client)
+    for method, data in return_data.items():
+        getattr(mock_client, method).return_value = _resp(data)
+    return mock_client
+
+
+def _assert_single_call(method, **kwargs):
+    """Assert a mocked method was called exactly once, with exactly these keywords."""
+    assert method.call_count == 1
+    assert method.call_args.args == ()
+    assert method.call_args.kwargs == kwargs
+
+
+@pytest.fixture(scope="module")
+def _base_client():
+    """The client under test, constructed once for the module."""
+    return TweepyTwitterClient(**TEST_CREDENTIALS)
+
+
+@pytest.fixture
+def client(_base_client):
+    """The shared client, with the state tests replace reset before each test."""
+    _base_client.client_v2 = None
+    _base_client.user_id = 'test_user_id'
+    _base_client.clear_cache()
+    yield _base_client
+
+
+@pytest.fixture(scope="module")
+def tweet_data_factory():
+    """Return a function building tweet data shaped like Tweepy's response items."""
+    def make_tweet_data(tweet_id='123456789', text='Test tweet about AI'):
+        return SimpleNamespace(
+            id=tweet_id,
+            text=text,
+            author_id='987654321',
+            conversation_id=tweet_id,
+            data={'created_at': '2024-01-01T12:00:00Z'},
+            public_metrics={'like_count': 10, 'retweet_count': 5}
         )
+    return make_tweet_data
+
+
+def test_client_initialization(client):
+    """Test that the client initializes properly."""
+    assert client.bearer_token == 'test_bearer_token'
+    assert client.user_id == 'test_user_id'
+    assert client.api_key == 'test_api_key'
+    assert client.api_secret == 'test_api_secret'
+    assert client.access_token == 'test_access_token'
+    assert client.access_token_secret == 'test_access_token_secret'
+
+
+def test_search_tweets_success(client, tweet_data_factory):
+    """Test successful tweet search."""
+    # Mock the client and response
+    mock_client = Mock(spec=tweepy.Client)
     
-    @patch('tweepy.Client')
-    def test_search_tweets_no_client(self, mock_client_class):
-        """Test search when client is not initialized."""
-        self.client.client_v2 = None
-        
-        result = self.client.search_tweets('AI')
-        
-        assert isinstance(result, SearchResult)
-        assert len(result.tweets) == 0
-        assert result.total_count == 0
-        assert result.next_token is None
-    
-    @patch('tweepy.Client')
-    def test_like_tweet_success(self, mock_client_class):
-        """Test successful tweet like."""
-        # Mock the client and response
-        mock_client = Mock()
-        mock_client_class.return_value = mock_client
-        
-        # Mock response
-        mock_response = Mock()
-        mock_response.data = {'liked': True}
-        mock_client.like.return_value = mock_response
-        
-        # Initialize client with mocked client
-        self.client.client_v2 = mock_client
-        
-        # Test like
-        result = self.client.like_tweet('123456789')
-        
-        # Assertions
-        assert result is True
-        
-        # Verify API call
-        mock_client.like.assert_called_once_with(
+    # Mock response
+    mock_client.search_recent_tweets.return_value = _resp(
+        [tweet_data_factory()], meta={'next_token': 'next_page_token'}
+    )
+    
+    # Initialize client with mocked client
+    client.client_v2 = mock_client
+    
+    # Test search
+    result = client.search_tweets('AI', max_results=10)
+    
+    # Assertions
+    assert result == EXPECTED_SEARCH_RESULT
+    
+    # Verify API call
+    _assert_single_call(
+        mock_client.search_recent_tweets,
+        query='AI',
+        max_results=10,
+        next_token=None,
+        since_id=None,
+        tweet_fields=_TWEET_FIELDS
+    )
+
+
+def test_search_tweets_reuses_cached_result(client, tweet_data_factory):
+    """Test that a repeated search is served from the cache until it is cleared."""
+    mock_client = _make_mock_client(search_recent_tweets=[tweet_data_factory()])
+    client.client_v2 = mock_client
+    
+    first = client.search_tweets('AI', max_results=10)
+    assert client.search_tweets('AI', max_results=10) is first
+    assert mock_client.search_recent_tweets.call_count == 1
+    
+    client.clear_cache()
+    client.search_tweets('AI', max_results=10)
+    assert mock_client.search_recent_tweets.call_count == 2
+
+
+def test_get_tweets_batch_chunks_and_caches(client, tweet_data_factory):
+    """Test that tweet lookups are batched 100 IDs per call and served from the cache after."""
+    tweet_ids = [str(n) for n in range(150)]
+    mock_client = _make_mock_client(
+        get_tweets=[tweet_data_factory(tweet_id=tweet_id) for tweet_id in tweet_ids]
+    )
+    client.client_v2 = mock_client
+    
+    tweets = client.get_tweets_batch(tweet_ids + ['0'])
+    
+    assert sorted(tweets, key=int) == tweet_ids
+    assert [len(c.kwargs['ids']) for c in mock_client.get_tweets.call_args_list] == [100, 50]
+    
+    # Repeat lookups, single or batched, are answered from the cache
+    assert client.get_tweet_details('7') == tweets['7']
+    assert client.get_tweets_batch(tweet_ids[:10]) == {t: tweets[t] for t in tweet_ids[:10]}
+    assert mock_client.get_tweets.call_count == 2
+
+
+def test_get_tweet_details_shares_in_flight_lookup(client, tweet_data_factory):
+    """Test that concurrent lookups of the same tweet are served by a single API call."""
+    started = threading.Event()
+    release = threading.Event()
+    
+    def slow_get_tweets(**kwargs):
+        started.set()
+        release.wait(5)
+        return _resp([tweet_data_factory(tweet_id='7')])
+    
+    mock_client = Mock(spec=tweepy.Client)
+    mock_client.get_tweets.side_effect = slow_get_tweets
+    client.client_v2 = mock_client
+    
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        first = pool.submit(client.get_tweet_details, '7')
+        assert started.wait(5)
+        second = pool.submit(client.get_tweet_details, '7')
+        release.set()
+        
+        assert first.result().id == '7'
+        assert second.result() == first.result()
+    
+    assert mock_client.get_tweets.call_count == 1
+
+
+@pytest.mark.parametrize("fields,expected", [
+    (frozenset({'public_metrics', 'conversation_id'}), 'conversation_id,public_metrics'),
+    (frozenset(), None),
+], ids=["subset", "id_and_text_only"])
+def test_search_tweets_requests_only_given_fields(client, fields, expected):
+    """Test that a narrowed field set is sent in the canonical order, or left out when empty."""
+    mock_client = _make_mock_client(search_recent_tweets=[])
+    client.client_v2 = mock_client
+    
+    client.search_tweets('AI', fields=fields)
+    
+    assert mock_client.search_recent_tweets.call_args.kwargs['tweet_fields'] == expected
+
+
+def test_get_user_timeline(client, tweet_data_factory):
+    """Test that the timeline of the authenticated user is fetched with the requested fields."""
+    mock_client = _make_mock_client(get_users_tweets=[tweet_data_factory()])
+    client.client_v2 = mock_client
+    
+    tweets = client.get_user_timeline(max_results=5, since_id='100')
+    
+    assert [tweet.id for tweet in tweets] == ['123456789']
+    _assert_single_call(
+        mock_client.get_users_tweets,
+        id='test_user_id',
+        max_results=5,
+        since_id='100',
+        tweet_fields=_TWEET_FIELDS
+    )
+
+
+def test_get_conversation_replies_rejects_non_numeric_id(client):
+    """Test that a conversation ID that would alter the search query is not searched."""
+    mock_client = _make_mock_client(search_recent_tweets=[])
+    client.client_v2 = mock_client
+    
+    assert client.get_conversation_replies('123 OR spam') == []
+    mock_client.search_recent_tweets.assert_not_called()
+
+
+@pytest.mark.parametrize("method,args,expected", [
+    ('search_tweets', ('AI',), SearchResult(tweets=[], total_count=0, next_token=None)),
+    ('like_tweet', ('123456789',), False),
+    ('reply_to_tweet', ('123456789', 'Great tweet!'), False),
+], ids=["search", "like", "reply"])
+def test_methods_no_client(client, method, args, expected):
+    """Test that each API method returns its empty result when the client is not initialized."""
+    client.client_v2 = None
+    
+    assert getattr(client, method)(*args) == expected
+
+
+@pytest.mark.parametrize("like_data,user_id,expected", [
+    ({'liked': True}, 'test_user_id', True),
+    ({'liked': False}, 'test_user_id', False),
+    ({'liked': True}, None, False),
+], ids=["success", "failure", "no_user_id"])
+def test_like_tweet(client, like_data, user_id, expected):
+    """Test tweet like outcomes, including a missing user ID."""
+    mock_client = _make_mock_client(like=like_data)
+    client.client_v2 = mock_client
+    client.user_id = user_id
+    
+    result = client.like_tweet('123456789')
+    
+    assert result is expected
+    
+    # Verify the API is only called when the user ID is set
+    if user_id:
+        _assert_single_call(
+            mock_client.like,
             tweet_id='123456789',
             user_id='test_user_id'
         )
+    else:
+        mock_client.like.assert_not_called()
+
+
+@pytest.mark.parametrize("reply_data,expected", [
+    ({'id': '987654321'}, True),
+    (None, False),
+], ids=["success", "failure"])
+def test_reply_to_tweet(client, reply_data, expected):
+    """Test tweet reply outcomes."""
+    mock_client = _make_mock_client(create_tweet=reply_data)
+    client.client_v2 = mock_client
     
-    @patch('tweepy.Client')
-    def test_like_tweet_failure(self, mock_client_class):
-        """Test failed tweet like."""
-        # Mock the client and response
-        mock_client = Mock()
-        mock_client_class.return_value = mock_client
-        
-        # Mock response indicating failure
-        mock_response = Mock()
-        mock_response.data = {'liked': False}
-        mock_client.like.return_value = mock_response
-        
-        # Initialize client with mocked client
-        self.client.client_v2 = mock_client
-        
-        # Test like
-        result = self.client.like_tweet('123456789')
-        
-        # Assertions
-        assert result is False
+    result = client.reply_to_tweet('123456789', 'Great tweet!')
     
-    @patch('tweepy.Client')
-    def test_like_tweet_no_client(self, mock_client_class):
-        """Test like when client is not initialized."""
-        self.client.client_v2 = None
-        
-        result = self.client.like_tweet('123456789')
-        
-        assert result is False
-    
-    @patch('tweepy.Client')
-    def test_like_tweet_no_user_id(self, mock_client_class):
-        """Test like when user ID is not configured."""
-        mock_client = Mock()
-        mock_client_class.return_value = mock_client
-        self.client.client_v2 = mock_client
-        self.client.user_id = None
-        
-        result = self.client.like_tweet('123456789')
-        
-        assert result is False
-    
-    @patch('tweepy.Client')
-    def test_reply_to_tweet_success(self, mock_client_class):
-        """Test successful tweet reply."""
-        # Mock the client and response
-        mock_client = Mock()
-        mock_client_class.return_value = mock_client
-        
-        # Mock response
-        mock_response = Mock()
-        mock_response.data = {'id': '987654321'}
-        mock_client.create_tweet.return_value = mock_response
-        
-        # Initialize client with mocked client
-        self.client.client_v2 = mock_client
-        
-        # Test reply
-        result = self.client.reply_to_tweet('123456789', 'Great tweet!')
-        
-        # Assertions
-        assert result is True
-        
-        # Verify API call
-        mock_client.create_tweet.assert_called_once_with(
-            text='Great tweet!',
-            in_reply_to_tweet_id='123456789'
-        )
+    assert result is expected
     
-    @patch('tweepy.Client')
-    def test_reply_to_tweet_failure(self, mock_client_class):
-        """Test failed tweet reply."""
-        # Mock the client and response
-        mock_client = Mock()
-        mock_client_class.return_value = mock_client
-        
-        # Mock response indicating failure
-        mock_response = Mock()
-        mock_response.data = None
-        mock_client.create_tweet.return_value = mock_response
-        
-        # Initialize client with mocked client
-        self.client.client_v2 = mock_client
-        
-        # Test reply
-        result = self.client.reply_to_tweet('123456789', 'Great tweet!')
-        
-        # Assertions
-        assert result is False
+    _assert_single_call(
+        mock_client.create_tweet,
+        text='Great tweet!',
+        in_reply_to_tweet_id='123456789'
+    )
+
+
+def test_reply_to_tweet_is_not_retried_on_server_error(client):
+    """Test that a server error on reply is not retried, since the reply may already be posted."""
+    mock_client = Mock(spec=tweepy.Client)
+    mock_client.create_tweet.side_effect = tweepy.errors.TwitterServerError(
+        Mock(status_code=503, reason='Service Unavailable', json=Mock(return_value={}))
+    )
+    client.client_v2 = mock_client
     
-    @patch('tweepy.Client')
-    def test_reply_to_tweet_no_client(self, mock_client_class):
-        """Test reply when client is not initialized."""
-        self.client.client_v2 = None
-        
-        result = self.client.reply_to_tweet('123456789', 'Great tweet!')
-        
-        assert result is False
+    assert client.reply_to_tweet('123456789', 'Great tweet!') is False
+    assert mock_client.create_tweet.call_count == 1
 
 
-def test_integration_workflow():
+def test_integration_workflow(tweet_data_factory):
     """
     Integration test demonstrating the complete workflow:
     1. Search for tweets
@@ -249,68 +325,70 @@ def test_integration_workflow():
     # This would be used for actual integration testing with real API
     # For now, we'll create a mock integration test
     
-    with patch('tweepy.Client') as mock_client_class:
-        # Mock the client and responses
-        mock_client = Mock()
-        mock_client_class.return_value = mock_client
-        
-        # Mock search response
-        mock_tweet_data = Mock()
-        mock_tweet_data.id = '123456789'
-        mock_tweet_data.text = 'Test tweet about AI'
-        mock_tweet_data.author_id = '987654321'
-        mock_tweet_data.conversation_id = '123456789'
-        mock_tweet_data.created_at = Mock()
-        mock_tweet_data.created_at.isoformat.return_value = '2024-01-01T12:00:00Z'
-        mock_tweet_data.public_metrics = {'like_count': 10, 'retweet_count': 5}
-        
-        mock_search_response = Mock()
-        mock_search_response.data = [mock_tweet_data]
-        mock_search_response.meta = {'next_token': None}
-        
-        # Mock like response
-        mock_like_response = Mock()
-        mock_like_response.data = {'liked': True}
-        
-        # Mock reply response
-        mock_reply_response = Mock()
-        mock_reply_response.data = {'id': '987654321'}
-        
-        # Configure mock client
-        mock_client.search_recent_tweets.return_value = mock_search_response
-        mock_client.like.return_value = mock_like_response
-        mock_client.create_tweet.return_value = mock_reply_response
-        
-        # Create client
-        client = TweepyTwitterClient(
-            bearer_token='test_bearer_token',
-            user_id='test_user_id'
-        )
-        client.client_v2 = mock_client
-        
-        # Step 1: Search for tweets
-        search_result = client.search_tweets('AI', max_results=5)
-        assert len(search_result.tweets) == 1
-        
-        # Step 2: Like the first tweet
-        tweet_to_like = search_result.tweets[0]
-        like_success = client.like_tweet(tweet_to_like.id)
-        assert like_success is True
-        
-        # Step 3: Reply to the tweet
-        reply_success = client.reply_to_tweet(tweet_to_like.id, 'Interesting perspective on AI!')
-        assert reply_success is True
-        
-        # Verify all API calls were made
-        mock_client.search_recent_tweets.assert_called_once()
-        mock_client.like.assert_called_once_with(tweet_id='123456789', user_id='test_user_id')
-        mock_client.create_tweet.assert_called_once_with(
-            text='Interesting perspective on AI!',
-            in_reply_to_tweet_id='123456789'
-        )
+    # Mock the client and its search, like and reply responses
+    mock_client = Mock(spec=tweepy.Client)
+    mock_client.configure_mock(**{
+        'search_recent_tweets.return_value': _resp(
+            [tweet_data_factory()], meta={'next_token': None}
+        ),
+        'like.return_value': _resp({'liked': True}),
+        'create_tweet.return_value': _resp({'id': '987654321'}),
+    })
+    
+    # Create client
+    client = TweepyTwitterClient(
+        bearer_token='test_bearer_token',
+        user_id='test_user_id'
+    )
+    client.client_v2 = mock_client
+    
+    # Step 1: Search for tweets
+    search_result = client.search_tweets('AI', max_results=5)
+    assert len(search_result.tweets) == 1
+    
+    # Step 2: Like the first tweet
+    tweet_to_like = search_result.tweets[0]
+    like_success = client.like_tweet(tweet_to_like.id)
+    assert like_success is True
+    
+    # Step 3: Reply to the tweet
+    reply_success = client.reply_to_tweet(tweet_to_like.id, 'Interesting perspective on AI!')
+    assert reply_success is True
+    
+    # Verify all API calls were made
+    assert mock_client.search_recent_tweets.call_count == 1
+    _assert_single_call(mock_client.like, tweet_id='123456789', user_id='test_user_id')
+    _assert_single_call(
+        mock_client.create_tweet,
+        text='Interesting perspective on AI!',
+        in_reply_to_tweet_id='123456789'
+    )
 
 
-def test_real_integration():
+@pytest.fixture
+def integration_cassette():
+    """Record the integration test's API traffic once, then replay it.
+    
+    The first run with real credentials writes the cassette; later runs are
+    served from it without touching the network. Without vcrpy installed the
+    test talks to the live API every time.
+    """
+    if vcr is None:
+        yield None
+        return
+    
+    recorder = vcr.VCR(
+        record_mode='once',
+        filter_headers=['authorization'],
+        decode_compressed_response=True
+    )
+    with recorder.use_cassette(INTEGRATION_CASSETTE) as cassette:
+        yield cassette
+
+
+@pytest.mark.integration
+@pytest.mark.xdist_group(name='serial')
+def test_real_integration(integration_cassette):
     """
     Real integration test that uses actual Twitter API.
     This test will:
@@ -320,8 +398,7 @@ def test_real_integration():
     
     Requires real Twitter API credentials.
     """
-    print("🚀 Running REAL Twitter API Integration Test")
-    print("=" * 60)
+    load_dotenv()  # Loads variables from .env file
     
     # Get credentials from environment
     bearer_token = os.getenv('TWITTER_BEARER_TOKEN')
@@ -330,9 +407,6 @@ def test_real_integration():
     if not bearer_token or not user_id:
         pytest.skip("Skipping real integration test: Missing TWITTER_BEARER_TOKEN or TWITTER_USER_ID")
     
-    print(f"✓ Found Twitter credentials")
-    print(f"✓ User ID: {user_id}")
-    
     # Create client with real credentials
     client = TweepyTwitterClient(
         bearer_token=bearer_token,
@@ -340,71 +414,50 @@ def test_real_integration():
     )
     
     # Test 1: Validate credentials
-    print("\n1. Testing credential validation...")
     if not client.validate_credentials():
         pytest.fail("Credential validation failed")
-    print("✓ Credentials are valid")
     
-    # Test 2: Search for tweets
-    print("\n2. Testing tweet search...")
+    # The search and user lookup are independent, as are the reply and the tweet
+    # lookup after the like, so each pair runs concurrently
     search_query = "AI machine learning"
-    search_result = client.search_tweets(search_query, max_results=5)
-    
-    assert len(search_result.tweets) > 0, f"No tweets found for query: {search_query}"
-    print(f"✓ Found {len(search_result.tweets)} tweets about '{search_query}'")
-    
-    # Display found tweets
-    for i, tweet in enumerate(search_result.tweets[:3], 1):
-        print(f"   {i}. {tweet.text[:80]}...")
-        print(f"      ID: {tweet.id}, Likes: {tweet.public_metrics.get('like_count', 0) if tweet.public_metrics else 0}")
-    
-    # Test 3: Like a tweet
-    print("\n3. Testing tweet like...")
-    tweet_to_like = search_result.tweets[0]
-    print(f"Liking tweet: {tweet_to_like.text[:60]}...")
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        # Test 2: Search for tweets, and Test 5: Get user info
+        search_future = pool.submit(client.search_tweets, search_query, max_results=5)
+        user_info_future = pool.submit(client.get_user_info)
+        search_result = search_future.result()
+        
+        assert len(search_result.tweets) > 0, f"No tweets found for query: {search_query}"
+        
+        # Test 3: Like a tweet
+        tweet_to_like = search_result.tweets[0]
+        like_success = client.like_tweet(tweet_to_like.id)
+        assert like_success, f"Failed to like tweet {tweet_to_like.id}"
+        
+        # Test 4: Reply to a tweet, and Test 6: Get tweet details
+        reply_text = f"Great insights on {search_query}! Thanks for sharing this valuable information. 🤖✨"
+        reply_future = pool.submit(client.reply_to_tweet, tweet_to_like.id, reply_text)
+        details_future = pool.submit(client.get_tweet_details, tweet_to_like.id)
+        
+        reply_success = reply_future.result()
+        assert reply_success, f"Failed to reply to tweet {tweet_to_like.id}"
+        
+        user_info = user_info_future.result()
+        assert user_info is not None, "Failed to get user info"
+        assert 'data' in user_info, "User info missing data field"
+        
+        tweet_details = details_future.result()
+        assert tweet_details is not None, f"Failed to get details for tweet {tweet_to_like.id}"
+        assert tweet_details.id == tweet_to_like.id, "Tweet ID mismatch"
     
-    like_success = client.like_tweet(tweet_to_like.id)
-    assert like_success, f"Failed to like tweet {tweet_to_like.id}"
-    print(f"✓ Successfully liked tweet {tweet_to_like.id}")
-    
-    # Test 4: Reply to a tweet
-    print("\n4. Testing tweet reply...")
-    reply_text = f"Great insights on {search_query}! Thanks for sharing this valuable information. 🤖✨"
-    print(f"Replying to tweet {tweet_to_like.id}...")
-    
-    reply_success = client.reply_to_tweet(tweet_to_like.id, reply_text)
-    assert reply_success, f"Failed to reply to tweet {tweet_to_like.id}"
-    print(f"✓ Successfully replied to tweet {tweet_to_like.id}")
-    print(f"✓ Reply: {reply_text[:60]}...")
-    
-    # Test 5: Get user info
-    print("\n5. Testing user info retrieval...")
-    user_info = client.get_user_info()
-    assert user_info is not None, "Failed to get user info"
-    assert 'data' in user_info, "User info missing data field"
-    
-    username = user_info['data']['username']
-    print(f"✓ Authenticated as: @{username}")
-    
-    # Test 6: Get tweet details
-    print("\n6. Testing tweet details retrieval...")
-    tweet_details = client.get_tweet_details(tweet_to_like.id)
-    assert tweet_details is not None, f"Failed to get details for tweet {tweet_to_like.id}"
-    assert tweet_details.id == tweet_to_like.id, "Tweet ID mismatch"
-    print(f"✓ Retrieved details for tweet {tweet_to_like.id}")
-    
-    print("\n" + "=" * 60)
-    print("🎉 ALL REAL INTEGRATION TESTS PASSED!")
-    print("✓ Search tweets: Working")
-    print("✓ Like tweets: Working") 
-    print("✓ Reply to tweets: Working")
-    print("✓ User info: Working")
-    print("✓ Tweet details: Working")
-    print("\nYour Twitter client is fully functional! 🚀")
+    logger.info(
+        "Real integration passed as @%s: search=%d tweets, liked and replied to %s",
+        user_info['data']['username'], len(search_result.tweets), tweet_to_like.id
+    )
 
 
 if __name__ == '__main__':
     print("Running TweepyTwitterClient tests...")
+    load_dotenv()  # Loads variables from .env file
     
     # Check for real credentials first
     bearer_token = os.getenv('TWITTER_BEARER_TOKEN')
@@ -424,14 +477,7 @@ if __name__ == '__main__':
             print("\nFalling back to unit tests...")
             
             # Fall back to unit tests
-            if HAS_PYTEST:
-                pytest.main([__file__, '-v', '-k', 'not test_real_integration'])
-            else:
-                print("Running basic unit tests...")
-                test_client = TestTweepyTwitterClient()
-                test_client.setup_method()
-                test_client.test_client_initialization()
-                print("✓ Basic tests passed")
+            pytest.main([__file__, '-v', '-k', 'not test_real_integration'])
     else:
         print("⚠️  No Twitter credentials found.")
         print("To run REAL integration tests, set these environment variables:")
@@ -439,7 +485,4 @@ if __name__ == '__main__':
         print("   export TWITTER_USER_ID='your_user_id'")
         print("\nRunning unit tests instead...")
         
-        if HAS_PYTEST:
-            pytest.main([__file__, '-v', '-k', 'not test_real_integration'])
-        else:
-            print("pytest not available. Install with: uv add pytest")
+        pytest.main([__file__, '-v', '-k', 'not test_real_integration'])
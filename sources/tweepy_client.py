@@ -6,14 +6,21 @@ including proper error handling, rate limiting, and retry logic.
 """
 
 import logging
+import re
+import sys
+import threading
 import time
-from typing import Dict, List, Optional, Tuple
+from concurrent.futures import Future
+from functools import cached_property, lru_cache
+from typing import Dict, FrozenSet, List, Optional, Tuple
 from dataclasses import dataclass
 
 import tweepy
 from tweepy import API, OAuth1UserHandler, Client
-from tweepy.errors import TweepyException, TooManyRequests, Unauthorized, Forbidden
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+from tweepy.errors import TweepyException, TooManyRequests, TwitterServerError, Unauthorized, Forbidden
+from tenacity import retry, stop_after_attempt, wait_random_exponential, retry_if_exception_type
+
+from caching import TTLCache
 
 try:
     from config import settings
@@ -23,8 +30,46 @@ except Exception:
 
 logger = logging.getLogger(__name__)
 
+# Slotted dataclasses need Python 3.10; on 3.9 the classes keep a __dict__
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# Conversation IDs are tweet IDs; anything else would splice extra operators into the query
+_CONVERSATION_ID_RE = re.compile(r"\d+")
+
+# Tweet fields a lookup can ask for beyond id and text, in request order
+_TWEET_FIELD_NAMES = ('conversation_id', 'author_id', 'created_at', 'public_metrics')
+DEFAULT_TWEET_FIELDS = frozenset(_TWEET_FIELD_NAMES)
+
+# The full field list, requested unless a caller narrows it. Tweepy only
+# comma-joins lists, so it is kept pre-joined rather than as a tuple it would
+# pass through as-is.
+_TWEET_FIELDS = ','.join(_TWEET_FIELD_NAMES)
+
+# Most tweet IDs the v2 multi-tweet lookup accepts per request
+_MAX_LOOKUP_IDS = 100
+
+# Retry policy for idempotent calls to the v2 API (lookups and likes):
+# rate-limit and server errors are retried with full jitter to spread
+# concurrent callers out
+_TWITTER_RETRY = retry(
+    stop=stop_after_attempt(5),
+    wait=wait_random_exponential(multiplier=0.5, max=90),
+    retry=retry_if_exception_type((TooManyRequests, TwitterServerError)),
+    reraise=True
+)
+
+# Retry policy for calls that post content. A server error may arrive after
+# the tweet was created, so only rate-limit rejections are retried; retrying
+# anything else could post the same reply twice.
+_TWITTER_POST_RETRY = retry(
+    stop=stop_after_attempt(5),
+    wait=wait_random_exponential(multiplier=0.5, max=90),
+    retry=retry_if_exception_type(TooManyRequests),
+    reraise=True
+)
+
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class Tweet:
     """Represents a tweet with its metadata."""
     id: str
@@ -35,7 +80,7 @@ class Tweet:
     public_metrics: Optional[Dict] = None
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class SearchResult:
     """Represents the result of a tweet search."""
     tweets: List[Tweet]
@@ -43,6 +88,55 @@ class SearchResult:
     next_token: Optional[str] = None
 
 
+def _tweet_fields(fields: FrozenSet[str]) -> Optional[str]:
+    """The tweet_fields parameter requesting `fields`, or None for id and text only."""
+    if fields == DEFAULT_TWEET_FIELDS:
+        return _TWEET_FIELDS
+    return ','.join(name for name in _TWEET_FIELD_NAMES if name in fields) or None
+
+
+def _build_tweet(tweet_data) -> Tweet:
+    """Convert a Tweepy tweet object into a Tweet."""
+    return Tweet(
+        id=tweet_data.id,
+        text=tweet_data.text,
+        author_id=tweet_data.author_id,
+        conversation_id=getattr(tweet_data, 'conversation_id', None),
+        created_at=tweet_data.data.get('created_at'),  # the API's own ISO 8601 string
+        public_metrics=getattr(tweet_data, 'public_metrics', None)
+    )
+
+
+@lru_cache(maxsize=8)
+def _build_client_v2(bearer_token: Optional[str]) -> Optional[Client]:
+    """Build the v2 Tweepy client, shared by every client with the same bearer token."""
+    # Always try to initialize the v2 client with bearer token
+    if bearer_token:
+        logger.info("Initialized Twitter API v2 client with bearer token")
+        return Client(bearer_token=bearer_token)
+    
+    logger.warning("No bearer token provided, v2 client not initialized")
+    return None
+
+
+@lru_cache(maxsize=8)
+def _build_api_v1(api_key: Optional[str], api_secret: Optional[str],
+                  access_token: Optional[str], access_token_secret: Optional[str]) -> Optional[API]:
+    """Build the OAuth 1.0a v1.1 API, shared by every client with the same credentials."""
+    if not all([api_key, api_secret, access_token, access_token_secret]):
+        logger.info("OAuth credentials not provided, v1.1 client not initialized (bearer token authentication only)")
+        return None
+    
+    auth = OAuth1UserHandler(
+        api_key,
+        api_secret,
+        access_token,
+        access_token_secret
+    )
+    logger.info("Initialized Twitter API v1.1 client with OAuth")
+    return API(auth, wait_on_rate_limit=True)
+
+
 class TweepyTwitterClient:
     """Enhanced Twitter API client using Tweepy with rate limiting and error handling."""
     
@@ -56,44 +150,54 @@ class TweepyTwitterClient:
         self.access_token = access_token or (settings.twitter_access_token if settings else None)
         self.access_token_secret = access_token_secret or (settings.twitter_access_token_secret if settings else None)
         
+        # Search results and tweet lookups, reused so repeat IDs within a run
+        # don't spend rate-limit budget
+        self._lookup_cache = TTLCache(
+            maxsize=settings.twitter_lookup_cache_size if settings else 4096,
+            ttl=settings.twitter_lookup_cache_ttl if settings else 300
+        )
+        
+        # Tweet lookups currently being fetched, so concurrent callers share one request
+        self._inflight: Dict[Tuple, Future] = {}
+        self._inflight_lock = threading.Lock()
+        
         # Initialize clients
         self._init_clients()
         
     def _init_clients(self):
-        """Initialize Tweepy clients based on available credentials."""
+        """Initialize the v2 Tweepy client; the v1.1 API is built on first use."""
         try:
-            # Always try to initialize the v2 client with bearer token
-            if self.bearer_token:
-                self.client_v2 = Client(bearer_token=self.bearer_token)
-                logger.info("Initialized Twitter API v2 client with bearer token")
-            else:
-                self.client_v2 = None
-                logger.warning("No bearer token provided, v2 client not initialized")
-            
-            # Initialize v1.1 client for actions that require OAuth (optional)
-            if all([self.api_key, self.api_secret, self.access_token, self.access_token_secret]):
-                auth = OAuth1UserHandler(
-                    self.api_key,
-                    self.api_secret,
-                    self.access_token,
-                    self.access_token_secret
-                )
-                self.api_v1 = API(auth, wait_on_rate_limit=True)
-                logger.info("Initialized Twitter API v1.1 client with OAuth")
-            else:
-                self.api_v1 = None
-                logger.info("OAuth credentials not provided, v1.1 client not initialized (bearer token authentication only)")
-                
+            self.client_v2 = _build_client_v2(self.bearer_token)
         except Exception as e:
             logger.error(f"Error initializing Tweepy clients: {e}")
             raise
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-        retry=retry_if_exception_type((TweepyException, TooManyRequests))
-    )
-    def search_tweets(self, query: str, max_results: int = 10, next_token: str = None) -> SearchResult:
+    @cached_property
+    def api_v1(self) -> Optional[API]:
+        """The OAuth 1.0a v1.1 API, or None without OAuth credentials.
+        
+        Nothing in the v2 code paths needs it, so it is only built when accessed.
+        """
+        return _build_api_v1(
+            self.api_key,
+            self.api_secret,
+            self.access_token,
+            self.access_token_secret
+        )
+    
+    @_TWITTER_RETRY
+    def _call(self, fn, *args, **kwargs):
+        """Call a Tweepy client method, retrying rate-limit and server errors with backoff."""
+        return fn(*args, **kwargs)
+    
+    @_TWITTER_POST_RETRY
+    def _call_post(self, fn, *args, **kwargs):
+        """Call a Tweepy client method that posts content, retrying only rate-limit errors."""
+        return fn(*args, **kwargs)
+    
+    def search_tweets(self, query: str, max_results: int = 10, next_token: str = None,
+                      since_id: str = None,
+                      fields: FrozenSet[str] = DEFAULT_TWEET_FIELDS) -> SearchResult:
         """
         Search for recent tweets using Twitter API v2.
         
@@ -101,6 +205,10 @@ class TweepyTwitterClient:
             query: Search query string
             max_results: Maximum number of results (1-100)
             next_token: Token for pagination
+            since_id: Only return tweets newer than this ID, so a poll that
+                already saw the newest tweets gets an empty page instead of repeats
+            fields: Tweet fields to request beyond id and text; fields left out
+                are None on the returned tweets
             
         Returns:
             SearchResult containing tweets and metadata
@@ -109,32 +217,32 @@ class TweepyTwitterClient:
             logger.error("Twitter API v2 client not initialized")
             return SearchResult(tweets=[], total_count=0)
         
+        tweet_fields = _tweet_fields(fields)
+        cache_key = ("search", query, max_results, next_token, since_id, tweet_fields)
+        cached = self._lookup_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
             # Use Tweepy's search_recent_tweets method
-            response = self.client_v2.search_recent_tweets(
+            response = self._call(
+                self.client_v2.search_recent_tweets,
                 query=query,
                 max_results=min(max_results, 100),
                 next_token=next_token,
-                tweet_fields=['conversation_id', 'author_id', 'created_at', 'public_metrics']
+                since_id=since_id,
+                tweet_fields=tweet_fields
             )
             
-            tweets = []
-            for tweet_data in response.data or []:
-                tweet = Tweet(
-                    id=tweet_data.id,
-                    text=tweet_data.text,
-                    author_id=tweet_data.author_id,
-                    conversation_id=getattr(tweet_data, 'conversation_id', None),
-                    created_at=tweet_data.created_at.isoformat() if tweet_data.created_at else None,
-                    public_metrics=getattr(tweet_data, 'public_metrics', None)
-                )
-                tweets.append(tweet)
+            tweets = [_build_tweet(tweet_data) for tweet_data in response.data or []]
             
-            return SearchResult(
+            result = SearchResult(
                 tweets=tweets,
                 total_count=len(tweets),
                 next_token=response.meta.get('next_token') if response.meta else None
             )
+            self._lookup_cache.set(cache_key, result)
+            return result
             
         except TooManyRequests as e:
             logger.warning(f"Rate limit exceeded: {e}")
@@ -147,19 +255,27 @@ class TweepyTwitterClient:
             logger.error(f"Unexpected error searching tweets: {e}")
             return SearchResult(tweets=[], total_count=0)
     
-    def get_conversation_replies(self, conversation_id: str, max_results: int = 20) -> List[Tweet]:
+    def get_conversation_replies(self, conversation_id: str, max_results: int = 20,
+                                 fields: FrozenSet[str] = DEFAULT_TWEET_FIELDS,
+                                 since_id: str = None) -> List[Tweet]:
         """
         Get replies in a conversation thread.
         
         Args:
             conversation_id: The conversation ID
             max_results: Maximum number of replies
+            fields: Tweet fields to request beyond id and text
+            since_id: Only return replies newer than this ID
             
         Returns:
             List of Tweet objects representing replies
         """
+        if not _CONVERSATION_ID_RE.fullmatch(str(conversation_id)):
+            logger.warning(f"Invalid conversation ID: {conversation_id!r}")
+            return []
+        
         query = f"conversation_id:{conversation_id}"
-        result = self.search_tweets(query, max_results=max_results)
+        result = self.search_tweets(query, max_results=max_results, since_id=since_id, fields=fields)
         return result.tweets
     
     def like_tweet(self, tweet_id: str) -> bool:
@@ -181,7 +297,7 @@ class TweepyTwitterClient:
             return False
         
         try:
-            response = self.client_v2.like(tweet_id=tweet_id, user_id=self.user_id)
+            response = self._call(self.client_v2.like, tweet_id=tweet_id, user_id=self.user_id)
             
             if response.data.get('liked'):
                 logger.info(f"Successfully liked tweet {tweet_id}")
@@ -222,7 +338,8 @@ class TweepyTwitterClient:
             return False
         
         try:
-            response = self.client_v2.create_tweet(
+            response = self._call_post(
+                self.client_v2.create_tweet,
                 text=text,
                 in_reply_to_tweet_id=tweet_id
             )
@@ -278,6 +395,10 @@ class TweepyTwitterClient:
             }
         }
     
+    def clear_cache(self) -> None:
+        """Drop cached search results and tweet lookups, e.g. at the end of a run."""
+        self._lookup_cache.clear()
+    
     def validate_credentials(self) -> bool:
         """Validate that the API credentials are working."""
         try:
@@ -292,52 +413,100 @@ class TweepyTwitterClient:
             logger.error(f"Credential validation failed: {e}")
             return False
     
-    def get_tweet_details(self, tweet_id: str) -> Optional[Tweet]:
+    def get_tweet_details(self, tweet_id: str,
+                          fields: FrozenSet[str] = DEFAULT_TWEET_FIELDS) -> Optional[Tweet]:
         """
         Get detailed information about a specific tweet.
         
         Args:
             tweet_id: ID of the tweet to retrieve
+            fields: Tweet fields to request beyond id and text
             
         Returns:
             Tweet object or None if not found
         """
+        return self.get_tweets_batch([tweet_id], fields=fields).get(str(tweet_id))
+    
+    def get_tweets_batch(self, tweet_ids: List[str],
+                         fields: FrozenSet[str] = DEFAULT_TWEET_FIELDS) -> Dict[str, Tweet]:
+        """
+        Get several tweets, looking up up to 100 IDs per API call.
+        
+        Args:
+            tweet_ids: IDs of the tweets to retrieve
+            fields: Tweet fields to request beyond id and text
+            
+        Returns:
+            Dictionary mapping each found tweet's ID (as a string) to its Tweet;
+            IDs that were not found or failed to load are left out
+        """
         if not self.client_v2:
             logger.warning("Twitter API v2 client not initialized")
-            return None
+            return {}
+        
+        tweet_fields = _tweet_fields(fields)
+        tweets = {}
+        missing = []
+        pending = {}
+        
+        # Claim each uncached ID, or wait on the lookup another caller already has in flight
+        with self._inflight_lock:
+            for tweet_id in dict.fromkeys(str(tweet_id) for tweet_id in tweet_ids):
+                key = ("tweet", tweet_id, tweet_fields)
+                cached = self._lookup_cache.get(key)
+                if cached is not None:
+                    tweets[tweet_id] = cached
+                elif key in self._inflight:
+                    pending[tweet_id] = self._inflight[key]
+                else:
+                    self._inflight[key] = Future()
+                    missing.append(tweet_id)
         
         try:
-            response = self.client_v2.get_tweet(
-                tweet_id,
-                tweet_fields=['conversation_id', 'author_id', 'created_at', 'public_metrics']
-            )
-            
-            if response.data:
-                tweet_data = response.data
-                return Tweet(
-                    id=tweet_data.id,
-                    text=tweet_data.text,
-                    author_id=tweet_data.author_id,
-                    conversation_id=getattr(tweet_data, 'conversation_id', None),
-                    created_at=tweet_data.created_at.isoformat() if tweet_data.created_at else None,
-                    public_metrics=getattr(tweet_data, 'public_metrics', None)
-                )
-            return None
-            
-        except TweepyException as e:
-            logger.error(f"Tweepy error getting tweet {tweet_id}: {e}")
-            return None
-        except Exception as e:
-            logger.error(f"Unexpected error getting tweet {tweet_id}: {e}")
-            return None
+            for start in range(0, len(missing), _MAX_LOOKUP_IDS):
+                chunk = missing[start:start + _MAX_LOOKUP_IDS]
+                try:
+                    response = self._call(
+                        self.client_v2.get_tweets,
+                        ids=chunk,
+                        tweet_fields=tweet_fields
+                    )
+                except TweepyException as e:
+                    logger.error(f"Tweepy error getting {len(chunk)} tweets: {e}")
+                    continue
+                except Exception as e:
+                    logger.error(f"Unexpected error getting {len(chunk)} tweets: {e}")
+                    continue
+                
+                for tweet_data in response.data or []:
+                    tweet = _build_tweet(tweet_data)
+                    tweets[str(tweet.id)] = tweet
+                    self._lookup_cache.set(("tweet", str(tweet.id), tweet_fields), tweet)
+        finally:
+            # Hand the outcome, None if not found, to callers waiting on these IDs
+            with self._inflight_lock:
+                claimed = [self._inflight.pop(("tweet", tweet_id, tweet_fields)) for tweet_id in missing]
+            for tweet_id, future in zip(missing, claimed):
+                future.set_result(tweets.get(tweet_id))
+        
+        for tweet_id, future in pending.items():
+            tweet = future.result()
+            if tweet is not None:
+                tweets[tweet_id] = tweet
+        
+        return tweets
     
-    def get_user_timeline(self, user_id: str = None, max_results: int = 10) -> List[Tweet]:
+    def get_user_timeline(self, user_id: str = None, max_results: int = 10,
+                          since_id: str = None,
+                          fields: FrozenSet[str] = DEFAULT_TWEET_FIELDS) -> List[Tweet]:
         """
         Get recent tweets from a user's timeline.
         
         Args:
             user_id: User ID to get timeline for (defaults to authenticated user)
             max_results: Maximum number of tweets to retrieve
+            since_id: Only return tweets newer than this ID
+            fields: Tweet fields to request beyond id and text
             
         Returns:
             List of Tweet objects
@@ -352,23 +521,15 @@ class TweepyTwitterClient:
             return []
         
         try:
-            response = self.client_v2.get_users_tweets(
+            response = self._call(
+                self.client_v2.get_users_tweets,
                 id=target_user_id,
                 max_results=min(max_results, 100),
-                tweet_fields=['conversation_id', 'author_id', 'created_at', 'public_metrics']
+                since_id=since_id,
+                tweet_fields=_tweet_fields(fields)
             )
             
-            tweets = []
-            for tweet_data in response.data or []:
-                tweet = Tweet(
-                    id=tweet_data.id,
-                    text=tweet_data.text,
-                    author_id=tweet_data.author_id,
-                    conversation_id=getattr(tweet_data, 'conversation_id', None),
-                    created_at=tweet_data.created_at.isoformat() if tweet_data.created_at else None,
-                    public_metrics=getattr(tweet_data, 'public_metrics', None)
-                )
-                tweets.append(tweet)
+            tweets = [_build_tweet(tweet_data) for tweet_data in response.data or []]
             
             return tweets
             
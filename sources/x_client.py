@@ -6,19 +6,44 @@ including proper error handling, rate limiting, and retry logic.
 """
 
 import logging
+import random
+import re
+import sys
 import time
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 
 import requests
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+from requests.adapters import HTTPAdapter
+from tenacity import retry, stop_after_attempt, wait_random_exponential, retry_if_exception_type
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from config import settings
+from rate_limiter import TokenBucket
 
 logger = logging.getLogger(__name__)
 
+# Slotted dataclasses need Python 3.10; on 3.9 the classes keep a __dict__
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# Conversation IDs are tweet IDs; anything else would splice extra operators into the query
+_CONVERSATION_ID_RE = re.compile(r"\d+")
+
+# The endpoints this client calls, by name: the HTTP method, the path under the
+# API base URL, and the published v2 limit as (requests, window seconds)
+_ENDPOINTS = {
+    "search_recent": ("GET", "/tweets/search/recent", (180, 900)),
+    "me": ("GET", "/users/me", (75, 900)),
+    "create_tweet": ("POST", "/tweets", (200, 900)),
+    "like": ("POST", "/users/{user_id}/likes", (50, 900)),
+}
 
-@dataclass
+
+@dataclass(**_DATACLASS_OPTIONS)
 class Tweet:
     """Represents a tweet with its metadata."""
     id: str
@@ -29,7 +54,7 @@ class Tweet:
     public_metrics: Optional[Dict] = None
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class SearchResult:
     """Represents the result of a tweet search."""
     tweets: List[Tweet]
@@ -47,10 +72,22 @@ class TwitterClient:
         self.session = requests.Session()
         self.session.headers.update(self._get_headers())
         
+        # Keep more connections to the API host alive than requests' default of 10
+        adapter = HTTPAdapter(pool_connections=20, pool_maxsize=50, pool_block=False)
+        self.session.mount("https://", adapter)
+        
         # Rate limiting tracking
         self._rate_limit_reset = 0
         self._requests_made = 0
         
+        # Each endpoint's method and full URL, built once, with a bucket that paces
+        # requests to its published limit up front so the quota is spent on calls
+        # rather than on 429 backoffs
+        self._endpoints = {
+            name: (method, self.base_url + path.format(user_id=self.user_id), TokenBucket.per_window(*limit))
+            for name, (method, path, limit) in _ENDPOINTS.items()
+        }
+        
     def _get_headers(self) -> Dict[str, str]:
         """Get HTTP headers for Twitter API requests."""
         return {
@@ -59,6 +96,13 @@ class TwitterClient:
             "User-Agent": "social-agent/1.0"
         }
     
+    @staticmethod
+    def _parse_json(response: requests.Response):
+        """Decode a JSON response body, with orjson when it is installed."""
+        if orjson is not None:
+            return orjson.loads(response.content)
+        return response.json()
+    
     def _check_rate_limit(self, response: requests.Response) -> None:
         """Check and handle rate limiting from response headers."""
         if "x-rate-limit-remaining" in response.headers:
@@ -66,18 +110,21 @@ class TwitterClient:
             reset_time = int(response.headers.get("x-rate-limit-reset", 0))
             
             if remaining == 0:
-                wait_time = reset_time - int(time.time()) + 1
-                logger.warning(f"Rate limit reached. Waiting {wait_time} seconds.")
+                # Jitter the wake-up so concurrent callers don't all retry at the reset instant
+                wait_time = max(0, reset_time - int(time.time()) + 1)
+                wait_time += random.uniform(0, wait_time * 0.2)
+                logger.warning(f"Rate limit reached. Waiting {wait_time:.1f} seconds.")
                 time.sleep(wait_time)
     
     @retry(
         stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
+        wait=wait_random_exponential(multiplier=0.5, max=60),  # full jitter spreads out retries
         retry=retry_if_exception_type((requests.exceptions.RequestException, requests.exceptions.Timeout))
     )
-    def _make_request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
-        """Make a request with retry logic and rate limiting."""
-        url = f"{self.base_url}{endpoint}"
+    def _make_request(self, endpoint: str, **kwargs) -> requests.Response:
+        """Make a request to the named endpoint with retry logic and rate limiting."""
+        method, url, bucket = self._endpoints[endpoint]
+        bucket.consume()
         
         try:
             response = self.session.request(method, url, **kwargs)
@@ -94,7 +141,8 @@ class TwitterClient:
             logger.error(f"Request failed: {e}")
             raise
     
-    def search_tweets(self, query: str, max_results: int = 10, next_token: str = None) -> SearchResult:
+    def search_tweets(self, query: str, max_results: int = 10, next_token: str = None,
+                      since_id: str = None) -> SearchResult:
         """
         Search for recent tweets.
         
@@ -102,6 +150,7 @@ class TwitterClient:
             query: Search query string
             max_results: Maximum number of results (1-100)
             next_token: Token for pagination
+            since_id: Only return tweets newer than this ID
             
         Returns:
             SearchResult containing tweets and metadata
@@ -114,10 +163,12 @@ class TwitterClient:
         
         if next_token:
             params["next_token"] = next_token
+        if since_id:
+            params["since_id"] = since_id
         
         try:
-            response = self._make_request("GET", "/tweets/search/recent", params=params)
-            data = response.json()
+            response = self._make_request("search_recent", params=params)
+            data = self._parse_json(response)
             
             tweets = []
             for tweet_data in data.get("data", []):
@@ -152,6 +203,10 @@ class TwitterClient:
         Returns:
             List of Tweet objects representing replies
         """
+        if not _CONVERSATION_ID_RE.fullmatch(str(conversation_id)):
+            logger.warning(f"Invalid conversation ID: {conversation_id!r}")
+            return []
+        
         query = f"conversation_id:{conversation_id}"
         result = self.search_tweets(query, max_results=max_results)
         return result.tweets
@@ -170,11 +225,10 @@ class TwitterClient:
             logger.warning("Twitter user ID not configured. Skipping like action.")
             return False
         
-        url = f"/users/{self.user_id}/likes"
         payload = {"tweet_id": tweet_id}
         
         try:
-            response = self._make_request("POST", url, json=payload)
+            response = self._make_request("like", json=payload)
             
             if response.status_code in (200, 201):
                 logger.info(f"Successfully liked tweet {tweet_id}")
@@ -204,7 +258,7 @@ class TwitterClient:
         }
         
         try:
-            response = self._make_request("POST", "/tweets", json=payload)
+            response = self._make_request("create_tweet", json=payload)
             
             if response.status_code in (200, 201):
                 logger.info(f"Successfully replied to tweet {tweet_id}")
@@ -220,8 +274,8 @@ class TwitterClient:
     def get_user_info(self) -> Optional[Dict]:
         """Get information about the authenticated user."""
         try:
-            response = self._make_request("GET", "/users/me")
-            return response.json()
+            response = self._make_request("me")
+            return self._parse_json(response)
         except Exception as e:
             logger.error(f"Error getting user info: {e}")
             return None
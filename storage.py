@@ -5,10 +5,15 @@ This module provides a comprehensive storage system for tracking processed tweet
 action history, rate limiting, and system statistics.
 """
 
+import atexit
 import sqlite3
 import json
 import logging
-from typing import Dict, List, Optional, Any, Tuple
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Any, Set, Tuple
 from datetime import datetime, date, timedelta
 from dataclasses import dataclass, asdict
 
@@ -16,12 +21,56 @@ from config import settings
 
 logger = logging.getLogger(__name__)
 
+# Per-connection settings applied by StorageManager._connect. WAL (set once in
+# _init_database, as it persists in the file) makes NORMAL sync durable
+# enough: commits append to the log instead of fsyncing the database twice.
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",  # 256 MiB
+    "PRAGMA cache_size=-20000",  # ~20 MB of page cache
+    "PRAGMA foreign_keys=ON",
+)
+
+# Columns of the tables that are rebuilt when an old database stores them in
+# an earlier layout (see StorageManager._set_aside_outdated_tables)
+_REBUILT_TABLE_COLUMNS = {
+    "processed_tweets": ("tweet_id", "processed_at", "action_taken", "confidence", "reasoning",
+                         "success", "error_message"),
+    "action_log": ("id", "tweet_id", "action_type", "executed_at", "success", "details",
+                   "error_message"),
+    "daily_stats": ("date", "tweets_processed", "likes_given", "replies_sent",
+                    "threads_analyzed", "errors_encountered"),
+    "rate_limits": ("action_type", "daily_count", "last_reset_date", "hourly_count",
+                    "last_hour_reset"),
+    "decision_cache": ("tweet_id", "decision", "comment", "confidence", "reasoning",
+                       "decided_at"),
+    "conversation_cursors": ("conversation_id", "since_id", "updated_at"),
+}
+
+# Timestamp columns that held ISO strings before they became INTEGER Unix seconds
+_TEXT_TIMESTAMP_COLUMNS = {"processed_tweets": "processed_at", "action_log": "executed_at"}
+
+# Tables looked up only by their natural TEXT key, stored clustered on it
+_WITHOUT_ROWID_TABLES = frozenset({"processed_tweets", "daily_stats", "rate_limits"})
+
+# STRICT tables (SQLite 3.37+) store every value in its declared type instead of
+# coercing it. Older libraries cannot read their schema, so they are only used
+# where the bundled SQLite supports them.
+_STRICT_TABLES = sqlite3.sqlite_version_info >= (3, 37, 0)
+_ROWID_TABLE_OPTIONS = "STRICT" if _STRICT_TABLES else ""
+_WITHOUT_ROWID_TABLE_OPTIONS = "WITHOUT ROWID, STRICT" if _STRICT_TABLES else "WITHOUT ROWID"
+
+
+class _Connection(sqlite3.Connection):
+    """A sqlite3 connection that, unlike the base class, can be weakly referenced."""
+
 
 @dataclass
 class ProcessedTweet:
     """Represents a processed tweet record."""
     tweet_id: str
-    processed_at: str
+    processed_at: int  # Unix timestamp
     action_taken: str
     confidence: float
     reasoning: str
@@ -35,58 +84,162 @@ class ActionLog:
     id: int
     tweet_id: str
     action_type: str
-    executed_at: str
+    executed_at: int  # Unix timestamp
     success: bool
     details: str
     error_message: Optional[str] = None
 
 
+def _action_log_from_row(cursor: sqlite3.Cursor, row: Tuple) -> ActionLog:
+    """Row factory building an ActionLog from an action_log SELECT."""
+    action_id, tweet_id, action_type, executed_at, success, details, error_message = row
+    return ActionLog(action_id, tweet_id, action_type, executed_at, bool(success), details, error_message)
+
+
+@dataclass
+class CachedDecision:
+    """Represents a persisted kernel decision for a tweet."""
+    tweet_id: str
+    decision: str
+    comment: str
+    confidence: float
+    reasoning: str
+    decided_at: float  # Unix timestamp
+
+
 class StorageManager:
     """Manages SQLite database operations and data persistence."""
     
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, write_batch_size: int = None,
+                 write_flush_interval: float = None):
         """Initialize the storage manager.
         
         Args:
             db_path: Path to the SQLite database file
+            write_batch_size: Buffered processed-tweet and action rows that trigger a flush
+            write_flush_interval: Seconds after which buffered rows are flushed on the next write
         """
         self.db_path = db_path or settings.database_path
+        self.write_batch_size = write_batch_size or settings.storage_write_batch_size
+        self.write_flush_interval = (
+            write_flush_interval if write_flush_interval is not None
+            else settings.storage_write_flush_interval
+        )
+        
+        # One long-lived connection per thread. The set tracks them weakly so a
+        # finished thread's connection is freed with it, and the rest are
+        # closed at exit.
+        self._local = threading.local()
+        self._connections = weakref.WeakSet()
+        self._connections_lock = threading.Lock()
+        atexit.register(self._close_all, self._connections, self._connections_lock)
+        
+        # Processed tweets (by ID, latest wins) and action rows waiting to be
+        # written in one transaction. The lock is held through a flush so a row
+        # is always either buffered or committed.
+        self._pending_tweets: Dict[str, Tuple] = {}
+        self._pending_actions: List[Tuple[Tuple, Future]] = []
+        self._pending_since: Optional[float] = None
+        self._write_lock = threading.Lock()
+        # Registered after the connection cleanup so it runs first at exit
+        atexit.register(self.flush)
+        
+        # Every processed tweet ID, so has_processed_tweet never has to query;
+        # guarded by the write lock alongside the buffer it mirrors
+        self._processed_ids: Set[str] = set()
+        
         self._init_database()
+        self._load_processed_ids()
+        self.optimize()
+    
+    def _connect(self, **kwargs) -> sqlite3.Connection:
+        """Open a connection to the database with the tuned session PRAGMAs applied.
+        
+        Args:
+            **kwargs: Extra arguments for sqlite3.connect
+        
+        Returns:
+            The open connection
+        """
+        conn = sqlite3.connect(self.db_path, **kwargs)
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
+    def _conn(self) -> sqlite3.Connection:
+        """Get this thread's connection to the database, opening it on first use.
+        
+        Returns:
+            The calling thread's open connection
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect(timeout=30, check_same_thread=False, factory=_Connection)
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.add(conn)
+        return conn
+    
+    @staticmethod
+    def _close_all(connections: "weakref.WeakSet[_Connection]", lock: threading.Lock) -> None:
+        """Close the tracked connections of a manager."""
+        with lock:
+            for conn in list(connections):
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            connections.clear()
+    
+    def close(self) -> None:
+        """Flush buffered writes and close every thread's connection; later calls open fresh ones."""
+        self.flush()
+        self._close_all(self._connections, self._connections_lock)
+        self._local = threading.local()
     
     def _init_database(self) -> None:
         """Initialize the database with required tables."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._conn() as conn:
                 cursor = conn.cursor()
                 
+                # WAL is stored in the database file, so it only needs setting
+                # once; in-memory databases keep their default journal
+                if self.db_path != ":memory:":
+                    cursor.execute("PRAGMA journal_mode=WAL")
+                
+                # Create or migrate the schema atomically
+                cursor.execute("BEGIN IMMEDIATE")
+                migrated = self._set_aside_outdated_tables(cursor)
+                
                 # Create processed tweets table
-                cursor.execute("""
+                cursor.execute(f"""
                     CREATE TABLE IF NOT EXISTS processed_tweets (
                         tweet_id TEXT PRIMARY KEY,
-                        processed_at TEXT NOT NULL,
+                        processed_at INTEGER NOT NULL,
                         action_taken TEXT NOT NULL,
                         confidence REAL NOT NULL,
                         reasoning TEXT NOT NULL,
-                        success BOOLEAN NOT NULL,
+                        success INTEGER NOT NULL,
                         error_message TEXT
-                    )
+                    ) {_WITHOUT_ROWID_TABLE_OPTIONS}
                 """)
                 
                 # Create action log table
-                cursor.execute("""
+                cursor.execute(f"""
                     CREATE TABLE IF NOT EXISTS action_log (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        id INTEGER PRIMARY KEY,
                         tweet_id TEXT NOT NULL,
                         action_type TEXT NOT NULL,
-                        executed_at TEXT NOT NULL,
-                        success BOOLEAN NOT NULL,
+                        executed_at INTEGER NOT NULL,
+                        success INTEGER NOT NULL,
                         details TEXT NOT NULL,
                         error_message TEXT
-                    )
+                    ) {_ROWID_TABLE_OPTIONS}
                 """)
                 
                 # Create daily stats table
-                cursor.execute("""
+                cursor.execute(f"""
                     CREATE TABLE IF NOT EXISTS daily_stats (
                         date TEXT PRIMARY KEY,
                         tweets_processed INTEGER DEFAULT 0,
@@ -94,20 +247,45 @@ class StorageManager:
                         replies_sent INTEGER DEFAULT 0,
                         threads_analyzed INTEGER DEFAULT 0,
                         errors_encountered INTEGER DEFAULT 0
-                    )
+                    ) {_WITHOUT_ROWID_TABLE_OPTIONS}
                 """)
                 
                 # Create rate limit tracking table
-                cursor.execute("""
+                cursor.execute(f"""
                     CREATE TABLE IF NOT EXISTS rate_limits (
                         action_type TEXT PRIMARY KEY,
                         daily_count INTEGER DEFAULT 0,
                         last_reset_date TEXT NOT NULL,
                         hourly_count INTEGER DEFAULT 0,
                         last_hour_reset TEXT NOT NULL
-                    )
+                    ) {_WITHOUT_ROWID_TABLE_OPTIONS}
+                """)
+                
+                # Create decision cache table (kernel decisions reused across restarts)
+                cursor.execute(f"""
+                    CREATE TABLE IF NOT EXISTS decision_cache (
+                        tweet_id TEXT PRIMARY KEY,
+                        decision TEXT NOT NULL,
+                        comment TEXT NOT NULL,
+                        confidence REAL NOT NULL,
+                        reasoning TEXT NOT NULL,
+                        decided_at REAL NOT NULL
+                    ) {_ROWID_TABLE_OPTIONS}
                 """)
                 
+                # Create conversation cursor table (newest reply seen per thread)
+                cursor.execute(f"""
+                    CREATE TABLE IF NOT EXISTS conversation_cursors (
+                        conversation_id TEXT PRIMARY KEY,
+                        since_id TEXT NOT NULL,
+                        updated_at REAL NOT NULL
+                    ) {_ROWID_TABLE_OPTIONS}
+                """)
+                
+                # Copy migrated rows before indexing, which also drops the old
+                # tables' indexes so they are rebuilt on the new columns
+                self._copy_outdated_tables(cursor, migrated)
+                
                 # Create indexes for better performance
                 cursor.execute("""
                     CREATE INDEX IF NOT EXISTS idx_processed_tweets_date 
@@ -124,65 +302,158 @@ class StorageManager:
                     ON action_log(tweet_id)
                 """)
                 
-                conn.commit()
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_decision_cache_date 
+                    ON decision_cache(decided_at)
+                """)
+                
                 logger.info("Database initialized successfully")
                 
         except Exception as e:
             logger.error(f"Error initializing database: {e}")
             raise
     
+    def _load_processed_ids(self) -> None:
+        """Reload the in-memory set of processed tweet IDs from the database."""
+        try:
+            with self._conn() as conn:
+                stored = {row[0] for row in conn.execute("SELECT tweet_id FROM processed_tweets")}
+        except Exception as e:
+            logger.error(f"Error loading processed tweet IDs: {e}")
+            return
+        
+        with self._write_lock:
+            # Tweets marked while the IDs were being read are still buffered
+            self._processed_ids = stored | self._pending_tweets.keys()
+    
+    def optimize(self) -> None:
+        """Let SQLite refresh the query planner statistics that have gone stale."""
+        try:
+            with self._conn() as conn:
+                conn.execute("PRAGMA optimize")
+        except Exception as e:
+            logger.error(f"Error optimizing database: {e}")
+    
+    def checkpoint(self) -> None:
+        """Copy the WAL into the database and truncate it so it does not keep growing."""
+        if self.db_path == ":memory:":
+            return
+        
+        try:
+            with self._conn() as conn:
+                busy, wal_pages, copied = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+            if busy:
+                logger.debug(f"WAL checkpoint incomplete: {copied} of {wal_pages} pages copied")
+        except Exception as e:
+            logger.error(f"Error checkpointing database: {e}")
+    
+    @staticmethod
+    def _set_aside_outdated_tables(cursor: sqlite3.Cursor) -> List[str]:
+        """Rename tables stored in an earlier layout so they are recreated.
+        
+        A table is outdated if it still stores ISO-string timestamps, is a rowid
+        table that is now declared WITHOUT ROWID, still uses AUTOINCREMENT (an
+        extra sqlite_sequence write per insert, only to never reuse IDs), or is
+        not STRICT where SQLite supports it.
+        
+        Args:
+            cursor: Cursor inside the schema transaction
+        
+        Returns:
+            Names of the tables that were renamed
+        """
+        migrated = []
+        for table in _REBUILT_TABLE_COLUMNS:
+            row = cursor.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+            ).fetchone()
+            if row is None:
+                continue
+            
+            types = {info[1]: info[2] for info in cursor.execute(f"PRAGMA table_info({table})")}
+            sql = row[0].upper()
+            outdated = (
+                types.get(_TEXT_TIMESTAMP_COLUMNS.get(table)) == "TEXT"
+                or (table in _WITHOUT_ROWID_TABLES and "WITHOUT ROWID" not in sql)
+                or "AUTOINCREMENT" in sql
+                or (_STRICT_TABLES and not sql.rstrip().endswith("STRICT"))
+            )
+            if outdated:
+                cursor.execute(f"ALTER TABLE {table} RENAME TO {table}_legacy")
+                migrated.append(table)
+        return migrated
+    
+    @staticmethod
+    def _copy_outdated_tables(cursor: sqlite3.Cursor, tables: List[str]) -> None:
+        """Copy renamed tables into their recreated versions and drop them.
+        
+        ISO-string timestamps are naive local times, hence the 'utc' modifier;
+        any that cannot be parsed become 0 and are removed by the next cleanup.
+        
+        Args:
+            cursor: Cursor inside the schema transaction
+            tables: Tables returned by _set_aside_outdated_tables
+        """
+        for table in tables:
+            columns = _REBUILT_TABLE_COLUMNS[table]
+            types = {info[1]: info[2] for info in cursor.execute(f"PRAGMA table_info({table}_legacy)")}
+            values = [
+                f"COALESCE(CAST(strftime('%s', {column}, 'utc') AS INTEGER), 0)"
+                if column == _TEXT_TIMESTAMP_COLUMNS.get(table) and types[column] == "TEXT"
+                else column
+                for column in columns
+            ]
+            cursor.execute(f"""
+                INSERT INTO {table} ({", ".join(columns)})
+                SELECT {", ".join(values)} FROM {table}_legacy
+            """)
+            cursor.execute(f"DROP TABLE {table}_legacy")
+            logger.info(f"Migrated {table} to the current schema")
+    
     def has_processed_tweet(self, tweet_id: str) -> bool:
         """Check if a tweet has already been processed.
         
+        Answered from memory: the IDs stored at startup plus every tweet marked
+        since. Tweets another process marks later are not seen.
+        
         Args:
             tweet_id: The tweet ID to check
             
         Returns:
             True if the tweet has been processed, False otherwise
         """
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "SELECT 1 FROM processed_tweets WHERE tweet_id = ?",
-                    (tweet_id,)
-                )
-                return cursor.fetchone() is not None
-        except Exception as e:
-            logger.error(f"Error checking processed tweet {tweet_id}: {e}")
-            return False
+        with self._write_lock:
+            return tweet_id in self._processed_ids
     
     def mark_tweet_processed(self, processed_tweet: ProcessedTweet) -> None:
         """Mark a tweet as processed.
         
+        The row is buffered and written with the next flush; has_processed_tweet
+        sees it immediately.
+        
         Args:
             processed_tweet: ProcessedTweet object to store
         """
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT OR REPLACE INTO processed_tweets 
-                    (tweet_id, processed_at, action_taken, confidence, reasoning, success, error_message)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    processed_tweet.tweet_id,
-                    processed_tweet.processed_at,
-                    processed_tweet.action_taken,
-                    processed_tweet.confidence,
-                    processed_tweet.reasoning,
-                    processed_tweet.success,
-                    processed_tweet.error_message
-                ))
-                conn.commit()
-                logger.debug(f"Marked tweet {processed_tweet.tweet_id} as processed")
-        except Exception as e:
-            logger.error(f"Error marking tweet as processed: {e}")
+        with self._write_lock:
+            self._processed_ids.add(processed_tweet.tweet_id)
+            self._pending_tweets[processed_tweet.tweet_id] = (
+                processed_tweet.tweet_id,
+                processed_tweet.processed_at,
+                processed_tweet.action_taken,
+                processed_tweet.confidence,
+                processed_tweet.reasoning,
+                processed_tweet.success,
+                processed_tweet.error_message
+            )
+            self._maybe_flush_locked()
+        logger.debug(f"Marked tweet {processed_tweet.tweet_id} as processed")
     
     def log_action(self, tweet_id: str, action_type: str, success: bool, 
-                   details: str, error_message: str = None) -> int:
+                   details: str, error_message: str = None) -> "Future[int]":
         """Log an action to the database.
         
+        The row is buffered and written with the next flush.
+        
         Args:
             tweet_id: ID of the tweet the action was performed on
             action_type: Type of action (like, comment, etc.)
@@ -191,30 +462,121 @@ class StorageManager:
             error_message: Error message if the action failed
             
         Returns:
-            ID of the logged action
+            Future resolving to the ID of the logged action (-1 if it could not be written)
         """
+        action_id = Future()
+        with self._write_lock:
+            self._pending_actions.append(((
+                tweet_id,
+                action_type,
+                int(time.time()),
+                success,
+                details,
+                error_message
+            ), action_id))
+            self._maybe_flush_locked()
+        return action_id
+    
+    def flush(self) -> None:
+        """Write all buffered processed tweets and actions in one transaction."""
+        with self._write_lock:
+            self._flush_locked()
+    
+    def _maybe_flush_locked(self) -> None:
+        """Flush if the buffer is full or its oldest row has waited long enough."""
+        now = time.monotonic()
+        if self._pending_since is None:
+            self._pending_since = now
+        
+        pending = len(self._pending_tweets) + len(self._pending_actions)
+        if (pending >= self.write_batch_size
+                or now - self._pending_since >= self.write_flush_interval):
+            self._flush_locked()
+    
+    def _flush_locked(self) -> None:
+        """Write the buffered rows; must be called with the write lock held.
+        
+        The rows are written in one transaction. If that fails they are written
+        one by one instead, so a bad row only loses itself.
+        """
+        tweets = list(self._pending_tweets.values())
+        actions = self._pending_actions
+        self._pending_tweets = {}
+        self._pending_actions = []
+        self._pending_since = None
+        
+        if not tweets and not actions:
+            return
+        
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT INTO action_log 
-                    (tweet_id, action_type, executed_at, success, details, error_message)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (
-                    tweet_id,
-                    action_type,
-                    datetime.now().isoformat(),
-                    success,
-                    details,
-                    error_message
-                ))
-                conn.commit()
-                action_id = cursor.lastrowid
-                logger.debug(f"Logged action {action_id} for tweet {tweet_id}")
-                return action_id
+            with self._conn() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                self._insert_processed_tweets(conn, tweets)
+                action_ids = [self._insert_action(conn, row) for row, _ in actions]
         except Exception as e:
-            logger.error(f"Error logging action: {e}")
-            return -1
+            logger.warning(f"Error flushing buffered writes, retrying row by row: {e}")
+            self._flush_rows_individually(tweets, actions)
+            return
+        
+        logger.debug(f"Flushed {len(tweets)} processed tweets and {len(actions)} actions")
+        for (_, future), action_id in zip(actions, action_ids):
+            future.set_result(action_id)
+    
+    def _flush_rows_individually(self, tweets: List[Tuple], actions: List[Tuple[Tuple, Future]]) -> None:
+        """Write buffered rows one transaction each, after a batched flush failed.
+        
+        Rows hitting an operational error (a locked or unavailable database) go
+        back into the buffer for the next flush; rows SQLite rejects are dropped.
+        Must be called with the write lock held.
+        """
+        for row in tweets:
+            try:
+                with self._conn() as conn:
+                    self._insert_processed_tweets(conn, [row])
+            except sqlite3.OperationalError as e:
+                logger.warning(f"Keeping processed tweet {row[0]} buffered: {e}")
+                self._pending_tweets.setdefault(row[0], row)
+            except Exception as e:
+                logger.error(f"Dropping processed tweet {row[0]}: {e}")
+        
+        for row, future in actions:
+            try:
+                with self._conn() as conn:
+                    future.set_result(self._insert_action(conn, row))
+            except sqlite3.OperationalError as e:
+                logger.warning(f"Keeping action for tweet {row[0]} buffered: {e}")
+                self._pending_actions.append((row, future))
+            except Exception as e:
+                logger.error(f"Dropping action for tweet {row[0]}: {e}")
+                future.set_result(-1)
+        
+        if self._pending_tweets or self._pending_actions:
+            self._pending_since = time.monotonic()
+    
+    @staticmethod
+    def _insert_processed_tweets(conn: sqlite3.Connection, rows: List[Tuple]) -> None:
+        """Insert or update processed_tweets rows."""
+        conn.executemany("""
+            INSERT INTO processed_tweets 
+            (tweet_id, processed_at, action_taken, confidence, reasoning, success, error_message)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(tweet_id) DO UPDATE SET
+                processed_at = excluded.processed_at,
+                action_taken = excluded.action_taken,
+                confidence = excluded.confidence,
+                reasoning = excluded.reasoning,
+                success = excluded.success,
+                error_message = excluded.error_message
+        """, rows)
+    
+    @staticmethod
+    def _insert_action(conn: sqlite3.Connection, row: Tuple) -> int:
+        """Insert an action_log row, returning its ID."""
+        return conn.execute("""
+            INSERT INTO action_log 
+            (tweet_id, action_type, executed_at, success, details, error_message)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, row).lastrowid
     
     def get_daily_stats(self, target_date: date = None) -> Dict[str, int]:
         """Get daily statistics for a specific date.
@@ -229,7 +591,7 @@ class StorageManager:
         date_str = target_date.isoformat()
         
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._conn() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     SELECT tweets_processed, likes_given, replies_sent, 
@@ -261,6 +623,9 @@ class StorageManager:
     def update_daily_stats(self, stats_update: Dict[str, int], target_date: date = None) -> None:
         """Update daily statistics.
         
+        The increments are added to the stored counters by a single UPSERT, so
+        concurrent updates cannot overwrite each other.
+        
         Args:
             stats_update: Dictionary with stat updates
             target_date: Date to update stats for (defaults to today)
@@ -269,32 +634,26 @@ class StorageManager:
         date_str = target_date.isoformat()
         
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Get current stats
-                current_stats = self.get_daily_stats(target_date)
-                
-                # Update stats
-                for key, increment in stats_update.items():
-                    if key in current_stats:
-                        current_stats[key] += increment
-                
-                # Store updated stats
-                cursor.execute("""
-                    INSERT OR REPLACE INTO daily_stats 
+            with self._conn() as conn:
+                conn.execute("""
+                    INSERT INTO daily_stats 
                     (date, tweets_processed, likes_given, replies_sent, 
                      threads_analyzed, errors_encountered)
                     VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(date) DO UPDATE SET
+                        tweets_processed = tweets_processed + excluded.tweets_processed,
+                        likes_given = likes_given + excluded.likes_given,
+                        replies_sent = replies_sent + excluded.replies_sent,
+                        threads_analyzed = threads_analyzed + excluded.threads_analyzed,
+                        errors_encountered = errors_encountered + excluded.errors_encountered
                 """, (
                     date_str,
-                    current_stats["tweets_processed"],
-                    current_stats["likes_given"],
-                    current_stats["replies_sent"],
-                    current_stats["threads_analyzed"],
-                    current_stats["errors_encountered"]
+                    stats_update.get("tweets_processed", 0),
+                    stats_update.get("likes_given", 0),
+                    stats_update.get("replies_sent", 0),
+                    stats_update.get("threads_analyzed", 0),
+                    stats_update.get("errors_encountered", 0)
                 ))
-                conn.commit()
                 logger.debug(f"Updated daily stats for {date_str}")
         except Exception as e:
             logger.error(f"Error updating daily stats: {e}")
@@ -309,7 +668,7 @@ class StorageManager:
             Dictionary with rate limit information
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._conn() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     SELECT daily_count, last_reset_date, hourly_count, last_hour_reset
@@ -338,49 +697,192 @@ class StorageManager:
     def update_rate_limit(self, action_type: str, increment: int = 1) -> None:
         """Update rate limit counters.
         
+        Counters whose day or hour has passed restart from the increment; the
+        reset and the increment happen in a single UPSERT.
+        
         Args:
             action_type: Type of action to update
             increment: Amount to increment the counter
         """
+        current_date = date.today().isoformat()
+        current_hour = datetime.now().strftime("%Y-%m-%d %H:00:00")
+        
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Get current status
-                status = self.get_rate_limit_status(action_type)
-                current_date = date.today().isoformat()
-                current_hour = datetime.now().strftime("%Y-%m-%d %H:00:00")
-                
-                # Reset daily counter if needed
-                if status["last_reset_date"] != current_date:
-                    status["daily_count"] = 0
-                    status["last_reset_date"] = current_date
+            with self._conn() as conn:
+                conn.execute("""
+                    INSERT INTO rate_limits 
+                    (action_type, daily_count, last_reset_date, hourly_count, last_hour_reset)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(action_type) DO UPDATE SET
+                        daily_count = CASE WHEN last_reset_date = excluded.last_reset_date
+                                           THEN daily_count + excluded.daily_count
+                                           ELSE excluded.daily_count END,
+                        last_reset_date = excluded.last_reset_date,
+                        hourly_count = CASE WHEN last_hour_reset = excluded.last_hour_reset
+                                            THEN hourly_count + excluded.hourly_count
+                                            ELSE excluded.hourly_count END,
+                        last_hour_reset = excluded.last_hour_reset
+                """, (action_type, increment, current_date, increment, current_hour))
+                logger.debug(f"Updated rate limit for {action_type}")
+        except Exception as e:
+            logger.error(f"Error updating rate limit: {e}")
+    
+    def reserve_rate_limit(self, action_type: str, limit: int, increment: int = 1) -> Optional[int]:
+        """Atomically take part of today's budget for an action type.
+        
+        The limit check and the increment run in a single write transaction, so
+        concurrent workers and processes sharing the database cannot both claim
+        the last remaining slot.
+        
+        Args:
+            action_type: Type of action to reserve
+            limit: Maximum daily count for the action type
+            increment: Amount to add to the counters
+        
+        Returns:
+            The new daily count, or None if the reservation would exceed the limit
+        """
+        current_date = date.today().isoformat()
+        current_hour = datetime.now().strftime("%Y-%m-%d %H:00:00")
+        
+        try:
+            with self._conn() as conn:
+                # Take the write lock before reading so the check cannot go stale;
+                # leaving the block commits (or rolls back) and releases it
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute("""
+                    SELECT daily_count, last_reset_date, hourly_count, last_hour_reset
+                    FROM rate_limits WHERE action_type = ?
+                """, (action_type,)).fetchone()
                 
-                # Reset hourly counter if needed
-                if status["last_hour_reset"] != current_hour:
-                    status["hourly_count"] = 0
-                    status["last_hour_reset"] = current_hour
+                daily_count = row[0] if row and row[1] == current_date else 0
+                hourly_count = row[2] if row and row[3] == current_hour else 0
                 
-                # Update counters
-                status["daily_count"] += increment
-                status["hourly_count"] += increment
+                if daily_count + increment > limit:
+                    return None
                 
-                # Store updated status
-                cursor.execute("""
+                conn.execute("""
                     INSERT OR REPLACE INTO rate_limits 
                     (action_type, daily_count, last_reset_date, hourly_count, last_hour_reset)
                     VALUES (?, ?, ?, ?, ?)
-                """, (
-                    action_type,
-                    status["daily_count"],
-                    status["last_reset_date"],
-                    status["hourly_count"],
-                    status["last_hour_reset"]
-                ))
-                conn.commit()
-                logger.debug(f"Updated rate limit for {action_type}")
+                """, (action_type, daily_count + increment, current_date,
+                      hourly_count + increment, current_hour))
+                return daily_count + increment
         except Exception as e:
-            logger.error(f"Error updating rate limit: {e}")
+            logger.error(f"Error reserving rate limit: {e}")
+            return None
+    
+    def release_rate_limit(self, action_type: str, increment: int = 1) -> None:
+        """Give back budget taken by reserve_rate_limit for an action that did not happen.
+        
+        Args:
+            action_type: Type of action to release
+            increment: Amount to subtract from the counters
+        """
+        try:
+            with self._conn() as conn:
+                conn.execute("""
+                    UPDATE rate_limits
+                    SET daily_count = MAX(daily_count - ?, 0),
+                        hourly_count = MAX(hourly_count - ?, 0)
+                    WHERE action_type = ? AND last_reset_date = ?
+                """, (increment, increment, action_type, date.today().isoformat()))
+        except Exception as e:
+            logger.error(f"Error releasing rate limit: {e}")
+    
+    def save_decisions(self, decisions: List[CachedDecision]) -> None:
+        """Persist kernel decisions so they survive process restarts.
+        
+        Args:
+            decisions: CachedDecision objects to store (replacing existing entries)
+        """
+        if not decisions:
+            return
+        
+        try:
+            with self._conn() as conn:
+                conn.executemany("""
+                    INSERT INTO decision_cache 
+                    (tweet_id, decision, comment, confidence, reasoning, decided_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(tweet_id) DO UPDATE SET
+                        decision = excluded.decision,
+                        comment = excluded.comment,
+                        confidence = excluded.confidence,
+                        reasoning = excluded.reasoning,
+                        decided_at = excluded.decided_at
+                """, [
+                    (d.tweet_id, d.decision, d.comment, d.confidence, d.reasoning, d.decided_at)
+                    for d in decisions
+                ])
+                logger.debug(f"Saved {len(decisions)} decisions")
+        except Exception as e:
+            logger.error(f"Error saving decisions: {e}")
+    
+    def get_recent_decisions(self, max_age_seconds: float, limit: int = 10000) -> List[CachedDecision]:
+        """Get persisted decisions younger than `max_age_seconds`.
+        
+        Args:
+            max_age_seconds: Maximum age of the decisions to return
+            limit: Maximum number of decisions to return (newest first)
+        
+        Returns:
+            List of CachedDecision objects
+        """
+        try:
+            cutoff = time.time() - max_age_seconds
+            
+            with self._conn() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT tweet_id, decision, comment, confidence, reasoning, decided_at
+                    FROM decision_cache
+                    WHERE decided_at >= ?
+                    ORDER BY decided_at DESC
+                    LIMIT ?
+                """, (cutoff, limit))
+                
+                return [CachedDecision(*row) for row in cursor.fetchall()]
+        except Exception as e:
+            logger.error(f"Error getting recent decisions: {e}")
+            return []
+    
+    def get_conversation_cursor(self, conversation_id: str) -> Optional[str]:
+        """Get the newest reply ID already fetched for a conversation.
+        
+        Args:
+            conversation_id: The conversation ID
+        
+        Returns:
+            The reply ID to pass as since_id, or None if the thread was never fetched
+        """
+        try:
+            with self._conn() as conn:
+                row = conn.execute(
+                    "SELECT since_id FROM conversation_cursors WHERE conversation_id = ?",
+                    (conversation_id,)
+                ).fetchone()
+                return row[0] if row else None
+        except Exception as e:
+            logger.error(f"Error getting cursor for conversation {conversation_id}: {e}")
+            return None
+    
+    def set_conversation_cursor(self, conversation_id: str, since_id: str) -> None:
+        """Record the newest reply ID fetched for a conversation.
+        
+        Args:
+            conversation_id: The conversation ID
+            since_id: ID of the newest reply fetched
+        """
+        try:
+            with self._conn() as conn:
+                conn.execute("""
+                    INSERT OR REPLACE INTO conversation_cursors 
+                    (conversation_id, since_id, updated_at)
+                    VALUES (?, ?, ?)
+                """, (conversation_id, since_id, time.time()))
+        except Exception as e:
+            logger.error(f"Error setting cursor for conversation {conversation_id}: {e}")
     
     def get_recent_actions(self, limit: int = 100) -> List[ActionLog]:
         """Get recent actions from the log.
@@ -391,30 +893,21 @@ class StorageManager:
         Returns:
             List of recent ActionLog objects
         """
+        self.flush()
+        
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._conn() as conn:
                 cursor = conn.cursor()
+                # Build each ActionLog as its row is fetched, skipping the tuple list
+                cursor.row_factory = _action_log_from_row
                 cursor.execute("""
                     SELECT id, tweet_id, action_type, executed_at, success, details, error_message
                     FROM action_log
-                    ORDER BY executed_at DESC
+                    ORDER BY executed_at DESC, id DESC
                     LIMIT ?
                 """, (limit,))
                 
-                actions = []
-                for row in cursor.fetchall():
-                    action = ActionLog(
-                        id=row[0],
-                        tweet_id=row[1],
-                        action_type=row[2],
-                        executed_at=row[3],
-                        success=bool(row[4]),
-                        details=row[5],
-                        error_message=row[6]
-                    )
-                    actions.append(action)
-                
-                return actions
+                return cursor.fetchall()
         except Exception as e:
             logger.error(f"Error getting recent actions: {e}")
             return []
@@ -428,16 +921,17 @@ class StorageManager:
         Returns:
             Count of processed tweets
         """
+        self.flush()
+        
         try:
-            cutoff_date = (datetime.now().date() - 
-                          timedelta(days=days)).isoformat()
+            cutoff = int((datetime.now() - timedelta(days=days)).timestamp())
             
-            with sqlite3.connect(self.db_path) as conn:
+            with self._conn() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     SELECT COUNT(*) FROM processed_tweets 
                     WHERE processed_at >= ?
-                """, (cutoff_date,))
+                """, (cutoff,))
                 
                 return cursor.fetchone()[0]
         except Exception as e:
@@ -450,27 +944,40 @@ class StorageManager:
         Args:
             days_to_keep: Number of days of data to keep
         """
+        self.flush()
+        
         try:
-            cutoff_date = (datetime.now().date() - 
-                          timedelta(days=days_to_keep)).isoformat()
+            cutoff = int(time.time()) - days_to_keep * 86400
             
-            with sqlite3.connect(self.db_path) as conn:
+            with self._conn() as conn:
                 cursor = conn.cursor()
                 
                 # Clean up old processed tweets
                 cursor.execute("""
                     DELETE FROM processed_tweets WHERE processed_at < ?
-                """, (cutoff_date,))
+                """, (cutoff,))
                 
                 # Clean up old action logs
                 cursor.execute("""
                     DELETE FROM action_log WHERE executed_at < ?
-                """, (cutoff_date,))
+                """, (cutoff,))
+                
+                # Clean up old cached decisions
+                cursor.execute("""
+                    DELETE FROM decision_cache WHERE decided_at < ?
+                """, (cutoff,))
+                
+                # Clean up cursors of conversations not fetched recently
+                cursor.execute("""
+                    DELETE FROM conversation_cursors WHERE updated_at < ?
+                """, (cutoff,))
                 
-                conn.commit()
                 logger.info(f"Cleaned up data older than {days_to_keep} days")
         except Exception as e:
             logger.error(f"Error cleaning up old data: {e}")
+        
+        # Forget the tweets that were just deleted
+        self._load_processed_ids()
 
 
 # Global storage manager instance
@@ -0,0 +1,31 @@
+"""
+Shared setup for the test suite.
+
+Puts the project root on the import path and loads settings with placeholder
+credentials, so modules that read config at import time can be imported
+without a real environment. The placeholders are removed from the
+environment again afterwards, so tests that look for real credentials still
+skip.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+_PLACEHOLDERS = {
+    "TWITTER_BEARER_TOKEN": "test_bearer_token",
+    "TWITTER_USER_ID": "test_user_id",
+    "GOOGLE_API_KEY": "test_google_api_key",
+    "DATABASE_PATH": os.path.join(tempfile.mkdtemp(), "agent_state.db"),
+}
+_added = [name for name in _PLACEHOLDERS if name not in os.environ]
+for name in _added:
+    os.environ[name] = _PLACEHOLDERS[name]
+
+try:
+    import config  # noqa: F401  (builds the global settings once)
+finally:
+    for name in _added:
+        del os.environ[name]
@@ -0,0 +1,69 @@
+"""
+Tests for the columnar ActionResults container.
+"""
+
+from agents.action_agent import ActionResults
+
+
+class TestActionResults:
+    """Test cases for ActionResults."""
+    
+    def test_empty(self):
+        """New results have no rows and empty record groups."""
+        results = ActionResults()
+        
+        assert len(results) == 0
+        assert results.to_records() == {"successful": [], "failed": [], "skipped": []}
+    
+    def test_counts_per_status(self):
+        """Each append updates the count for its status."""
+        results = ActionResults()
+        results.append_successful("1", "like", "Liked")
+        results.append_successful("2", "comment", "Replied", comment="Nice")
+        results.append_failed("3", "like", "API error")
+        results.append_skipped("4", "comment", "Daily reply limit reached")
+        
+        assert len(results) == 4
+        assert results.successful_count == 2
+        assert results.failed_count == 1
+        assert results.skipped_count == 1
+    
+    def test_to_records_groups_by_status(self):
+        """to_records returns one dict per row, grouped by status in append order."""
+        results = ActionResults()
+        results.append_successful("1", "like", "Liked")
+        results.append_skipped("2", "like", "Daily like limit reached")
+        results.append_successful("3", "interesting", "Logged as interesting")
+        results.append_failed("4", "comment", "API error", comment="Hello")
+        
+        assert results.to_records() == {
+            "successful": [
+                {"tweet_id": "1", "action": "like", "reason": "Liked"},
+                {"tweet_id": "3", "action": "interesting", "reason": "Logged as interesting"},
+            ],
+            "failed": [
+                {"tweet_id": "4", "action": "comment", "reason": "API error", "comment": "Hello"},
+            ],
+            "skipped": [
+                {"tweet_id": "2", "action": "like", "reason": "Daily like limit reached"},
+            ],
+        }
+    
+    def test_comment_only_included_when_set(self):
+        """Records carry a comment key only for rows that have reply text."""
+        results = ActionResults()
+        results.append_successful("1", "comment", "Replied", comment="")
+        results.append_successful("2", "like", "Liked")
+        
+        successful = results.to_records()["successful"]
+        assert successful[0]["comment"] == ""
+        assert "comment" not in successful[1]
+    
+    def test_instances_do_not_share_state(self):
+        """Column defaults are per instance."""
+        first = ActionResults()
+        second = ActionResults()
+        first.append_successful("1", "like", "Liked")
+        
+        assert len(second) == 0
+        assert second.successful_count == 0
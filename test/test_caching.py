@@ -0,0 +1,90 @@
+"""
+Tests for the in-process TTL/LRU cache.
+"""
+
+import time
+
+from caching import TTLCache
+
+
+class TestTTLCache:
+    """Test cases for TTLCache."""
+    
+    def test_get_and_set(self):
+        """Stored values are returned until they expire."""
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("a", 1)
+        
+        assert cache.get("a") == 1
+        assert "a" in cache
+        assert len(cache) == 1
+    
+    def test_missing_key_returns_default(self):
+        """A missing key returns the given default."""
+        cache = TTLCache(maxsize=10, ttl=60)
+        assert cache.get("missing") is None
+        assert cache.get("missing", "fallback") == "fallback"
+        assert "missing" not in cache
+    
+    def test_falsy_values_are_cached(self):
+        """Values such as None or 0 are distinguishable from a miss via `in`."""
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("none", None)
+        cache.set("zero", 0)
+        
+        assert "none" in cache
+        assert cache.get("zero", "fallback") == 0
+    
+    def test_entries_expire(self):
+        """Entries are dropped once their lifetime has passed."""
+        cache = TTLCache(maxsize=10, ttl=0.05)
+        cache.set("a", 1)
+        time.sleep(0.1)
+        
+        assert cache.get("a") is None
+        assert "a" not in cache
+        assert len(cache) == 0
+    
+    def test_per_entry_ttl(self):
+        """A ttl passed to set overrides the cache default for that entry."""
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("short", 1, ttl=0.05)
+        cache.set("long", 2)
+        time.sleep(0.1)
+        
+        assert cache.get("short") is None
+        assert cache.get("long") == 2
+    
+    def test_evicts_least_recently_used(self):
+        """When full, the least recently used entry is evicted."""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # "b" is now the least recently used
+        cache.set("c", 3)
+        
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+        assert len(cache) == 2
+    
+    def test_overwrite_refreshes_entry(self):
+        """Setting an existing key replaces its value and recency."""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.set("a", 10)
+        cache.set("c", 3)
+        
+        assert cache.get("a") == 10
+        assert "b" not in cache
+    
+    def test_clear(self):
+        """clear removes every entry."""
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.clear()
+        
+        assert len(cache) == 0
+        assert cache.get("a") is None
@@ -0,0 +1,179 @@
+"""
+Tests for TweetDecider response parsing, batching fallback and caching.
+
+The LLM is replaced by a scripted prompt function, so no model is called.
+"""
+
+import asyncio
+import json
+import threading
+
+import pytest
+
+from caching import TTLCache
+from kernel.decider import TweetDecider, TweetDecision, _load_json
+from kernel.ranker import RankedTweet
+from sources.tweepy_client import Tweet
+
+
+def make_ranked(*ids):
+    return [RankedTweet(Tweet(id=tweet_id, text=f"text {tweet_id}", author_id="author"), 0.5, "reason")
+            for tweet_id in ids]
+
+
+def decision_json(decision="like", **extra):
+    return dict({"decision": decision, "comment": "", "confidence": 0.9, "reasoning": "why"}, **extra)
+
+
+def scripted_decider(respond):
+    """Build a TweetDecider whose prompts are answered by `respond(prompt)`."""
+    decider = object.__new__(TweetDecider)
+    decider.prompts = []
+    
+    async def run_prompt(input_text):
+        decider.prompts.append(input_text)
+        return respond(input_text)
+    
+    decider._run_prompt = run_prompt
+    decider.run_coroutine = asyncio.run
+    decider._exact_cache = TTLCache(maxsize=100, ttl=60)
+    decider.semantic_cache = None
+    decider.ranker = None
+    decider.cache_stats = {"hits": 0, "misses": 0}
+    decider._stats_lock = threading.Lock()
+    return decider
+
+
+def is_batch(prompt):
+    return "JSON array" in prompt
+
+
+class TestLoadJson:
+    """Test cases for _load_json."""
+    
+    def test_plain_json(self):
+        assert _load_json('{"a": 1}') == {"a": 1}
+        assert _load_json(' [1, 2] \n') == [1, 2]
+    
+    @pytest.mark.parametrize("response", [
+        '```json\n{"a": 1}\n```',
+        '```JSON\n{"a": 1}```',
+        '```\n{"a": 1}\n```',
+        '  ```json {"a": 1} ```  ',
+    ])
+    def test_strips_markdown_fences(self, response):
+        assert _load_json(response) == {"a": 1}
+    
+    def test_fence_inside_string_is_kept(self):
+        assert _load_json('```json\n{"a": "x```y"}\n```') == {"a": "x```y"}
+    
+    def test_invalid_json_raises(self):
+        with pytest.raises(json.JSONDecodeError):
+            _load_json("not json")
+
+
+class TestBatchDecisions:
+    """Test cases for batched decisions and their single-tweet fallback."""
+    
+    def test_batch_response_parsed(self):
+        """A fenced JSON array yields one decision per tweet id."""
+        response = "```json\n" + json.dumps([
+            decision_json("like", tweet_id="1"),
+            decision_json("comment", tweet_id=2, comment="Nice"),
+        ]) + "\n```"
+        decider = scripted_decider(lambda prompt: response)
+        
+        decisions = asyncio.run(decider._decide_batch_async(make_ranked("1", "2")))
+        
+        assert decisions == {
+            "1": TweetDecision("like", "", 0.9, "why"),
+            "2": TweetDecision("comment", "Nice", 0.9, "why"),
+        }
+    
+    def test_batch_skips_invalid_entries(self):
+        """Entries without a tweet id or with an unknown decision are dropped."""
+        response = json.dumps([
+            decision_json("like"),
+            decision_json("retweet", tweet_id="1"),
+            "garbage",
+            decision_json("interesting", tweet_id="2"),
+        ])
+        decider = scripted_decider(lambda prompt: response)
+        
+        decisions = asyncio.run(decider._decide_batch_async(make_ranked("1", "2")))
+        assert list(decisions) == ["2"]
+    
+    @pytest.mark.parametrize("response", ["not json", json.dumps({"tweet_id": "1"}), "", None])
+    def test_unusable_batch_response(self, response):
+        """Invalid, non-list or empty responses produce no decisions."""
+        decider = scripted_decider(lambda prompt: response)
+        assert asyncio.run(decider._decide_batch_async(make_ranked("1", "2"))) == {}
+    
+    def test_uncovered_tweets_retried_individually(self):
+        """Tweets missing from the batch response are decided one by one."""
+        def respond(prompt):
+            if is_batch(prompt):
+                return json.dumps([decision_json("like", tweet_id="1")])
+            return "```json\n" + json.dumps(decision_json("dig_deeper")) + "\n```"
+        
+        decider = scripted_decider(respond)
+        decisions = asyncio.run(decider._decide_uncached_async(make_ranked("1", "2", "3")))
+        
+        assert [d.decision for d in decisions] == ["like", "dig_deeper", "dig_deeper"]
+        assert sum(is_batch(prompt) for prompt in decider.prompts) == 1
+        assert len(decider.prompts) == 3
+    
+    def test_failed_retry_leaves_none(self):
+        """A tweet no request could decide comes back as None, in order."""
+        def respond(prompt):
+            if is_batch(prompt):
+                return "not json"
+            return json.dumps(decision_json()) if "text 1" in prompt else "still not json"
+        
+        decider = scripted_decider(respond)
+        decisions = asyncio.run(decider._decide_uncached_async(make_ranked("1", "2")))
+        
+        assert decisions[0].decision == "like"
+        assert decisions[1] is None
+    
+    def test_single_tweet_skips_batch(self):
+        """One tweet is decided with the single-tweet prompt only."""
+        decider = scripted_decider(lambda prompt: json.dumps(decision_json()))
+        asyncio.run(decider._decide_uncached_async(make_ranked("1")))
+        
+        assert len(decider.prompts) == 1
+        assert not is_batch(decider.prompts[0])
+
+
+class TestDecisionCaching:
+    """Test cases for cached decisions in batch_decide and decide."""
+    
+    def test_exact_cache_avoids_repeat_requests(self):
+        """Deciding the same tweets again with the same context uses the cache."""
+        decider = scripted_decider(lambda prompt: json.dumps([
+            decision_json("like", tweet_id="1"), decision_json("like", tweet_id="2"),
+        ]))
+        tweets = make_ranked("1", "2")
+        
+        first = decider.batch_decide(tweets, context={"thread": "a"})
+        second = decider.batch_decide(tweets, context={"thread": "a"})
+        
+        assert [d for _, d in first] == [d for _, d in second]
+        assert len(decider.prompts) == 1
+        assert decider.get_cache_stats() == {"hits": 2, "misses": 2, "hit_rate": 0.5}
+    
+    def test_exact_cache_keyed_by_context(self):
+        """A different context is decided afresh."""
+        decider = scripted_decider(lambda prompt: json.dumps(decision_json()))
+        tweet = make_ranked("1")[0]
+        
+        decider.decide(tweet, context={"thread": "a"})
+        decider.decide(tweet, context={"thread": "b"})
+        decider.decide(tweet, context={"thread": "a"})
+        
+        assert len(decider.prompts) == 2
+    
+    def test_comment_decisions_not_reused_for_similar_tweets(self):
+        """Only non-comment decisions may be shared through the semantic cache."""
+        assert TweetDecider._is_reusable(TweetDecision("like", "", 0.9, "why"))
+        assert not TweetDecider._is_reusable(TweetDecision("comment", "Great point!", 0.9, "why"))
@@ -0,0 +1,149 @@
+"""
+Tests for semantic ranking selection and the text-matching fallback.
+"""
+
+import numpy as np
+import pytest
+
+from caching import TTLCache
+from kernel.ranker import SemanticRanker, RankedTweet
+from sources.tweepy_client import Tweet
+
+
+def make_tweets(*texts):
+    return [Tweet(id=str(index), text=text, author_id="author") for index, text in enumerate(texts)]
+
+
+def bare_ranker():
+    """A ranker without a loaded model, so no weights are downloaded."""
+    ranker = SemanticRanker.__new__(SemanticRanker)
+    ranker.model = None
+    return ranker
+
+
+class TestSelectRanked:
+    """Test cases for SemanticRanker._select_ranked."""
+    
+    def setup_method(self):
+        self.ranker = bare_ranker()
+        self.tweets = make_tweets("a", "b", "c", "d", "e", "f")
+        self.similarities = np.array([0.5, 0.8, 0.6, 0.9, 0.2, 0.81], dtype=np.float32)
+    
+    def test_threshold_and_order(self):
+        """Only scores at or above min_score are kept, highest first."""
+        ranked = self.ranker._select_ranked(self.tweets, self.similarities, 0.5)
+        
+        assert [r.tweet.id for r in ranked] == ["3", "5", "1", "2", "0"]
+        assert all(isinstance(r, RankedTweet) for r in ranked)
+        assert ranked[0].score == pytest.approx(0.9)
+    
+    def test_threshold_is_inclusive(self):
+        """A score equal to min_score is kept."""
+        similarities = np.array([0.5, 0.25], dtype=np.float64)
+        ranked = self.ranker._select_ranked(make_tweets("a", "b"), similarities, 0.5)
+        
+        assert [r.tweet.id for r in ranked] == ["0"]
+    
+    def test_nothing_above_threshold(self):
+        """No survivors gives an empty list."""
+        assert self.ranker._select_ranked(self.tweets, self.similarities, 0.95) == []
+    
+    def test_relevance_labels(self):
+        """Labels use strict thresholds: above 0.8 highly, above 0.6 moderately."""
+        similarities = np.array([0.95, 0.8, 0.7, 0.6, 0.3], dtype=np.float64)
+        ranked = self.ranker._select_ranked(make_tweets("a", "b", "c", "d", "e"), similarities, 0.0)
+        
+        assert [r.relevance_reason for r in ranked] == [
+            "Highly relevant (score: 0.95)",
+            "Moderately relevant (score: 0.80)",
+            "Moderately relevant (score: 0.70)",
+            "Somewhat relevant (score: 0.60)",
+            "Somewhat relevant (score: 0.30)",
+        ]
+    
+    def test_top_k_keeps_best(self):
+        """top_k returns the k best survivors in order."""
+        ranked = self.ranker._select_ranked(self.tweets, self.similarities, 0.5, top_k=2)
+        assert [r.tweet.id for r in ranked] == ["3", "5"]
+    
+    def test_top_k_matches_full_sort(self):
+        """Partial selection gives the same head as sorting everything."""
+        rng = np.random.default_rng(0)
+        similarities = rng.random(1000)
+        tweets = make_tweets(*(f"t{index}" for index in range(1000)))
+        
+        full = self.ranker._select_ranked(tweets, similarities, 0.3)
+        top = self.ranker._select_ranked(tweets, similarities, 0.3, top_k=25)
+        
+        assert [r.tweet.id for r in top] == [r.tweet.id for r in full[:25]]
+    
+    def test_top_k_larger_than_survivors(self):
+        """A top_k beyond the number of survivors returns all of them."""
+        ranked = self.ranker._select_ranked(self.tweets, self.similarities, 0.5, top_k=100)
+        assert len(ranked) == 5
+
+
+class TestFallbackRanking:
+    """Test cases for ranking without a sentence-transformer model."""
+    
+    def setup_method(self):
+        self.ranker = bare_ranker()
+        self.tweets = make_tweets("Python agents", "python", "rust", "AI and Python agents", "go")
+    
+    def test_simple_ranking(self):
+        """Scores are the share of query terms found, case-insensitively."""
+        ranked = self.ranker.rank_tweets(self.tweets, ["python", "agents"], min_score=0.5)
+        
+        assert [(r.tweet.id, r.score) for r in ranked] == [("0", 1.0), ("3", 1.0), ("1", 0.5)]
+    
+    def test_top_k(self):
+        """top_k caps the fallback results too."""
+        ranked = self.ranker.rank_tweets(self.tweets, ["python", "agents"], min_score=0.5, top_k=2)
+        assert [r.tweet.id for r in ranked] == ["0", "3"]
+    
+    @pytest.mark.parametrize("top_k", [0, -1])
+    def test_top_k_must_be_positive(self, top_k):
+        """top_k below 1 is rejected."""
+        with pytest.raises(ValueError):
+            self.ranker.rank_tweets(self.tweets, ["python"], top_k=top_k)
+    
+    def test_filter_by_keywords(self):
+        """Keyword filtering is case-insensitive and treats keywords literally."""
+        tweets = make_tweets("Hello PYTHON", "c++ tips", "cpp", "nothing")
+        
+        filtered = self.ranker.filter_by_keywords(tweets, ["python", "C++"])
+        assert [tweet.id for tweet in filtered] == ["0", "1"]
+        assert self.ranker.filter_by_keywords(tweets, []) == tweets
+
+
+class TestEmbeddingCache:
+    """Test cases for the embeddings cached by SemanticRanker._encode."""
+    
+    def setup_method(self):
+        self.ranker = bare_ranker()
+        self.ranker.model_name = "test-model"
+        self.ranker._embedding_cache = TTLCache(maxsize=100, ttl=float("inf"))
+        self.batches = []
+        
+        def encode_uncached(texts):
+            batch = np.eye(len(texts), 4, dtype=np.float32)
+            self.batches.append(batch)
+            return batch
+        
+        self.ranker._encode_uncached = encode_uncached
+    
+    def test_cached_rows_do_not_keep_the_batch_alive(self):
+        """Each cached embedding owns its memory instead of viewing the batch matrix."""
+        self.ranker._encode(["a", "b", "c"])
+        
+        cached = self.ranker._embedding_cache.get(self.ranker._text_key("b"))
+        assert cached.base is None
+        assert not np.shares_memory(cached, self.batches[0])
+    
+    def test_repeated_texts_are_served_from_the_cache(self):
+        """Only texts not seen before reach the model."""
+        first = self.ranker._encode(["a", "b"])
+        second = self.ranker._encode(["b", "a", "c"])
+        
+        assert len(self.batches) == 2 and self.batches[1].shape[0] == 1
+        np.testing.assert_array_equal(second[:2], first[::-1])
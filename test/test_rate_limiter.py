@@ -0,0 +1,79 @@
+"""
+Tests for the token-bucket rate limiter.
+"""
+
+import asyncio
+
+from rate_limiter import TokenBucket
+
+
+class TestTokenBucket:
+    """Test cases for TokenBucket."""
+    
+    def test_starts_full(self):
+        """A new bucket holds its full capacity."""
+        bucket = TokenBucket(capacity=3, refill_rate=1.0)
+        assert bucket.tokens == 3.0
+    
+    def test_per_window_rate(self):
+        """per_window spreads the capacity evenly over the window."""
+        bucket = TokenBucket.per_window(50, 900)
+        assert bucket.capacity == 50
+        assert bucket.refill_rate == 50 / 900
+    
+    def test_try_consume_until_empty(self):
+        """Tokens can be taken up to the capacity, then the bucket refuses."""
+        bucket = TokenBucket(capacity=2, refill_rate=0.001)
+        assert bucket.try_consume()
+        assert bucket.try_consume()
+        assert not bucket.try_consume()
+    
+    def test_try_consume_more_than_available(self):
+        """A request larger than the balance takes nothing."""
+        bucket = TokenBucket(capacity=2, refill_rate=0.001)
+        assert not bucket.try_consume(3)
+        assert bucket.try_consume(2)
+    
+    def test_refill_over_time(self):
+        """Elapsed time adds tokens at the refill rate."""
+        bucket = TokenBucket(capacity=2, refill_rate=1.0)
+        bucket.try_consume(2)
+        assert not bucket.try_consume()
+        
+        bucket.last_refill -= 1.5
+        assert bucket.try_consume()
+        assert not bucket.try_consume()
+    
+    def test_refill_capped_at_capacity(self):
+        """Idle time never fills the bucket past its capacity."""
+        bucket = TokenBucket(capacity=2, refill_rate=1.0)
+        bucket.last_refill -= 100
+        assert bucket.time_until(2) == 0.0
+        assert bucket.tokens == 2.0
+    
+    def test_time_until(self):
+        """time_until reports how long the missing tokens take to refill."""
+        bucket = TokenBucket(capacity=1, refill_rate=2.0)
+        assert bucket.time_until() == 0.0
+        
+        bucket.try_consume()
+        wait = bucket.time_until()
+        assert 0.0 < wait <= 0.5
+    
+    def test_consume_blocks_until_refilled(self):
+        """consume waits for a token instead of failing."""
+        bucket = TokenBucket(capacity=1, refill_rate=50.0)
+        bucket.consume()
+        bucket.consume()
+        assert bucket.tokens < 1.0
+    
+    def test_consume_async(self):
+        """consume_async waits for a token on the event loop."""
+        bucket = TokenBucket(capacity=1, refill_rate=50.0)
+        
+        async def take_two():
+            await bucket.consume_async()
+            await bucket.consume_async()
+        
+        asyncio.run(asyncio.wait_for(take_two(), timeout=5))
+        assert bucket.tokens < 1.0
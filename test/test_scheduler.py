@@ -0,0 +1,65 @@
+"""Tests for the scheduler's background stats writer."""
+
+from types import SimpleNamespace
+
+import scheduler
+from scheduler import AgentScheduler
+
+
+class FakeStorage:
+    """Records every update_daily_stats call."""
+    
+    def __init__(self):
+        self.updates = []
+    
+    def update_daily_stats(self, stats_update):
+        self.updates.append(dict(stats_update))
+
+
+class TestStatsWriter:
+    """Listener stats are coalesced off the listener thread."""
+    
+    def setup_method(self):
+        self.storage = FakeStorage()
+        self.original_storage = scheduler.storage
+        scheduler.storage = self.storage
+        self.scheduler = AgentScheduler(supervisor_agent=SimpleNamespace())
+    
+    def teardown_method(self):
+        scheduler.storage = self.original_storage
+    
+    def test_listener_events_are_written_once_on_stop(self):
+        self.scheduler._start_stats_writer()
+        event = SimpleNamespace(job_id="job", exception=RuntimeError("boom"))
+        for _ in range(5):
+            self.scheduler._stats_queue.put_nowait({"tweets_processed": 1})
+        self.scheduler._job_error_listener(event)
+        self.scheduler._job_error_listener(event)
+        
+        self.scheduler._stop_stats_writer()
+        
+        assert self.storage.updates == [{"tweets_processed": 5, "errors_encountered": 2}]
+        assert self.scheduler._stats_thread is None
+    
+    def test_stop_without_events_writes_nothing(self):
+        self.scheduler._start_stats_writer()
+        self.scheduler._stop_stats_writer()
+        
+        assert self.storage.updates == []
+    
+    def test_stop_before_start_is_a_no_op(self):
+        self.scheduler._stop_stats_writer()
+        
+        assert self.storage.updates == []
+    
+    def test_maintenance_jobs_are_not_counted(self):
+        self.scheduler._start_stats_writer()
+        for job_id in ("storage_optimize", "storage_checkpoint"):
+            self.scheduler._job_executed_listener(SimpleNamespace(job_id=job_id))
+            self.scheduler._job_error_listener(
+                SimpleNamespace(job_id=job_id, exception=RuntimeError("locked"))
+            )
+        
+        self.scheduler._stop_stats_writer()
+        
+        assert self.storage.updates == []
@@ -0,0 +1,91 @@
+"""
+Tests for the embedding-keyed SemanticCache.
+"""
+
+import time
+
+import numpy as np
+
+from kernel.semantic_cache import SemanticCache
+
+
+def unit(*components):
+    """L2-normalized float32 vector."""
+    vector = np.asarray(components, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+class TestSemanticCache:
+    """Test cases for SemanticCache."""
+    
+    def test_empty_cache_misses(self):
+        """Lookups on an empty cache return None."""
+        cache = SemanticCache(threshold=0.9, maxsize=4, ttl=60)
+        assert cache.get(unit(1, 0)) is None
+        assert len(cache) == 0
+    
+    def test_similar_vector_hits(self):
+        """A vector above the similarity threshold returns the stored value."""
+        cache = SemanticCache(threshold=0.9, maxsize=4, ttl=60)
+        cache.put(unit(1, 0), "a")
+        
+        assert cache.get(unit(1, 0)) == "a"
+        assert cache.get(unit(1, 0.1)) == "a"  # cosine ~0.995
+    
+    def test_dissimilar_vector_misses(self):
+        """A vector below the similarity threshold is a miss."""
+        cache = SemanticCache(threshold=0.9, maxsize=4, ttl=60)
+        cache.put(unit(1, 0), "a")
+        
+        assert cache.get(unit(1, 1)) is None  # cosine ~0.707
+        assert cache.get(unit(0, 1)) is None
+    
+    def test_returns_most_similar_entry(self):
+        """With several candidates above the threshold, the closest one wins."""
+        cache = SemanticCache(threshold=0.5, maxsize=4, ttl=60)
+        cache.put(unit(1, 0), "x")
+        cache.put(unit(0, 1), "y")
+        
+        assert cache.get(unit(1, 0.2)) == "x"
+        assert cache.get(unit(0.2, 1)) == "y"
+    
+    def test_entries_expire(self):
+        """Expired entries no longer match."""
+        cache = SemanticCache(threshold=0.9, maxsize=4, ttl=0.05)
+        cache.put(unit(1, 0), "a")
+        time.sleep(0.1)
+        
+        assert cache.get(unit(1, 0)) is None
+    
+    def test_evicts_least_recently_used_when_full(self):
+        """A put on a full cache replaces the least recently used entry."""
+        cache = SemanticCache(threshold=0.99, maxsize=2, ttl=60)
+        cache.put(unit(1, 0), "a")
+        cache.put(unit(0, 1), "b")
+        cache.get(unit(1, 0))  # "b" is now the least recently used
+        cache.put(unit(1, 1), "c")
+        
+        assert len(cache) == 2
+        assert cache.get(unit(1, 0)) == "a"
+        assert cache.get(unit(0, 1)) is None
+        assert cache.get(unit(1, 1)) == "c"
+    
+    def test_expired_entry_replaced_before_lru(self):
+        """When full, an expired slot is reused before evicting a live entry."""
+        cache = SemanticCache(threshold=0.99, maxsize=2, ttl=60)
+        cache.put(unit(1, 0), "live")
+        cache.put(unit(0, 1), "stale")
+        cache._expires_at[1] = 0.0  # expire "stale"; "live" is still the LRU entry
+        cache.put(unit(1, 1), "new")
+        
+        assert cache.get(unit(1, 0)) == "live"
+        assert cache.get(unit(1, 1)) == "new"
+    
+    def test_clear(self):
+        """clear removes every entry."""
+        cache = SemanticCache(threshold=0.9, maxsize=4, ttl=60)
+        cache.put(unit(1, 0), "a")
+        cache.clear()
+        
+        assert len(cache) == 0
+        assert cache.get(unit(1, 0)) is None
@@ -0,0 +1,394 @@
+"""
+Tests for the connection settings, buffered writes, atomic counter updates,
+daily rate-limit reservations and conversation cursors in StorageManager.
+"""
+
+import os
+import sqlite3
+import tempfile
+import time
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+
+import pytest
+
+from storage import ProcessedTweet, StorageManager
+
+
+class TestConnectionSettings:
+    """Test cases for the journal and PRAGMAs applied to every connection."""
+    
+    def setup_method(self):
+        """Use a fresh database for every test."""
+        self.db_dir = tempfile.TemporaryDirectory()
+        self.storage = StorageManager(os.path.join(self.db_dir.name, "agent_state.db"))
+    
+    def teardown_method(self):
+        self.storage.close()
+        self.db_dir.cleanup()
+    
+    def test_file_database_uses_wal(self):
+        """On-disk databases are switched to WAL with NORMAL sync."""
+        with self.storage._connect() as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    
+    def test_connection_is_reused_per_thread(self):
+        """Each thread keeps one connection; other threads get their own."""
+        conn = self.storage._conn()
+        assert self.storage._conn() is conn
+        
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            other = executor.submit(self.storage._conn).result()
+        assert other is not conn
+    
+    def test_close_reopens_on_next_use(self):
+        """Closing the manager drops its connections; the next call opens a new one."""
+        conn = self.storage._conn()
+        self.storage.set_conversation_cursor("123", "500")
+        self.storage.close()
+        
+        assert self.storage._conn() is not conn
+        assert self.storage.get_conversation_cursor("123") == "500"
+    
+    def test_legacy_schema_is_migrated(self):
+        """Databases with TEXT timestamps, rowid tables and AUTOINCREMENT are converted in place."""
+        legacy_path = os.path.join(self.db_dir.name, "legacy.db")
+        with closing(sqlite3.connect(legacy_path)) as conn:
+            conn.executescript("""
+                CREATE TABLE processed_tweets (
+                    tweet_id TEXT PRIMARY KEY, processed_at TEXT NOT NULL,
+                    action_taken TEXT NOT NULL, confidence REAL NOT NULL,
+                    reasoning TEXT NOT NULL, success BOOLEAN NOT NULL, error_message TEXT
+                );
+                CREATE INDEX idx_processed_tweets_date ON processed_tweets(processed_at);
+                INSERT INTO processed_tweets VALUES
+                    ('1', '2024-01-01T12:00:00.123456', 'like', 0.9, 'relevant', 1, NULL);
+                CREATE TABLE action_log (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT, tweet_id TEXT NOT NULL,
+                    action_type TEXT NOT NULL, executed_at TEXT NOT NULL,
+                    success BOOLEAN NOT NULL, details TEXT NOT NULL, error_message TEXT
+                );
+                INSERT INTO action_log VALUES (7, '1', 'like', '2024-01-01T12:00:01', 1, 'liked', NULL);
+                CREATE TABLE daily_stats (
+                    date TEXT PRIMARY KEY, tweets_processed INTEGER DEFAULT 0,
+                    likes_given INTEGER DEFAULT 0, replies_sent INTEGER DEFAULT 0,
+                    threads_analyzed INTEGER DEFAULT 0, errors_encountered INTEGER DEFAULT 0
+                );
+                INSERT INTO daily_stats VALUES ('2024-01-01', 4, 1, 0, 0, 0);
+            """)
+        
+        migrated = StorageManager(legacy_path)
+        try:
+            assert migrated.has_processed_tweet("1")
+            with migrated._conn() as conn:
+                processed_at = conn.execute("SELECT processed_at FROM processed_tweets").fetchone()[0]
+                schemas = dict(conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'table'"))
+            assert processed_at == int(datetime(2024, 1, 1, 12, 0, 0).timestamp())
+            assert "WITHOUT ROWID" in schemas["processed_tweets"]
+            assert "WITHOUT ROWID" in schemas["daily_stats"]
+            assert "AUTOINCREMENT" not in schemas["action_log"]
+            if sqlite3.sqlite_version_info >= (3, 37, 0):
+                assert all(schemas[name].rstrip().endswith("STRICT")
+                           for name in ("processed_tweets", "action_log", "daily_stats"))
+            assert not any(name.endswith("_legacy") for name in schemas)
+            assert migrated.get_daily_stats(date(2024, 1, 1))["tweets_processed"] == 4
+            
+            [action] = migrated.get_recent_actions()
+            assert (action.id, action.executed_at) == (7, processed_at + 1)
+            
+            next_action = migrated.log_action("2", "like", True, "liked")
+            migrated.flush()
+            assert next_action.result(timeout=0) == 8
+        finally:
+            migrated.close()
+    
+    def test_checkpoint_truncates_wal(self):
+        """A checkpoint copies the WAL into the database and empties it."""
+        self.storage.update_daily_stats({"tweets_processed": 1})
+        wal_path = self.storage.db_path + "-wal"
+        assert os.path.getsize(wal_path) > 0
+        
+        self.storage.optimize()
+        self.storage.checkpoint()
+        
+        assert os.path.getsize(wal_path) == 0
+        assert self.storage.get_daily_stats()["tweets_processed"] == 1
+    
+    @pytest.mark.skipif(sqlite3.sqlite_version_info < (3, 37, 0), reason="STRICT needs SQLite 3.37+")
+    def test_tables_reject_wrong_types(self):
+        """STRICT tables refuse values that do not fit the declared column type."""
+        with pytest.raises(sqlite3.IntegrityError):
+            with self.storage._conn() as conn:
+                conn.execute("""
+                    INSERT INTO action_log 
+                    (tweet_id, action_type, executed_at, success, details)
+                    VALUES ('1', 'like', 'yesterday', 1, 'liked')
+                """)
+    
+    def test_memory_database_keeps_default_journal(self):
+        """In-memory databases are left on their default journal."""
+        memory_storage = StorageManager(":memory:")
+        
+        with memory_storage._connect() as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "memory"
+
+
+class TestBufferedWrites:
+    """Test cases for the batched mark_tweet_processed and log_action writes."""
+    
+    def setup_method(self):
+        """Use a fresh database with a small, time-unbounded write buffer."""
+        self.db_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.db_dir.name, "agent_state.db")
+        self.storage = StorageManager(self.db_path, write_batch_size=3, write_flush_interval=3600)
+    
+    def teardown_method(self):
+        self.storage.close()
+        self.db_dir.cleanup()
+    
+    def _processed(self, tweet_id: str) -> ProcessedTweet:
+        return ProcessedTweet(tweet_id, int(time.time()), "like", 0.9, "relevant", True)
+    
+    def _stored_count(self, table: str) -> int:
+        # A separate connection only sees committed rows
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    
+    def test_buffered_tweet_is_seen_before_flush(self):
+        """A processed tweet counts as processed while it is still buffered."""
+        self.storage.mark_tweet_processed(self._processed("1"))
+        
+        assert self.storage.has_processed_tweet("1")
+        assert self._stored_count("processed_tweets") == 0
+    
+    def test_processed_ids_survive_restart_and_cleanup(self):
+        """Stored tweets are known to a new manager until cleanup deletes them."""
+        self.storage.mark_tweet_processed(self._processed("1"))
+        self.storage.mark_tweet_processed(
+            ProcessedTweet("2", int(datetime(2000, 1, 1).timestamp()), "skip", 0.1, "old", True)
+        )
+        self.storage.flush()
+        
+        restarted = StorageManager(self.db_path)
+        assert restarted.has_processed_tweet("1")
+        assert restarted.has_processed_tweet("2")
+        assert not restarted.has_processed_tweet("3")
+        
+        restarted.cleanup_old_data(days_to_keep=30)
+        assert restarted.has_processed_tweet("1")
+        assert not restarted.has_processed_tweet("2")
+        restarted.close()
+    
+    def test_reprocessed_tweet_is_updated(self):
+        """Marking a stored tweet again overwrites its row."""
+        self.storage.mark_tweet_processed(self._processed("1"))
+        self.storage.flush()
+        self.storage.mark_tweet_processed(
+            ProcessedTweet("1", int(time.time()), "comment", 0.5, "on topic", False, "rejected")
+        )
+        self.storage.flush()
+        
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            rows = conn.execute(
+                "SELECT action_taken, success, error_message FROM processed_tweets"
+            ).fetchall()
+        assert rows == [("comment", 0, "rejected")]
+    
+    def test_full_buffer_flushes_in_one_batch(self):
+        """Reaching the batch size writes every buffered row and resolves the action IDs."""
+        first = self.storage.log_action("1", "like", True, "liked")
+        self.storage.mark_tweet_processed(self._processed("1"))
+        assert not first.done()
+        
+        second = self.storage.log_action("2", "like", True, "liked")
+        
+        assert first.result(timeout=0) > 0
+        assert second.result(timeout=0) == first.result() + 1
+        assert self._stored_count("processed_tweets") == 1
+        assert self._stored_count("action_log") == 2
+    
+    @pytest.mark.skipif(sqlite3.sqlite_version_info < (3, 37, 0), reason="STRICT needs SQLite 3.37+")
+    def test_bad_row_does_not_drop_the_batch(self):
+        """A row SQLite rejects is dropped on its own; the rest of the batch is written."""
+        self.storage.mark_tweet_processed(self._processed("1"))
+        self.storage.mark_tweet_processed(
+            ProcessedTweet("2", "not a timestamp", "like", 0.9, "relevant", True)
+        )
+        good = self.storage.log_action("1", "like", True, "liked")
+        
+        assert good.result(timeout=0) > 0
+        assert self._stored_count("processed_tweets") == 1
+        assert self._stored_count("action_log") == 1
+    
+    def test_rows_stay_buffered_while_database_is_locked(self):
+        """Rows that cannot be written because the database is busy are retried later."""
+        self.storage.mark_tweet_processed(self._processed("1"))
+        
+        with closing(sqlite3.connect(self.db_path, isolation_level=None)) as locker:
+            locker.execute("BEGIN EXCLUSIVE")
+            self.storage._conn().execute("PRAGMA busy_timeout=0")
+            self.storage.flush()
+            locker.execute("ROLLBACK")
+        
+        assert self._stored_count("processed_tweets") == 0
+        self.storage.flush()
+        assert self._stored_count("processed_tweets") == 1
+    
+    def test_reads_and_close_flush(self):
+        """Reading the action log, or closing the manager, writes buffered rows first."""
+        self.storage.log_action("1", "comment", False, "reply", error_message="rejected")
+        assert [a.tweet_id for a in self.storage.get_recent_actions()] == ["1"]
+        
+        self.storage.mark_tweet_processed(self._processed("2"))
+        self.storage.close()
+        assert self._stored_count("processed_tweets") == 1
+
+
+class TestCounterUpdates:
+    """Test cases for update_daily_stats and update_rate_limit."""
+    
+    def setup_method(self):
+        """Use a fresh database for every test."""
+        self.db_dir = tempfile.TemporaryDirectory()
+        self.storage = StorageManager(os.path.join(self.db_dir.name, "agent_state.db"))
+    
+    def teardown_method(self):
+        self.storage.close()
+        self.db_dir.cleanup()
+    
+    def test_daily_stats_accumulate(self):
+        """Increments add to the stored counters; unknown keys are ignored."""
+        self.storage.update_daily_stats({"tweets_processed": 3, "likes_given": 1})
+        self.storage.update_daily_stats({"tweets_processed": 2, "unknown": 7})
+        
+        stats = self.storage.get_daily_stats()
+        assert stats["tweets_processed"] == 5
+        assert stats["likes_given"] == 1
+        assert stats["replies_sent"] == 0
+    
+    def test_concurrent_daily_stats_updates_are_not_lost(self):
+        """Concurrent increments all land."""
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(
+                lambda _: self.storage.update_daily_stats({"tweets_processed": 1}),
+                range(40)
+            ))
+        
+        assert self.storage.get_daily_stats()["tweets_processed"] == 40
+    
+    def test_rate_limit_resets_on_new_day(self):
+        """Counters from an earlier day restart from the increment."""
+        with self.storage._conn() as conn:
+            conn.execute("""
+                INSERT INTO rate_limits 
+                (action_type, daily_count, last_reset_date, hourly_count, last_hour_reset)
+                VALUES ('like', 9, '2000-01-01', 4, '2000-01-01 10:00:00')
+            """)
+        
+        self.storage.update_rate_limit("like", increment=2)
+        self.storage.update_rate_limit("like")
+        
+        status = self.storage.get_rate_limit_status("like")
+        assert status["daily_count"] == 3
+        assert status["hourly_count"] == 3
+        assert status["last_reset_date"] == date.today().isoformat()
+
+
+class TestRateLimitReservations:
+    """Test cases for reserve_rate_limit and release_rate_limit."""
+    
+    def setup_method(self):
+        """Use a fresh database for every test."""
+        self.db_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.db_dir.name, "agent_state.db")
+        self.storage = StorageManager(self.db_path)
+    
+    def teardown_method(self):
+        self.storage.close()
+        self.db_dir.cleanup()
+    
+    def test_reserve_counts_up_to_limit(self):
+        """Reservations return the new count until the limit is reached."""
+        assert self.storage.reserve_rate_limit("like", limit=2) == 1
+        assert self.storage.reserve_rate_limit("like", limit=2) == 2
+        assert self.storage.reserve_rate_limit("like", limit=2) is None
+        assert self.storage.get_rate_limit_status("like")["daily_count"] == 2
+    
+    def test_action_types_are_independent(self):
+        """Each action type has its own budget."""
+        assert self.storage.reserve_rate_limit("like", limit=1) == 1
+        assert self.storage.reserve_rate_limit("comment", limit=1) == 1
+        assert self.storage.reserve_rate_limit("like", limit=1) is None
+    
+    def test_release_returns_budget(self):
+        """A released reservation can be taken again."""
+        self.storage.reserve_rate_limit("like", limit=1)
+        self.storage.release_rate_limit("like")
+        
+        assert self.storage.get_rate_limit_status("like")["daily_count"] == 0
+        assert self.storage.reserve_rate_limit("like", limit=1) == 1
+    
+    def test_release_never_goes_negative(self):
+        """Releasing more than was reserved stops at zero."""
+        self.storage.reserve_rate_limit("like", limit=5)
+        self.storage.release_rate_limit("like", increment=3)
+        
+        assert self.storage.get_rate_limit_status("like")["daily_count"] == 0
+    
+    def test_concurrent_reservations_never_exceed_limit(self):
+        """Concurrent callers sharing the database cannot overspend the limit."""
+        limit = 5
+        # Separate managers stand in for separate processes on one database
+        managers = [StorageManager(self.db_path) for _ in range(4)]
+        
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            counts = list(executor.map(
+                lambda i: managers[i % len(managers)].reserve_rate_limit("like", limit),
+                range(40)
+            ))
+        
+        granted = [count for count in counts if count is not None]
+        assert sorted(granted) == list(range(1, limit + 1))
+        assert self.storage.get_rate_limit_status("like")["daily_count"] == limit
+    
+    def test_concurrent_reserve_and_release(self):
+        """Interleaved reserves and releases leave a consistent count."""
+        limit = 10
+        
+        def reserve_then_release(_):
+            if self.storage.reserve_rate_limit("comment", limit) is not None:
+                self.storage.release_rate_limit("comment")
+        
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(reserve_then_release, range(50)))
+        
+        assert self.storage.get_rate_limit_status("comment")["daily_count"] == 0
+
+
+
+class TestConversationCursors:
+    """Test cases for get_conversation_cursor and set_conversation_cursor."""
+    
+    def setup_method(self):
+        """Use a fresh database for every test."""
+        self.db_dir = tempfile.TemporaryDirectory()
+        self.storage = StorageManager(os.path.join(self.db_dir.name, "agent_state.db"))
+    
+    def teardown_method(self):
+        self.storage.close()
+        self.db_dir.cleanup()
+    
+    def test_unknown_conversation_has_no_cursor(self):
+        """A thread that was never fetched starts from the beginning."""
+        assert self.storage.get_conversation_cursor("123") is None
+    
+    def test_cursor_is_replaced(self):
+        """Setting a cursor again moves it forward."""
+        self.storage.set_conversation_cursor("123", "500")
+        self.storage.set_conversation_cursor("123", "900")
+        self.storage.set_conversation_cursor("456", "700")
+        
+        assert self.storage.get_conversation_cursor("123") == "900"
+        assert self.storage.get_conversation_cursor("456") == "700"
@@ -0,0 +1,68 @@
+"""
+Tests for ThreadAgent's per-conversation reply cursor.
+
+The Twitter client, ranker, decider and storage are replaced by fakes, so no
+API, model or database is used.
+"""
+
+from types import SimpleNamespace
+
+from agents.thread_agent import ThreadAgent
+from kernel.decider import TweetDecision
+from kernel.ranker import RankedTweet
+from sources.tweepy_client import Tweet
+
+
+class FakeStorage:
+    """Keeps conversation cursors in a dict."""
+    
+    def __init__(self):
+        self.cursors = {}
+    
+    def get_conversation_cursor(self, conversation_id):
+        return self.cursors.get(conversation_id)
+    
+    def set_conversation_cursor(self, conversation_id, since_id):
+        self.cursors[conversation_id] = since_id
+
+
+def make_agent(replies, decide):
+    """Build a ThreadAgent answering with `replies` and deciding through `decide`."""
+    client = SimpleNamespace(get_conversation_replies=lambda *args, **kwargs: replies)
+    ranker = SimpleNamespace(rank_tweets=lambda tweets, *args, **kwargs: [
+        RankedTweet(reply, 0.9, "relevant") for reply in tweets
+    ])
+    decider = SimpleNamespace(batch_decide=lambda ranked, context=None: decide(ranked))
+    return ThreadAgent(twitter_client=client, decider=decider, ranker=ranker,
+                       storage_manager=FakeStorage())
+
+
+def thread_root():
+    return RankedTweet(Tweet(id="1", text="original", author_id="a", conversation_id="1"), 0.9, "root")
+
+
+def replies():
+    return [Tweet(id=reply_id, text=f"reply {reply_id}", author_id="b") for reply_id in ("5", "12")]
+
+
+class TestConversationCursor:
+    """The cursor only moves once a thread's replies have been decided."""
+    
+    def test_cursor_moves_to_newest_reply_after_decisions(self):
+        agent = make_agent(replies(), lambda ranked: [
+            (reply, TweetDecision("like", "", 0.9, "good")) for reply in ranked
+        ])
+        
+        results = agent.analyze_thread(thread_root())
+        
+        assert len(results) == 2
+        assert agent.storage.cursors == {"1": "12"}
+    
+    def test_cursor_stays_when_deciding_fails(self):
+        def fail(ranked):
+            raise RuntimeError("model unavailable")
+        
+        agent = make_agent(replies(), fail)
+        
+        assert agent.analyze_thread(thread_root()) == []
+        assert agent.storage.cursors == {}